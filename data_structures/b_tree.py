@@ -0,0 +1,393 @@
+"""Implementation of a B+ tree."""
+
+import bisect
+
+from data_structures import binary_search_tree
+
+
+class _Leaf(object):
+  """Representation of a leaf node in a `BTree`."""
+
+  __slots__ = ('keys', 'prev', 'next')
+
+  def __init__(self, keys):
+    self.keys = keys
+    self.prev = None
+    self.next = None
+
+
+class _Internal(object):
+  """Representation of an internal node in a `BTree`."""
+
+  __slots__ = ('keys', 'children')
+
+  def __init__(self, keys, children):
+    self.keys = keys
+    self.children = children
+
+
+class BTree(object):
+  """Implementation of a B+ tree.
+
+  A B+ tree is a data structure which serves as an ordered collection of
+  elements, with the same operations as `binary_search_tree.BinarySearchTree`.
+  Instead of a single element, each node holds a sorted block of up to `order`
+  elements, so the tree is shallow and walking down it takes few steps, each
+  being a binary search in a block using `bisect`.
+
+  B+ tree property.
+
+  All elements are stored in the leaves, and all leaves are at the same depth.
+  The leaves are linked together in order, so iteration and range scans walk
+  the leaves without going back up the tree. Each internal node with `k + 1`
+  children holds `k` separators, such that the elements under the `i`-th child
+  are smaller or equal to the `i`-th separator, which is smaller or equal to the
+  elements under the `(i + 1)`-th child. Each node except the root holds at
+  least `order // 2` elements or children, and at most `order`.
+
+  B+ tree operations.
+
+  * Searching walks down the tree, choosing the child by binary search in the
+    separators.
+  * Addition inserts the element into the leaf where it belongs. If the leaf
+    overflows, it is split into two, adding a new separator to its parent, which
+    can overflow and be split in turn. When the root is split, a new root is
+    created and the tree grows in height.
+  * Removal removes the element from its leaf. If the leaf underflows, it
+    borrows an element from a sibling, or is merged with it, removing a
+    separator from its parent, which can underflow in turn. When the root is
+    left with a single child, the child becomes the new root.
+
+  All of these take `O(log(n))` time, with the base of the logarithm being
+  about `order`.
+  """
+
+  def __init__(self, order=64):
+    """Constructs an empty tree.
+
+    Args:
+      order: An integer, at least 4. The maximum number of elements in a leaf,
+        and the maximum number of children of an internal node.
+
+    Raises:
+      `ValueError` if `order` is too small.
+    """
+    if order < 4:
+      raise ValueError(f'Order must be at least 4, but is {order}.')
+    self._order = order
+    self._root = _Leaf([])
+    self._size = 0
+
+  @classmethod
+  def from_array(cls, array, **kwargs):
+    """Constructs `BTree` containing given data.
+
+    The data is sorted and packed into full leaves, which are then indexed
+    level by level, so no element is added by walking down the tree.
+
+    Args:
+      array: A list of elements to be stored in the `BTree`.
+      **kwargs: Keyword arguments passed to the constructor.
+
+    Returns:
+      A `BTree`.
+
+    Raises:
+      `TypeError` if `array` is not a list.
+    """
+    if not isinstance(array, list):
+      raise TypeError(f'Provided data must be a list, but is {type(array)}.')
+
+    tree = cls(**kwargs)
+    if not array:
+      return tree
+    array = sorted(array)
+    order = tree._order
+    nodes = [_Leaf(array[i:i + order]) for i in range(0, len(array), order)]
+    for prev, leaf in zip(nodes, nodes[1:]):
+      prev.next = leaf
+      leaf.prev = prev
+    separators = [leaf.keys[0] for leaf in nodes[1:]]
+    _fix_last_underflow(nodes, separators, order)
+    while len(nodes) > 1:
+      parents = []
+      parent_separators = []
+      for i in range(0, len(nodes), order):
+        parents.append(_Internal(separators[i:i + order - 1],
+                                 nodes[i:i + order]))
+        if i > 0:
+          parent_separators.append(separators[i - 1])
+      _fix_last_underflow(parents, parent_separators, order)
+      nodes, separators = parents, parent_separators
+    tree._root = nodes[0]
+    tree._size = len(array)
+    return tree
+
+  def add(self, item):
+    """Adds `item` to the tree.
+
+    Args:
+      item: An object to be added.
+    """
+    split = self._add(self._root, item)
+    if split is not None:
+      separator, right = split
+      self._root = _Internal([separator], [self._root, right])
+    self._size += 1
+
+  def remove(self, item):
+    """Removes the item and returns it.
+
+    Args:
+      item: An item to be removed.
+
+    Returns:
+      The removed item.
+
+    Raises:
+      NotInTreeError: If `item` is not in the tree.
+    """
+    removed = self._remove(self._root, item)
+    if removed is None:
+      raise binary_search_tree.NotInTreeError()
+    if isinstance(self._root, _Internal) and len(self._root.children) == 1:
+      self._root = self._root.children[0]
+    self._size -= 1
+    return removed[0]
+
+  def search(self, item):
+    """Searches for an the item and returns it.
+
+    Args:
+      item: An item to be found.
+
+    Returns:
+      The found item.
+
+    Raises:
+      NotInTreeError: If `item` is not in the tree.
+    """
+    leaf, idx = self._lower_bound(item)
+    if leaf is None or leaf.keys[idx] != item:
+      raise binary_search_tree.NotInTreeError()
+    return leaf.keys[idx]
+
+  def minimum(self):
+    """Returns the smallest item in the tree."""
+    if self._size == 0:
+      raise binary_search_tree.TreeEmptyError()
+    return self._first_leaf().keys[0]
+
+  def maximum(self):
+    """Returns the largest item in the tree."""
+    if self._size == 0:
+      raise binary_search_tree.TreeEmptyError()
+    return self._last_leaf().keys[-1]
+
+  def size(self):
+    """Returns the number of elements in the tree."""
+    return self._size
+
+  def in_order_walk(self):
+    """Returns ordered items in the tree.
+
+    Returns:
+      A list of items in the tree in increasing order.
+    """
+    return list(self)
+
+  def __iter__(self):
+    """Yields items in the tree in increasing order."""
+    leaf = self._first_leaf()
+    while leaf is not None:
+      yield from leaf.keys
+      leaf = leaf.next
+
+  def __reversed__(self):
+    """Yields items in the tree in decreasing order."""
+    leaf = self._last_leaf()
+    while leaf is not None:
+      yield from reversed(leaf.keys)
+      leaf = leaf.prev
+
+  def iter_range(self, lo, hi):
+    """Yields items `x` in the tree with `lo <= x <= hi` in increasing order."""
+    leaf, idx = self._lower_bound(lo)
+    while leaf is not None:
+      keys = leaf.keys
+      end = bisect.bisect_right(keys, hi, idx)
+      yield from keys[idx:end]
+      if end < len(keys):
+        return
+      leaf = leaf.next
+      idx = 0
+
+  def _first_leaf(self):
+    node = self._root
+    while isinstance(node, _Internal):
+      node = node.children[0]
+    return node
+
+  def _last_leaf(self):
+    node = self._root
+    while isinstance(node, _Internal):
+      node = node.children[-1]
+    return node
+
+  def _lower_bound(self, item):
+    """Finds the first item larger or equal to `item`.
+
+    Returns:
+      A tuple of the `_Leaf` and the index of the item in it, or `(None, None)`
+      if there is no such item.
+    """
+    node = self._root
+    while isinstance(node, _Internal):
+      node = node.children[bisect.bisect_left(node.keys, item)]
+    idx = bisect.bisect_left(node.keys, item)
+    if idx == len(node.keys):
+      # Equal items may continue in the next leaf.
+      node = node.next
+      idx = 0
+    if node is None:
+      return None, None
+    return node, idx
+
+  def _add(self, node, item):
+    """Adds `item` to the subtree under `node`.
+
+    Returns:
+      `None`, or a tuple of a separator and a new node split off to the right
+      of `node`, if `node` overflowed.
+    """
+    if isinstance(node, _Leaf):
+      keys = node.keys
+      keys.insert(bisect.bisect_right(keys, item), item)
+      if len(keys) <= self._order:
+        return None
+      middle = len(keys) // 2
+      right = _Leaf(keys[middle:])
+      del keys[middle:]
+      right.next = node.next
+      if right.next is not None:
+        right.next.prev = right
+      right.prev = node
+      node.next = right
+      return right.keys[0], right
+
+    idx = bisect.bisect_right(node.keys, item)
+    split = self._add(node.children[idx], item)
+    if split is None:
+      return None
+    separator, child = split
+    node.keys.insert(idx, separator)
+    node.children.insert(idx + 1, child)
+    if len(node.children) <= self._order:
+      return None
+    middle = len(node.keys) // 2
+    separator = node.keys[middle]
+    right = _Internal(node.keys[middle + 1:], node.children[middle + 1:])
+    del node.keys[middle:]
+    del node.children[middle + 1:]
+    return separator, right
+
+  def _remove(self, node, item):
+    """Removes `item` from the subtree under `node`.
+
+    Returns:
+      `None` if `item` is not in the subtree, otherwise a tuple containing the
+      removed item.
+    """
+    keys = node.keys
+    if isinstance(node, _Leaf):
+      idx = bisect.bisect_left(keys, item)
+      if idx < len(keys) and keys[idx] == item:
+        return (keys.pop(idx),)
+      return None
+
+    # Equal items can be in any child between these, if equal to separators.
+    first = bisect.bisect_left(keys, item)
+    last = bisect.bisect_right(keys, item)
+    for idx in range(first, last + 1):
+      removed = self._remove(node.children[idx], item)
+      if removed is not None:
+        if _length(node.children[idx]) < self._order // 2:
+          self._fix_underflow(node, idx)
+        return removed
+    return None
+
+  def _fix_underflow(self, parent, idx):
+    """Fixes too small `idx`-th child of `parent`.
+
+    The child borrows from a sibling if the sibling has enough elements or
+    children to spare, otherwise it is merged with the sibling.
+    """
+    child = parent.children[idx]
+    minimum = self._order // 2
+    is_leaf = isinstance(child, _Leaf)
+    if idx > 0 and _length(parent.children[idx - 1]) > minimum:
+      left = parent.children[idx - 1]
+      if is_leaf:
+        child.keys.insert(0, left.keys.pop())
+        parent.keys[idx - 1] = child.keys[0]
+      else:
+        child.keys.insert(0, parent.keys[idx - 1])
+        child.children.insert(0, left.children.pop())
+        parent.keys[idx - 1] = left.keys.pop()
+    elif (idx + 1 < len(parent.children) and
+          _length(parent.children[idx + 1]) > minimum):
+      right = parent.children[idx + 1]
+      if is_leaf:
+        child.keys.append(right.keys.pop(0))
+        parent.keys[idx] = right.keys[0]
+      else:
+        child.keys.append(parent.keys[idx])
+        child.children.append(right.children.pop(0))
+        parent.keys[idx] = right.keys.pop(0)
+    else:
+      if idx + 1 == len(parent.children):
+        idx -= 1  # Merge with the left sibling instead.
+      left, right = parent.children[idx], parent.children[idx + 1]
+      separator = parent.keys.pop(idx)
+      del parent.children[idx + 1]
+      if is_leaf:
+        left.keys.extend(right.keys)
+        left.next = right.next
+        if left.next is not None:
+          left.next.prev = left
+      else:
+        left.keys.append(separator)
+        left.keys.extend(right.keys)
+        left.children.extend(right.children)
+
+
+def _length(node):
+  """Returns the number of elements of a leaf, or children of internal node."""
+  if isinstance(node, _Leaf):
+    return len(node.keys)
+  return len(node.children)
+
+
+def _fix_last_underflow(nodes, separators, order):
+  """Moves elements into the last of bulk-loaded `nodes` if it is too small.
+
+  All nodes but the last are full. If the last one has fewer than `order // 2`
+  elements or children, the last two nodes are evenly redistributed.
+  """
+  if len(nodes) < 2:
+    return
+  prev, last = nodes[-2], nodes[-1]
+  if _length(last) >= order // 2:
+    return
+  if isinstance(last, _Leaf):
+    keys = prev.keys + last.keys
+    middle = len(keys) // 2
+    prev.keys, last.keys = keys[:middle], keys[middle:]
+    separators[-1] = last.keys[0]
+  else:
+    keys = prev.keys + [separators[-1]] + last.keys
+    children = prev.children + last.children
+    middle = len(children) // 2
+    prev.keys, prev.children = keys[:middle - 1], children[:middle]
+    separators[-1] = keys[middle - 1]
+    last.keys, last.children = keys[middle:], children[middle:]
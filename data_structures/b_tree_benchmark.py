@@ -0,0 +1,79 @@
+"""Benchmark of `BTree` against `BinarySearchTree` and `AVLTree`.
+
+For each size, builds the trees by adding random keys one by one, and measures
+the time of the additions, of searching for every key, of range scans, and of
+removing every key.
+
+Usage:
+  python -m data_structures.b_tree_benchmark --sizes=100000,1000000,10000000
+"""
+
+import random
+import time
+
+from absl import app
+from absl import flags
+
+from data_structures import b_tree
+from data_structures import binary_search_tree
+
+FLAGS = flags.FLAGS
+flags.DEFINE_list('sizes', ['100000', '1000000'], 'Numbers of keys.')
+flags.DEFINE_integer('order', 64, 'Order of the `BTree`.')
+flags.DEFINE_integer('num_scans', 1000, 'Number of range scans.')
+flags.DEFINE_integer('scan_length', 100, 'Number of keys in each range scan.')
+
+_TREES = [
+  ('BinarySearchTree', binary_search_tree.BinarySearchTree),
+  ('AVLTree', binary_search_tree.AVLTree),
+  ('BTree', lambda: b_tree.BTree(order=FLAGS.order)),
+]
+
+
+def _timed(fn):
+  """Returns seconds taken by calling `fn`."""
+  start = time.perf_counter()
+  fn()
+  return time.perf_counter() - start
+
+
+def _benchmark(make_tree, keys, scan_starts):
+  """Returns times of adding, searching, scanning and removing `keys`."""
+  tree = make_tree()
+
+  def add():
+    for key in keys:
+      tree.add(key)
+
+  def search():
+    for key in keys:
+      tree.search(key)
+
+  def scan():
+    for start in scan_starts:
+      for _ in tree.iter_range(start, start + FLAGS.scan_length - 1):
+        pass
+
+  def remove():
+    for key in keys:
+      tree.remove(key)
+
+  return [_timed(add), _timed(search), _timed(scan), _timed(remove)]
+
+
+def main(argv):
+  del argv  # Unused.
+  print(f'{"keys":>10s} {"tree":>18s} {"add":>8s} {"search":>8s} '
+        f'{"scan":>8s} {"remove":>8s}')
+  for size in map(int, FLAGS.sizes):
+    keys = list(range(size))
+    random.shuffle(keys)
+    scan_starts = [random.randrange(size) for _ in range(FLAGS.num_scans)]
+    for name, make_tree in _TREES:
+      times = _benchmark(make_tree, keys, scan_starts)
+      print(f'{size:10d} {name:>18s} ' +
+            ' '.join(f'{t:7.2f}s' for t in times))
+
+
+if __name__ == '__main__':
+  app.run(main)
@@ -0,0 +1,144 @@
+import random
+
+from absl.testing import absltest
+from absl.testing import parameterized
+
+from data_structures import b_tree
+from data_structures import binary_search_tree
+
+
+class BTreeTest(parameterized.TestCase):
+  """Tests for `BTree`."""
+
+  def test_empty_tree(self):
+    tree = b_tree.BTree()
+    self.assertEqual(0, tree.size())
+    self.assertListEqual([], tree.in_order_walk())
+    self.assertListEqual([], list(reversed(tree)))
+    with self.assertRaises(binary_search_tree.TreeEmptyError):
+      tree.minimum()
+    with self.assertRaises(binary_search_tree.TreeEmptyError):
+      tree.maximum()
+    with self.assertRaises(binary_search_tree.NotInTreeError):
+      tree.search(1)
+    with self.assertRaises(binary_search_tree.NotInTreeError):
+      tree.remove(1)
+
+  def test_order_too_small_raises(self):
+    with self.assertRaises(ValueError):
+      b_tree.BTree(order=3)
+
+  @parameterized.named_parameters(
+    [(f'order_{order}_size_{size}', order, size)
+     for order in [4, 5, 16] for size in [0, 1, 3, 4, 5, 17, 100, 300]])
+  def test_add_and_remove(self, order, size):
+    rng = random.Random(size)
+    items = [rng.randrange(size // 2 + 1) for _ in range(size)]
+    tree = b_tree.BTree(order=order)
+    for item in items:
+      tree.add(item)
+      self._assert_b_tree_property(tree)
+    self.assertEqual(size, tree.size())
+    self.assertListEqual(sorted(items), tree.in_order_walk())
+    self.assertListEqual(sorted(items, reverse=True), list(reversed(tree)))
+
+    rng.shuffle(items)
+    expected = sorted(items)
+    for item in items:
+      self.assertEqual(item, tree.remove(item))
+      expected.remove(item)
+      self._assert_b_tree_property(tree)
+      self.assertListEqual(expected, tree.in_order_walk())
+    self.assertEqual(0, tree.size())
+
+  @parameterized.named_parameters(
+    [(f'order_{order}_size_{size}', order, size)
+     for order in [4, 5, 64] for size in [0, 1, 2, 3, 10, 63, 64, 65, 1000]])
+  def test_from_array(self, order, size):
+    items = list(reversed(range(size)))
+    tree = b_tree.BTree.from_array(items, order=order)
+    self._assert_b_tree_property(tree)
+    self.assertEqual(size, tree.size())
+    self.assertListEqual(sorted(items), tree.in_order_walk())
+    for item in range(size):
+      tree.remove(item)
+      self._assert_b_tree_property(tree)
+    self.assertEqual(0, tree.size())
+
+  def test_from_array_requires_list(self):
+    with self.assertRaises(TypeError):
+      b_tree.BTree.from_array((1, 2, 3))
+
+  def test_search_minimum_maximum(self):
+    tree = b_tree.BTree.from_array(list(range(0, 200, 2)), order=4)
+    for item in range(0, 200, 2):
+      self.assertEqual(item, tree.search(item))
+    for item in [-1, 1, 99, 199, 200]:
+      with self.assertRaises(binary_search_tree.NotInTreeError):
+        tree.search(item)
+    self.assertEqual(0, tree.minimum())
+    self.assertEqual(198, tree.maximum())
+
+  def test_duplicates_spanning_leaves(self):
+    tree = b_tree.BTree(order=4)
+    for item in [1] * 10 + [0, 2] + [1] * 10:
+      tree.add(item)
+    self._assert_b_tree_property(tree)
+    self.assertEqual(1, tree.search(1))
+    self.assertListEqual([1] * 20, list(tree.iter_range(1, 1)))
+    for _ in range(20):
+      tree.remove(1)
+      self._assert_b_tree_property(tree)
+    self.assertListEqual([0, 2], tree.in_order_walk())
+
+  @parameterized.named_parameters(
+    ('all', -10, 1000, list(range(0, 100, 3))),
+    ('exact', 3, 30, list(range(3, 31, 3))),
+    ('between', 4, 29, list(range(6, 28, 3))),
+    ('single', 9, 9, [9]),
+    ('empty', 10, 11, []),
+    ('above', 100, 200, []),
+    ('reversed', 30, 3, []))
+  def test_iter_range(self, lo, hi, expected):
+    tree = b_tree.BTree.from_array(list(range(0, 100, 3)), order=4)
+    self.assertListEqual(expected, list(tree.iter_range(lo, hi)))
+
+  def _assert_b_tree_property(self, tree):
+    """Ensures the tree is a valid B+ tree with correctly linked leaves."""
+    order = tree._order
+    leaves = []
+
+    def check(node, lo, hi, is_root):
+      # Returns the depth of the leaves under `node`.
+      for key in node.keys:
+        if lo is not None:
+          self.assertLessEqual(lo, key)
+        if hi is not None:
+          self.assertLessEqual(key, hi)
+      self.assertListEqual(sorted(node.keys), node.keys)
+      if isinstance(node, b_tree._Leaf):
+        self.assertLessEqual(len(node.keys), order)
+        if not is_root:
+          self.assertGreaterEqual(len(node.keys), order // 2)
+        leaves.append(node)
+        return 0
+      self.assertLen(node.children, len(node.keys) + 1)
+      self.assertLessEqual(len(node.children), order)
+      self.assertGreaterEqual(len(node.children), 2 if is_root else order // 2)
+      bounds = [lo] + node.keys + [hi]
+      depths = {check(child, bounds[i], bounds[i + 1], False)
+                for i, child in enumerate(node.children)}
+      self.assertLen(depths, 1)
+      return depths.pop() + 1
+
+    check(tree._root, None, None, True)
+    for prev, leaf in zip(leaves, leaves[1:]):
+      self.assertIs(leaf, prev.next)
+      self.assertIs(prev, leaf.prev)
+    self.assertIsNone(leaves[0].prev)
+    self.assertIsNone(leaves[-1].next)
+    self.assertEqual(tree.size(), sum(len(leaf.keys) for leaf in leaves))
+
+
+if __name__ == '__main__':
+  absltest.main()
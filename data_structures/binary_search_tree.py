@@ -1,7 +1,11 @@
 """Implementation of a binary search tree."""
 
+import itertools
+import operator
 import random
 
+from data_structures import bloom_filter
+
 
 class TreeEmptyError(Exception):
   pass
@@ -12,32 +16,62 @@ class NotInTreeError(Exception):
 
 
 class _BinarySearchTreeNode(object):
-  """Representation of a node in a `BinarySearchTree`."""
+  """Representation of a node in a `BinarySearchTree`.
+
+  The attributes are declared in `__slots__`, so nodes do not carry a `__dict__`
+  and take a fixed, small amount of memory per item.
+  """
+
+  __slots__ = ('value', 'key', 'left', 'right', 'parent', 'size', 'count')
 
-  def __init__(self, value, left=None, right=None, parent=None):
+  def __init__(self, value, key, left=None, right=None, parent=None):
     self.value = value
+    self.key = key
     self.left = left
     self.right = right
     self.parent = parent
+    self.size = 1
+    self.count = 1
 
   def minimum(self):
-    if self.left is None:
-      return self
-    else:
-      return self.left.minimum()
+    node = self
+    while node.left is not None:
+      node = node.left
+    return node
 
   def maximum(self):
-    if self.right is None:
-      return self
-    else:
-      return self.right.maximum()
+    node = self
+    while node.right is not None:
+      node = node.right
+    return node
 
-  def in_order_walk(self, array):
-    if self.left is not None:
-      self.left.in_order_walk(array)
-    array.append(self.value)
+  def successor(self):
+    """Returns the next node in the in-order sequence, or `None`."""
     if self.right is not None:
-      self.right.in_order_walk(array)
+      return self.right.minimum()
+    node = self
+    while node.parent is not None and node is node.parent.right:
+      node = node.parent
+    return node.parent
+
+  def predecessor(self):
+    """Returns the previous node in the in-order sequence, or `None`."""
+    if self.left is not None:
+      return self.left.maximum()
+    node = self
+    while node.parent is not None and node is node.parent.left:
+      node = node.parent
+    return node.parent
+
+
+class _AVLTreeNode(_BinarySearchTreeNode):
+  """Representation of a node in an `AVLTree`."""
+
+  __slots__ = ('height',)
+
+  def __init__(self, value, key, left=None, right=None, parent=None):
+    super().__init__(value, key, left, right, parent)
+    self.height = 1
 
 
 class BinarySearchTree(object):
@@ -73,21 +107,119 @@ class BinarySearchTree(object):
   Binary search tree can be created form an array of elements it should contain.
   If the tree is created by adding the elements to the tree in random order, the
   expected complexity is `O(n * log(n))` and its height `O(log(n))`, but in the
-  worst case, these can be `O(n^2)` and `O(n)`, respectively.
+  worst case, these can be `O(n^2)` and `O(n)`, respectively. See `AVLTree` for
+  a variant which guarantees the `O(log(n))` height regardless of the order.
+  See `SplayTree` for a variant which adapts to skewed access patterns instead.
+
+  If the array is already sorted, a perfectly balanced tree is built directly in
+  `O(n)` time, without adding the elements one by one. See `from_sorted`.
+
+  Iteration.
+
+  The tree can be iterated in increasing or decreasing order, or over a range
+  of items. The iteration walks from a node to its successor using the parent
+  pointers, without recursion or an auxiliary stack. Iterating over `k` items
+  thus visits `O(height + k)` nodes, and allocates nothing proportional to the
+  size of the tree. The tree must not be modified while being iterated.
+
+  Order statistics.
+
+  Each node stores the size of its subtree, which is updated on the path to the
+  root whenever the tree changes. This allows finding the rank of an element,
+  the element of given rank, and the number of elements in a range by walking
+  down the tree once, in time corresponding to the height of the tree.
+
+  Multiset mode.
+
+  By default, an item equal to an item already in the tree is added as a new
+  node in the right subtree. In multiset mode, each node instead stores the
+  number of copies of its item: adding an equal item increments the count and
+  removing it decrements the count, deleting the node only when it reaches
+  zero. The height of the tree then depends only on the number of distinct
+  items. Iteration yields each item as many times as it was added.
+
+  Key function.
+
+  The tree can be given a `key` function, in which case items are ordered by
+  their keys, as in `sorted`. The key of each item is computed once when it is
+  added, and stored in its node next to the item, so walking down the tree only
+  compares the stored keys. Items can also be searched for and removed by their
+  key alone, using `search_key` and `remove_key`. Without a `key` function, the
+  items are their own keys. Items with equal keys are considered equal, and in
+  multiset mode, share a node holding the first of them.
+
+  Lookups without errors.
+
+  `search` and `remove` raise `NotInTreeError` for missing items, while
+  `contains`, `get` and `discard` report them by their return value instead.
+  Optionally, the tree keeps a `bloom_filter.BloomFilter` of the keys added,
+  which answers most lookups of missing keys without walking down the tree.
+  Since keys cannot be removed from the filter, removed keys remain as false
+  positives until the filter is rebuilt from the keys in the tree by
+  `rebuild_prefilter`. The observed rate of false positives is reported by
+  `prefilter_false_positive_rate`. Trees produced by `split`,
+  `join` and set operations of `AVLTree` do not have a prefilter.
+
+  Freezing.
+
+  Once a tree stops changing, `freeze` exports its items to an immutable
+  `static_search_index.StaticSearchIndex`, which stores the keys in contiguous
+  arrays instead of nodes, and answers searches, ranks and range counts faster.
+
+  Persistence.
+
+  A tree of fixed-width numbers can be written to a compact binary file by
+  `save`, and rebuilt from it by `load` in `O(n)` time. The file can also be
+  searched in place, without building anything, by memory-mapping it with
+  `sorted_array_file.MappedSortedArray`.
   """
 
-  def __init__(self):
+  _node_class = _BinarySearchTreeNode
+
+  def __init__(self, multiset=False, key=None, prefilter_capacity=None,
+               prefilter_error_rate=0.01):
+    """Constructs an empty tree.
+
+    Args:
+      multiset: A boolean. Whether equal items are stored as a count in a single
+        node.
+      key: A function of one argument returning the key by which an item is
+        ordered, or `None` to order the items themselves.
+      prefilter_capacity: The expected number of distinct keys, for which a
+        Bloom filter prefiltering lookups of missing keys is sized, or `None`
+        to not use a prefilter. The keys must be hashable.
+      prefilter_error_rate: A float in `(0, 1)`. The false positive rate of the
+        prefilter when holding `prefilter_capacity` keys.
+
+    Raises:
+      `ValueError` if `prefilter_capacity` is not positive, or
+        `prefilter_error_rate` is not in `(0, 1)`.
+    """
     self._root = None
     self._size = 0
+    self._multiset = multiset
+    self._key = key
+    self._prefilter = None
+    self._prefilter_capacity = prefilter_capacity
+    self._prefilter_error_rate = prefilter_error_rate
+    if prefilter_capacity is not None:
+      self._prefilter = bloom_filter.BloomFilter.for_capacity(
+        prefilter_capacity, prefilter_error_rate)
+    self._prefilter_true_negatives = 0
+    self._prefilter_false_positives = 0
 
   @classmethod
-  def from_array(cls, array, random_order=True):
+  def from_array(cls, array, random_order=True, **kwargs):
     """Constructs `BinarySearchTree` containing given data.
 
+    If `array` is sorted, the tree is built by `from_sorted` in `O(n)` time,
+    regardless of `random_order`.
+
     Args:
       array: A list of elements to be stored in the `BinarySearchTree`.
       random_order: A boolean. Whether the order of elements added from `array`
         is random or as ordered in `array`.
+      **kwargs: Keyword arguments passed to the constructor.
 
     Returns:
       A `BinarySearchTree`.
@@ -98,7 +230,12 @@ class BinarySearchTree(object):
     if not isinstance(array, list):
       raise TypeError(f'Provided data must be a list, but is {type(array)}.')
 
-    tree = BinarySearchTree()
+    tree = cls(**kwargs)
+    keys = tree._keys_of(array)
+    if _is_sorted(keys):
+      tree._fill_sorted(array, keys)
+      return tree
+
     if random_order:
       order = list(range(len(array)))
       random.shuffle(order)
@@ -107,35 +244,253 @@ class BinarySearchTree(object):
     else:
       for value in array:
         tree.add(value)
+    if tree._prefilter is not None:
+      tree.rebuild_prefilter()
     return tree
 
+  @classmethod
+  def from_sorted(cls, array, **kwargs):
+    """Constructs perfectly balanced `BinarySearchTree` from sorted data.
+
+    The middle element of the array becomes the root, and the two halves of the
+    array are recursively built into its left and right subtrees. Each node is
+    created exactly once, without walking down the tree, so the construction
+    takes `O(n)` time and the height of the tree is `O(log(n))`.
+
+    Args:
+      array: A list of elements sorted in non-decreasing order (of their keys,
+        if a `key` function is passed to the constructor).
+      **kwargs: Keyword arguments passed to the constructor.
+
+    Returns:
+      A `BinarySearchTree`.
+
+    Raises:
+      `TypeError` if `array` is not a list.
+      `ValueError` if `array` is not sorted.
+    """
+    if not isinstance(array, list):
+      raise TypeError(f'Provided data must be a list, but is {type(array)}.')
+    tree = cls(**kwargs)
+    keys = tree._keys_of(array)
+    if not _is_sorted(keys):
+      raise ValueError('Provided data must be sorted.')
+    tree._fill_sorted(array, keys)
+    return tree
+
+  @classmethod
+  def load(cls, path, **kwargs):
+    """Constructs `BinarySearchTree` from a file written by `save`.
+
+    The numbers are read as a sorted array and built into a perfectly balanced
+    tree by `from_sorted`, without shuffling or adding them one by one.
+
+    Args:
+      path: The path of the file written by `save`.
+      **kwargs: Keyword arguments passed to the constructor.
+
+    Returns:
+      A `BinarySearchTree`.
+
+    Raises:
+      `ValueError` if the file was not written by `save`.
+    """
+    # Imported here, as the file module imports this module.
+    from data_structures import sorted_array_file
+    return cls.from_sorted(sorted_array_file.read(path), **kwargs)
+
+  def _keys_of(self, array):
+    """Returns the list of keys of items in `array`."""
+    if self._key is None:
+      return array
+    return list(map(self._key, array))
+
+  def _fill_sorted(self, values, keys):
+    """Fills the empty tree with items `values` with sorted `keys`."""
+    counts = None
+    if self._multiset:
+      unique_values, unique_keys, counts = [], [], []
+      for value, key in zip(values, keys):
+        if unique_keys and key == unique_keys[-1]:
+          counts[-1] += 1
+        else:
+          unique_values.append(value)
+          unique_keys.append(key)
+          counts.append(1)
+      values, keys = unique_values, unique_keys
+    self._root = self._build_balanced(values, keys, counts, 0, len(values),
+                                      None)
+    self._size = _size(self._root)
+    if self._prefilter is not None:
+      self._fill_prefilter(keys)
+
+  def _build_balanced(self, values, keys, counts, start, end, parent):
+    """Builds balanced subtree of elements in `values[start:end]`.
+
+    Args:
+      values: A list of items, sorted by their keys.
+      keys: A list of keys of the items in `values`.
+      counts: A list of counts of the items in `values`, or `None` if each item
+        is present once.
+      start: An integer index of the first item of the subtree.
+      end: An integer index past the last item of the subtree.
+      parent: The `_BinarySearchTreeNode` to be the parent of the subtree.
+
+    Returns:
+      The `_BinarySearchTreeNode` which is the root of the subtree, or `None`
+      if the slice is empty.
+    """
+    if start >= end:
+      return None
+    middle = (start + end) // 2
+    node = self._node_class(values[middle], keys[middle], parent=parent)
+    if counts is not None:
+      node.count = counts[middle]
+    node.left = self._build_balanced(values, keys, counts, start, middle, node)
+    node.right = self._build_balanced(values, keys, counts, middle + 1, end,
+                                      node)
+    self._update(node)
+    return node
+
+  def _empty_like(self):
+    """Returns a new empty tree of the same class and configuration."""
+    return type(self)(multiset=self._multiset, key=self._key)
+
   def add(self, item):
     """Adds `item` to the tree.
 
     Args:
       item: An object to be added.
     """
+    key = item if self._key is None else self._key(item)
+    self._insert(item, key, None)
+
+  def _insert(self, item, key, start):
+    """Adds `item` with `key` to the subtree under `start`.
+
+    Args:
+      item: An object to be added.
+      key: The key of `item`.
+      start: The `_BinarySearchTreeNode` under which `item` belongs, or `None`
+        to start from the root.
+
+    Returns:
+      The `_BinarySearchTreeNode` holding the added `item`.
+    """
+    if self._multiset:
+      node = self._find(key, start)
+      if node is not None:
+        node.count += 1
+        self._size += 1
+        self._rebalance(node)
+        return node
+
     new_parent = None
-    node = self._root
+    node = self._root if start is None else start
 
     # Walk down the tree until hitting None instead of a _BinaryTreeNode.
     # The last node visited is the new parent node.
     while node is not None:
       new_parent = node
-      if item < new_parent.value:
+      if key < new_parent.key:
         node = node.left
       else:
         node = node.right
 
     # Create a new node and place it as child of the found new parent.
-    new_node = _BinarySearchTreeNode(item, parent=new_parent)
+    new_node = self._node_class(item, key, parent=new_parent)
+    if self._prefilter is not None:
+      self._prefilter.add(key)
     if new_parent is None:  # The tree was empty.
       self._root = new_node
-    elif item < new_parent.value:
+    elif key < new_parent.key:
       new_parent.left = new_node
     else:
       new_parent.right = new_node
     self._size += 1
+    self._rebalance(new_parent)
+    return new_node
+
+  def add_many(self, items):
+    """Adds all `items` to the tree.
+
+    The items are sorted by their keys first, and each of them is added by
+    walking down the tree from the place where the previous one was added,
+    rather than from the root. Walking down the part of the tree shared with the
+    previous item is thus skipped.
+
+    Args:
+      items: An iterable of objects to be added.
+    """
+    items = list(items)
+    finger = None
+    for key, idx in self._sorted_keys_and_indices(items):
+      finger = self._insert(items[idx], key, self._finger_start(finger, key))
+
+  def remove_many(self, items, default=None):
+    """Removes `items` from the tree, in a single pass over sorted `items`.
+
+    See `add_many` for how the walks down the tree are shared.
+
+    Args:
+      items: An iterable of items to be removed.
+      default: The value returned in place of items not in the tree.
+
+    Returns:
+      A list with the removed item, or `default`, for each of `items`.
+    """
+    items = list(items)
+    results = [default] * len(items)
+    finger = None
+    for key, idx in self._sorted_keys_and_indices(items):
+      node = self._find(key, self._finger_start(finger, key))
+      if node is None:
+        continue
+      # The predecessor stays in the tree, and its key is not larger than the
+      # keys still to be removed.
+      finger = node if node.count > 1 else node.predecessor()
+      results[idx] = self._remove_node(node)
+    return results
+
+  def search_many(self, items, default=None):
+    """Searches for `items` in a single pass over sorted `items`.
+
+    See `add_many` for how the walks down the tree are shared. Unlike `search`,
+    items not in the tree do not raise an error.
+
+    Args:
+      items: An iterable of items to be found.
+      default: The value returned in place of items not in the tree.
+
+    Returns:
+      A list with the found item, or `default`, for each of `items`.
+    """
+    items = list(items)
+    results = [default] * len(items)
+    finger = None
+    for key, idx in self._sorted_keys_and_indices(items):
+      if self._prefilter is not None and key not in self._prefilter:
+        self._prefilter_true_negatives += 1
+        continue
+      # Walk down the tree, keeping the last node with key not larger than
+      # `key` as the starting point for the next one.
+      node = self._finger_start(finger, key)
+      if node is None:
+        node = self._root
+      finger = None
+      while node is not None:
+        if key < node.key:
+          node = node.left
+        else:
+          finger = node
+          if key == node.key:
+            results[idx] = node.value
+            break
+          node = node.right
+      else:
+        if self._prefilter is not None:
+          self._prefilter_false_positives += 1
+    return results
 
   def remove(self, item):
     """Removes the item and returns it.
@@ -149,12 +504,38 @@ class BinarySearchTree(object):
     Raises:
       NotInTreeError: If `item` is not in the tree.
     """
-    node = self._search(item)
+    key = item if self._key is None else self._key(item)
+    return self._remove_node(self._search(key))
+
+  def remove_key(self, key):
+    """Removes an item with the given key and returns it.
 
-    # The found `node` is to be deleted.
+    Args:
+      key: A key of the item to be removed.
+
+    Returns:
+      The removed item.
+
+    Raises:
+      NotInTreeError: If no item with `key` is in the tree.
+    """
+    return self._remove_node(self._search(key))
+
+  def _remove_node(self, node):
+    """Removes one copy of the item in `node` and returns it."""
+    if node.count > 1:
+      node.count -= 1
+      self._size -= 1
+      self._rebalance(node)
+      return node.value
+
+    # The found `node` is to be deleted. The `lowest_changed` node is the lowest
+    # node whose subtree has changed, from which the tree is rebalanced.
     if node.left is None:
+      lowest_changed = node.parent
       self._reconnect_to_parent(node.parent, node, node.right)
     elif node.right is None:
+      lowest_changed = node.parent
       self._reconnect_to_parent(node.parent, node, node.left)
     else:  # The found `node` has both children.
       successor = node.right.minimum()
@@ -162,10 +543,12 @@ class BinarySearchTree(object):
       # left subtree.
       if successor == node.right:
         # If the successor is the right child is the easy case.
+        lowest_changed = successor
         node.right.left = node.left
         node.left.parent = node.right
         self._reconnect_to_parent(node.parent, node, node.right)
       else:
+        lowest_changed = successor.parent
         successor.left = node.left
         node.left.parent = successor
         successor.parent.left = successor.right
@@ -176,6 +559,7 @@ class BinarySearchTree(object):
         self._reconnect_to_parent(node.parent, node, successor)
 
     self._size -= 1
+    self._rebalance(lowest_changed)
     return node.value
 
   def search(self, item):
@@ -190,7 +574,93 @@ class BinarySearchTree(object):
     Raises:
       NotInTreeError: If `item` is not in the tree.
     """
-    return self._search(item).value
+    key = item if self._key is None else self._key(item)
+    return self._search(key).value
+
+  def search_key(self, key):
+    """Searches for an item with the given key and returns it.
+
+    Args:
+      key: A key of the item to be found.
+
+    Returns:
+      The found item.
+
+    Raises:
+      NotInTreeError: If no item with `key` is in the tree.
+    """
+    return self._search(key).value
+
+  def contains(self, item):
+    """Returns `True` if `item` is in the tree, `False` otherwise."""
+    return self._lookup(self._key_of(item)) is not None
+
+  __contains__ = contains
+
+  def get(self, item, default=None):
+    """Returns the item in the tree equal to `item`, or `default` if missing."""
+    node = self._lookup(self._key_of(item))
+    return default if node is None else node.value
+
+  def discard(self, item):
+    """Removes the item if it is in the tree.
+
+    Args:
+      item: An item to be removed.
+
+    Returns:
+      `True` if the item was removed, `False` if it was not in the tree.
+    """
+    node = self._lookup(self._key_of(item))
+    if node is None:
+      return False
+    self._remove_node(node)
+    return True
+
+  def prefilter_false_positive_rate(self):
+    """Returns the observed false positive rate of the prefilter.
+
+    This is the fraction of lookups of missing keys which passed the prefilter
+    and walked down the tree, or `0.0` if there were no such lookups.
+
+    Raises:
+      `ValueError` if the tree has no prefilter.
+    """
+    if self._prefilter is None:
+      raise ValueError('The tree has no prefilter.')
+    misses = self._prefilter_true_negatives + self._prefilter_false_positives
+    if misses == 0:
+      return 0.0
+    return self._prefilter_false_positives / misses
+
+  def rebuild_prefilter(self):
+    """Rebuilds the prefilter from the keys in the tree.
+
+    Drops the removed keys, which the prefilter lets through as false
+    positives, and resets the statistics of `prefilter_false_positive_rate`.
+    The new prefilter is sized for the larger of `prefilter_capacity` and the
+    number of distinct keys in the tree. Takes `O(n)` time.
+
+    Raises:
+      `ValueError` if the tree has no prefilter.
+    """
+    if self._prefilter is None:
+      raise ValueError('The tree has no prefilter.')
+    keys = []
+    node = None if self._root is None else self._root.minimum()
+    while node is not None:
+      keys.append(node.key)
+      node = node.successor()
+    self._fill_prefilter(keys)
+
+  def _fill_prefilter(self, keys):
+    """Replaces the prefilter with a new one holding `keys`."""
+    self._prefilter = bloom_filter.BloomFilter.for_capacity(
+      max(self._prefilter_capacity, len(keys)), self._prefilter_error_rate)
+    for key in keys:
+      self._prefilter.add(key)
+    self._prefilter_true_negatives = 0
+    self._prefilter_false_positives = 0
 
   def minimum(self):
     """Returns the smallest item in the tree."""
@@ -208,30 +678,373 @@ class BinarySearchTree(object):
     """Returns the number of elements in the tree."""
     return self._size
 
+  def rank(self, item):
+    """Returns the number of items in the tree smaller than `item`.
+
+    Args:
+      item: An object comparable with the items in the tree. Does not need to
+        be in the tree.
+    """
+    return self._rank(self._key_of(item), inclusive=False)
+
+  def select(self, k):
+    """Returns the `k`-th smallest item in the tree, counting from zero.
+
+    Args:
+      k: An integer in the range `[0, size())`.
+
+    Returns:
+      The item `x` for which `rank(x) <= k < rank(x) + count of x`.
+
+    Raises:
+      `IndexError` if `k` is out of range.
+    """
+    if not 0 <= k < self._size:
+      raise IndexError(f'Index {k} out of range for tree of size {self._size}.')
+    node = self._root
+    while True:
+      left_size = _size(node.left)
+      if k < left_size:
+        node = node.left
+      elif k < left_size + node.count:
+        return node.value
+      else:
+        k -= left_size + node.count
+        node = node.right
+
+  def count_range(self, lo, hi):
+    """Returns the number of items `x` in the tree with `lo <= x <= hi`."""
+    lo, hi = self._key_of(lo), self._key_of(hi)
+    if hi < lo:
+      return 0
+    return self._rank(hi, inclusive=True) - self._rank(lo, inclusive=False)
+
   def in_order_walk(self):
     """Returns ordered items in the tree.
 
     Returns:
       A list of items in the tree in increasing order.
     """
-    array = []
-    if self._root is None:
-      return array
-    self._root.in_order_walk(array)  # Modified in-place.
-    return array
+    return list(self)
+
+  def save(self, path, typecode='q'):
+    """Writes the items of the tree to a compact binary file.
+
+    The items must be numbers of a fixed width, and are written in increasing
+    order, as an array of raw numbers after a short header. The tree can be
+    rebuilt from the file by `load`, or the file can be searched without
+    loading it by `sorted_array_file.MappedSortedArray`.
+
+    Args:
+      path: The path of the file to be written.
+      typecode: The `array` typecode of the items, such as `'q'` for signed
+        64-bit integers or `'d'` for doubles.
+
+    Raises:
+      `ValueError` if the tree has a `key` function, since the file is sorted by
+        the items themselves, or if `typecode` is not numeric.
+      `TypeError` or `OverflowError` if the items do not fit `typecode`.
+    """
+    if self._key is not None:
+      raise ValueError('Only trees without a key function can be saved.')
+    # Imported here, as the file module imports this module.
+    from data_structures import sorted_array_file
+    sorted_array_file.write(path, self, typecode)
+
+  def freeze(self, use_numpy=None):
+    """Returns an immutable index of the items in the tree.
+
+    The index keeps the keys in contiguous arrays, and answers the lookups of
+    the tree which do not change it faster, as well as batches of lookups. See
+    `static_search_index.StaticSearchIndex`. Later changes to the tree do not
+    affect the index.
+
+    Args:
+      use_numpy: A boolean, whether the index stores the keys in NumPy arrays,
+        or `None` to use NumPy when it is available and the keys are numbers.
+
+    Returns:
+      A `static_search_index.StaticSearchIndex`.
+    """
+    values = []
+    keys = []
+    node = None if self._root is None else self._root.minimum()
+    while node is not None:
+      values.extend(itertools.repeat(node.value, node.count))
+      keys.extend(itertools.repeat(node.key, node.count))
+      node = node.successor()
+    if self._key is None:
+      values = None
+    # Imported here, as the index imports this module, and importing it on
+    # first use keeps importing this module cheap.
+    from data_structures import static_search_index
+    return static_search_index.StaticSearchIndex(
+      keys, values, key=self._key, use_numpy=use_numpy)
+
+  def __iter__(self):
+    """Yields items in the tree in increasing order."""
+    node = None if self._root is None else self._root.minimum()
+    while node is not None:
+      if node.count == 1:
+        yield node.value
+      else:
+        yield from itertools.repeat(node.value, node.count)
+      node = node.successor()
+
+  def __reversed__(self):
+    """Yields items in the tree in decreasing order."""
+    node = None if self._root is None else self._root.maximum()
+    while node is not None:
+      if node.count == 1:
+        yield node.value
+      else:
+        yield from itertools.repeat(node.value, node.count)
+      node = node.predecessor()
+
+  def iter_range(self, lo, hi):
+    """Yields items `x` in the tree with `lo <= x <= hi` in increasing order."""
+    hi = self._key_of(hi)
+    node = self._ceiling_node(self._key_of(lo), strict=False)
+    while node is not None and not hi < node.key:
+      if node.count == 1:
+        yield node.value
+      else:
+        yield from itertools.repeat(node.value, node.count)
+      node = node.successor()
+
+  def floor(self, item):
+    """Returns the largest item in the tree smaller or equal to `item`.
 
-  def _search(self, item):
+    Raises:
+      NotInTreeError: If there is no such item.
+    """
+    return self._value_or_raise(
+      self._floor_node(self._key_of(item), strict=False))
+
+  def ceiling(self, item):
+    """Returns the smallest item in the tree larger or equal to `item`.
+
+    Raises:
+      NotInTreeError: If there is no such item.
+    """
+    return self._value_or_raise(
+      self._ceiling_node(self._key_of(item), strict=False))
+
+  def predecessor(self, item):
+    """Returns the largest item in the tree strictly smaller than `item`.
+
+    Raises:
+      NotInTreeError: If there is no such item.
+    """
+    return self._value_or_raise(
+      self._floor_node(self._key_of(item), strict=True))
+
+  def successor(self, item):
+    """Returns the smallest item in the tree strictly larger than `item`.
+
+    Raises:
+      NotInTreeError: If there is no such item.
+    """
+    return self._value_or_raise(
+      self._ceiling_node(self._key_of(item), strict=True))
+
+  def _key_of(self, item):
+    """Returns the key of `item`."""
+    return item if self._key is None else self._key(item)
+
+  def _search(self, key):
     """Implements `search` method returning wrapping `_BinarySearchTreeNode`."""
+    node = self._lookup(key)
+    if node is None:
+      raise NotInTreeError()
+    return node
+
+  def _lookup(self, key):
+    """Returns a `_BinarySearchTreeNode` with `key`, or `None`.
+
+    Unlike `_find`, consults the prefilter first if there is one.
+    """
+    if self._prefilter is None:
+      return self._find(key)
+    if key not in self._prefilter:
+      self._prefilter_true_negatives += 1
+      return None
+    node = self._find(key)
+    if node is None:
+      self._prefilter_false_positives += 1
+    return node
+
+  def _find(self, key, start=None):
+    """Returns a `_BinarySearchTreeNode` with `key`, or `None`.
+
+    Args:
+      key: The key to be found.
+      start: The `_BinarySearchTreeNode` under which `key` belongs, or `None`
+        to start from the root.
+    """
+    node = self._root if start is None else start
+    while node is not None and key != node.key:
+      if key < node.key:
+        node = node.left
+      else:
+        node = node.right
+    return node
+
+  def _sorted_keys_and_indices(self, items):
+    """Returns a list of `(key, index)` pairs for `items` sorted by keys."""
+    keys = self._keys_of(items)
+    order = sorted(range(len(items)), key=keys.__getitem__)
+    return [(keys[i], i) for i in order]
+
+  def _finger_start(self, finger, key):
+    """Returns the node to start walking down the tree from to reach `key`.
+
+    Walks up from `finger` to the lowest ancestor whose subtree spans `key`.
+    A subtree rooted in a left child spans the keys up to the key of its parent,
+    and all keys of the subtree are at least the key of `finger`.
+
+    Args:
+      finger: A `_BinarySearchTreeNode` with key smaller or equal to `key`, or
+        `None`.
+      key: The key to be reached.
+
+    Returns:
+      A `_BinarySearchTreeNode`, or `None` to start from the root.
+    """
+    node = finger
+    while node is not None and node.parent is not None:
+      if node is node.parent.left and key < node.parent.key:
+        return node
+      node = node.parent
+    return None
+
+  def _rank(self, key, inclusive):
+    """Returns the number of items with smaller (or equal) key than `key`."""
+    rank = 0
+    node = self._root
+    while node is not None:
+      if inclusive:
+        go_left = key < node.key
+      else:
+        go_left = not node.key < key
+      if go_left:
+        node = node.left
+      else:
+        rank += _size(node.left) + node.count
+        node = node.right
+    return rank
+
+  def _rebalance(self, node):
+    """Restores the invariants of the tree after its structure has changed.
+
+    The plain binary search tree does not maintain any invariants beyond the
+    binary search tree property and the subtree sizes, which are updated on the
+    path from `node` to the root. Subclasses override it to also restore
+    balance.
+
+    Args:
+      node: The lowest `_BinarySearchTreeNode` whose subtree has changed, or
+        `None`.
+    """
+    while node is not None:
+      self._update(node)
+      node = node.parent
+
+  def _update(self, node):
+    """Recomputes data stored in `node` from its children."""
+    node.size = node.count + _size(node.left) + _size(node.right)
+
+  def _rotate_left(self, node):
+    """Rotates the subtree under `node` to the left.
+
+    The right child of `node` takes its place, and `node` becomes the left child
+    of its former right child. The in-order sequence of items is preserved.
+
+    Args:
+      node: A `_BinarySearchTreeNode` with a right child.
+
+    Returns:
+      The `_BinarySearchTreeNode` which is the new root of the subtree.
+    """
+    pivot = node.right
+    node.right = pivot.left
+    if pivot.left is not None:
+      pivot.left.parent = node
+    self._reconnect_to_parent(node.parent, node, pivot)
+    pivot.left = node
+    node.parent = pivot
+    self._update(node)
+    self._update(pivot)
+    return pivot
+
+  def _rotate_right(self, node):
+    """Rotates the subtree under `node` to the right.
+
+    Mirror image of `_rotate_left`.
+
+    Args:
+      node: A `_BinarySearchTreeNode` with a left child.
+
+    Returns:
+      The `_BinarySearchTreeNode` which is the new root of the subtree.
+    """
+    pivot = node.left
+    node.left = pivot.right
+    if pivot.right is not None:
+      pivot.right.parent = node
+    self._reconnect_to_parent(node.parent, node, pivot)
+    pivot.right = node
+    node.parent = pivot
+    self._update(node)
+    self._update(pivot)
+    return pivot
+
+  def _floor_node(self, key, strict):
+    """Returns the last node with key smaller (or equal) to `key`.
+
+    Args:
+      key: An object comparable with the keys in the tree.
+      strict: A boolean. Whether nodes with key equal to `key` are excluded.
+
+    Returns:
+      A `_BinarySearchTreeNode`, or `None` if there is no such node.
+    """
+    result = None
     node = self._root
-    while node is not None and item != node.value:
-      if item < node.value:
+    while node is not None:
+      if key < node.key or (strict and not node.key < key):
         node = node.left
       else:
+        result = node
         node = node.right
+    return result
+
+  def _ceiling_node(self, key, strict):
+    """Returns the first node with key larger (or equal) to `key`.
+
+    Args:
+      key: An object comparable with the keys in the tree.
+      strict: A boolean. Whether nodes with key equal to `key` are excluded.
 
+    Returns:
+      A `_BinarySearchTreeNode`, or `None` if there is no such node.
+    """
+    result = None
+    node = self._root
+    while node is not None:
+      if node.key < key or (strict and not key < node.key):
+        node = node.right
+      else:
+        result = node
+        node = node.left
+    return result
+
+  @staticmethod
+  def _value_or_raise(node):
+    """Returns value of `node`, raising `NotInTreeError` if it is `None`."""
     if node is None:
       raise NotInTreeError()
-    return node
+    return node.value
 
   def _reconnect_to_parent(self, parent, old_child, new_child):
     """Replaces `old_child` with `new_child` as a child of `parent`.
@@ -257,3 +1070,653 @@ class BinarySearchTree(object):
         parent.right = new_child
       if new_child is not None:
         new_child.parent = parent
+
+
+class AVLTree(BinarySearchTree):
+  """Implementation of a self-balancing binary search tree (AVL tree).
+
+  An AVL tree is a binary search tree with the same operations as
+  `BinarySearchTree`, which additionally guarantees its height to be
+  `O(log(n))`, regardless of the order in which elements are added or removed.
+
+  AVL property.
+
+  Each node stores the height of its subtree. A tree satisfies the *AVL
+  property* if for each node, the heights of its left and right subtrees differ
+  by at most one. A tree with this property has height at most
+  `1.44 * log(n)`.
+
+  Rebalancing.
+
+  Addition and removal are realized as in `BinarySearchTree`. Afterwards, the
+  path from the changed node to the root is walked, updating the heights. If a
+  node violating the AVL property is found, it is fixed by one or two rotations.
+  A rotation changes the shape of the tree in constant time, while preserving
+  the in-order sequence of the elements.
+
+  As a result, addition, removal and searching all take `O(log(n))` time in the
+  worst case, and creating the tree from an array takes `O(n * log(n))` time
+  even without adding the elements in random order.
+
+  Split and join.
+
+  Two AVL trees, with all items of one smaller or equal to all items of the
+  other, can be joined together with a node between them in time proportional
+  to the difference of their heights. The smaller tree is hung at the right
+  height of the spine of the larger tree, and the path above it is rebalanced.
+  Splitting a tree by an item walks down the tree once and joins the subtrees
+  left behind on either side, which takes `O(log(n))` time.
+
+  The set operations `union`, `intersection` and `difference` are built on
+  these. For the root item of one tree, both trees are split by the item, the
+  operation is applied recursively to the smaller and the larger parts, and the
+  results are joined back. This takes `O(m * log(n / m + 1))` time for trees of
+  sizes `m <= n`, rather than `O(m * log(n))` for adding the items one by one.
+  All these operations reuse the nodes of the trees they consume, which are
+  left empty.
+  """
+
+  _node_class = _AVLTreeNode
+
+  @classmethod
+  def from_array(cls, array, random_order=False, **kwargs):
+    """Constructs `AVLTree` containing given data.
+
+    Unlike for `BinarySearchTree`, the elements are by default added in the
+    order of `array`, as the tree stays balanced regardless of the order, and
+    shuffling them first would only take time.
+
+    Args:
+      array: A list of elements to be stored in the `AVLTree`.
+      random_order: A boolean. Whether the order of elements added from `array`
+        is random or as ordered in `array`.
+      **kwargs: Keyword arguments passed to the constructor.
+
+    Returns:
+      An `AVLTree`.
+
+    Raises:
+      `TypeError` if `array` is not a list.
+    """
+    return super().from_array(array, random_order=random_order, **kwargs)
+
+  def split(self, item):
+    """Splits the tree into items smaller than `item`, and the rest.
+
+    This tree is left empty, and its nodes are reused in the returned trees.
+
+    Args:
+      item: An object comparable with the items in the tree.
+
+    Returns:
+      A tuple of two `AVLTree`s, the first with items smaller than `item` and
+      the second with items larger or equal to `item`.
+    """
+    left, right = self._split(self._take_root(), self._key_of(item),
+                              inclusive=False)
+    self._root = None  # May have been set by rotations while splitting.
+    return self._wrap(left), self._wrap(right)
+
+  @classmethod
+  def join(cls, left, right):
+    """Joins two trees into one.
+
+    Both trees are left empty, and their nodes are reused in the returned tree.
+
+    Args:
+      left: An `AVLTree`.
+      right: An `AVLTree` with all items larger or equal to items in `left`.
+
+    Returns:
+      An `AVLTree` with items of both trees.
+
+    Raises:
+      `ValueError` if some item in `right` is smaller than an item in `left`, or
+      if the trees differ in multiset mode or key function.
+    """
+    left._check_compatible(right)
+    if (left._root is not None and right._root is not None and
+        right._root.minimum().key < left._root.maximum().key):
+      raise ValueError('Items of `right` must not be smaller than of `left`.')
+    if (left._multiset and left._root is not None and right._root is not None
+        and left._root.maximum().key == right._root.minimum().key):
+      # Move the count of the smallest item in `right` to the equal largest item
+      # in `left`, so that each item is still stored in a single node.
+      first = right._root.minimum()
+      last = left._root.maximum()
+      last.count += first.count
+      left._size += first.count
+      left._rebalance(last)
+      first.count = 1
+      right.remove_key(first.key)
+      right._size = _size(right._root)
+    root = left._join2(left._take_root(), right._take_root())
+    left._root = None  # May have been set by rotations while joining.
+    return left._wrap(root)
+
+  def union(self, other):
+    """Returns a tree with the items of this and the `other` tree.
+
+    Both trees are left empty, and their nodes are reused in the returned tree.
+    In multiset mode, the counts of equal items are added.
+
+    Args:
+      other: An `AVLTree`.
+
+    Returns:
+      An `AVLTree`.
+
+    Raises:
+      `ValueError` if the trees differ in multiset mode or key function.
+    """
+    self._check_compatible(other)
+    first, second = self._take_root(), other._take_root()
+    if _size(second) < _size(first):
+      first, second = second, first
+    root = self._union(first, second)
+    self._root = None  # May have been set by rotations.
+    return self._wrap(root)
+
+  def intersection(self, other):
+    """Returns a tree with the items of this tree equal to an item in `other`.
+
+    Both trees are left empty, and the nodes of this tree are reused in the
+    returned tree. In multiset mode, the smaller of the counts is kept.
+
+    Args:
+      other: An `AVLTree`.
+
+    Returns:
+      An `AVLTree`.
+
+    Raises:
+      `ValueError` if the trees differ in multiset mode or key function.
+    """
+    self._check_compatible(other)
+    root = self._intersection(self._take_root(), other._take_root())
+    self._root = None  # May have been set by rotations.
+    return self._wrap(root)
+
+  def difference(self, other):
+    """Returns a tree with the items of this tree not equal to items in `other`.
+
+    Both trees are left empty, and the nodes of this tree are reused in the
+    returned tree. In multiset mode, the counts in `other` are subtracted.
+
+    Args:
+      other: An `AVLTree`.
+
+    Returns:
+      An `AVLTree`.
+
+    Raises:
+      `ValueError` if the trees differ in multiset mode or key function.
+    """
+    self._check_compatible(other)
+    root = self._difference(self._take_root(), other._take_root())
+    self._root = None  # May have been set by rotations.
+    return self._wrap(root)
+
+  def _check_compatible(self, other):
+    """Raises `ValueError` if `other` cannot be combined with this tree."""
+    if self._multiset != other._multiset:
+      raise ValueError('Trees must be both in multiset mode, or both not.')
+    if self._key is not other._key:
+      raise ValueError('Trees must have the same key function.')
+
+  def _take_root(self):
+    """Detaches and returns the root of the tree, leaving the tree empty."""
+    root = self._root
+    self._root = None
+    self._size = 0
+    return root
+
+  def _wrap(self, root):
+    """Returns a new tree like this one, holding the subtree under `root`."""
+    tree = self._empty_like()
+    tree._root = root
+    tree._size = _size(root)
+    return tree
+
+  def _union(self, first, second):
+    """Returns the root of union of two detached subtrees."""
+    if first is None:
+      return second
+    if second is None:
+      return first
+    key = first.key
+    first_less, first_equal, first_greater = self._split3(first, key)
+    second_less, second_equal, second_greater = self._split3(second, key)
+    if self._multiset:
+      if second_equal is not None:
+        first_equal.count += second_equal.count
+        self._update(first_equal)
+      equal = first_equal
+    else:
+      equal = self._join2(first_equal, second_equal)
+    less = self._union(first_less, second_less)
+    greater = self._union(first_greater, second_greater)
+    return self._join3(less, equal, greater)
+
+  def _intersection(self, first, second):
+    """Returns the root of intersection of two detached subtrees."""
+    if first is None or second is None:
+      return None
+    key = first.key
+    first_less, first_equal, first_greater = self._split3(first, key)
+    second_less, second_equal, second_greater = self._split3(second, key)
+    if second_equal is None:
+      equal = None
+    else:
+      equal = first_equal
+      if self._multiset:
+        equal.count = min(equal.count, second_equal.count)
+        self._update(equal)
+    less = self._intersection(first_less, second_less)
+    greater = self._intersection(first_greater, second_greater)
+    return self._join3(less, equal, greater)
+
+  def _difference(self, first, second):
+    """Returns the root of difference of two detached subtrees."""
+    if first is None or second is None:
+      return first
+    key = first.key
+    first_less, first_equal, first_greater = self._split3(first, key)
+    second_less, second_equal, second_greater = self._split3(second, key)
+    if second_equal is None:
+      equal = first_equal
+    elif self._multiset and first_equal.count > second_equal.count:
+      equal = first_equal
+      equal.count -= second_equal.count
+      self._update(equal)
+    else:
+      equal = None
+    less = self._difference(first_less, second_less)
+    greater = self._difference(first_greater, second_greater)
+    return self._join3(less, equal, greater)
+
+  def _split(self, node, key, inclusive):
+    """Splits detached subtree under `node` by `key`.
+
+    Args:
+      node: The root `_AVLTreeNode` of a detached subtree, or `None`.
+      key: An object comparable with the keys in the tree.
+      inclusive: A boolean. Whether items with key equal to `key` go to the
+        first part.
+
+    Returns:
+      A tuple of roots of two detached subtrees, the first with items with keys
+      smaller (or equal, if `inclusive`) than `key`, and the second with the
+      rest.
+    """
+    if node is None:
+      return None, None
+    left, right = _detach(node)
+    if node.key < key or (inclusive and not key < node.key):
+      less, greater = self._split(right, key, inclusive)
+      return self._join(left, node, less), greater
+    else:
+      less, greater = self._split(left, key, inclusive)
+      return less, self._join(greater, node, right)
+
+  def _split3(self, node, key):
+    """Splits detached subtree into keys smaller, equal and larger."""
+    less, rest = self._split(node, key, inclusive=False)
+    equal, greater = self._split(rest, key, inclusive=True)
+    return less, equal, greater
+
+  def _split_last(self, node):
+    """Removes the largest node from detached subtree under `node`.
+
+    Returns:
+      A tuple of the root of the remaining detached subtree, and the removed
+      detached `_AVLTreeNode`.
+    """
+    left, right = _detach(node)
+    if right is None:
+      return left, node
+    rest, last = self._split_last(right)
+    return self._join(left, node, rest), last
+
+  def _join(self, left, node, right):
+    """Joins two detached subtrees with a detached node between them.
+
+    Args:
+      left: The root `_AVLTreeNode` of a detached subtree, or `None`.
+      node: A detached `_AVLTreeNode` without children. Its item must be larger
+        or equal to items in `left`, and smaller or equal to items in `right`.
+      right: The root `_AVLTreeNode` of a detached subtree, or `None`.
+
+    Returns:
+      The root `_AVLTreeNode` of the joined detached subtree.
+    """
+    left_height, right_height = _height(left), _height(right)
+    if left_height > right_height + 1:
+      # Walk down the right spine of `left` to a subtree of similar height as
+      # `right`, and replace it by `node` with the two as its children.
+      parent = left
+      while _height(parent.right) > right_height + 1:
+        parent = parent.right
+      _set_children(node, parent.right, right)
+      parent.right = node
+      node.parent = parent
+      self._update(node)
+      return self._rebalance(parent)
+    elif right_height > left_height + 1:
+      parent = right
+      while _height(parent.left) > left_height + 1:
+        parent = parent.left
+      _set_children(node, left, parent.left)
+      parent.left = node
+      node.parent = parent
+      self._update(node)
+      return self._rebalance(parent)
+    else:
+      _set_children(node, left, right)
+      self._update(node)
+      return node
+
+  def _join2(self, left, right):
+    """Joins two detached subtrees, returning the root of the result."""
+    if left is None:
+      return right
+    if right is None:
+      return left
+    rest, last = self._split_last(left)
+    return self._join(rest, last, right)
+
+  def _join3(self, left, middle, right):
+    """Joins three detached subtrees, returning the root of the result."""
+    if middle is None:
+      return self._join2(left, right)
+    rest, last = self._split_last(middle)
+    return self._join(self._join2(left, rest), last, right)
+
+  def _rebalance(self, node):
+    """Restores the AVL property on the path from `node` to the root.
+
+    Returns:
+      The `_AVLTreeNode` at the top of the path, or `None` if `node` is `None`.
+    """
+    top = None
+    while node is not None:
+      self._update(node)
+      balance = _height(node.left) - _height(node.right)
+      if balance > 1:
+        if _height(node.left.left) < _height(node.left.right):
+          self._rotate_left(node.left)
+        node = self._rotate_right(node)
+      elif balance < -1:
+        if _height(node.right.right) < _height(node.right.left):
+          self._rotate_right(node.right)
+        node = self._rotate_left(node)
+      top = node
+      node = node.parent
+    return top
+
+  def _update(self, node):
+    """Recomputes the height and size of `node` from its children."""
+    super()._update(node)
+    node.height = 1 + max(_height(node.left), _height(node.right))
+
+
+class SplayTree(BinarySearchTree):
+  """Implementation of a self-adjusting binary search tree (splay tree).
+
+  A splay tree is a binary search tree with the same operations as
+  `BinarySearchTree`, which moves the items it accesses to the root. Items
+  accessed often thus stay near the root, and are found in a few steps, which
+  suits skewed workloads where a few items get most of the lookups.
+
+  Splaying.
+
+  Moving a node to the root is called *splaying*, and is realized by rotations
+  which move the node up by two levels at a time, roughly halving the depth of
+  every node on its path. The tree does not store any balance information, and
+  its height can be `O(n)`, but any sequence of `m` operations takes
+  `O((m + n) * log(n))` time, so each operation takes `O(log(n))` amortized
+  time. Moreover, accessing an item which was accessed `k` operations ago takes
+  `O(log(k))` amortized time.
+
+  Splayed operations.
+
+  Addition and removal splay the parent of the added or removed node, and in
+  multiset mode, the node whose count changed. Searching for an item, as well
+  as `contains`, `get` and the lookup performed by `remove` and `discard`,
+  splays the found node on one in every `splay_interval` lookups on average,
+  sampled at random. When the item is missing, the last node visited is
+  splayed instead, so that missed lookups also pay for themselves.
+
+  Splaying a node costs several times more than walking down to it, so
+  splaying on every lookup makes the tree slower than `AVLTree` even when a few
+  items get most of the lookups. The items looked up often are also sampled
+  often, and get near the root after a few splays, while the other lookups only
+  walk down the tree. The amortized bounds above hold for the splayed lookups,
+  and the lookups in between take time proportional to the depth of the item.
+  With `splay_interval=1`, every lookup splays.
+
+  Other queries, such as order statistics, neighbors, and iteration, do not
+  change the tree. Batch operations splay only through additions and removals.
+  Note that, unlike in the other trees, lookups change the shape of the tree,
+  so the tree cannot be safely read from multiple threads at once.
+  """
+
+  def __init__(self, multiset=False, key=None, prefilter_capacity=None,
+               prefilter_error_rate=0.01, splay_interval=128):
+    """Constructs an empty tree.
+
+    Args:
+      multiset: A boolean. Whether equal items are stored as a count in a single
+        node.
+      key: A function of one argument returning the key by which an item is
+        ordered, or `None` to order the items themselves.
+      prefilter_capacity: The expected number of distinct keys, for which a
+        Bloom filter prefiltering lookups of missing keys is sized, or `None`
+        to not use a prefilter. The keys must be hashable.
+      prefilter_error_rate: A float in `(0, 1)`. The false positive rate of the
+        prefilter when holding `prefilter_capacity` keys.
+      splay_interval: A positive integer. The average number of lookups per
+        splayed lookup.
+
+    Raises:
+      `ValueError` if `prefilter_capacity` or `splay_interval` is not positive,
+        or `prefilter_error_rate` is not in `(0, 1)`.
+    """
+    if splay_interval < 1:
+      raise ValueError(
+        f'Splay interval must be positive, but is {splay_interval}.')
+    super().__init__(multiset=multiset, key=key,
+                     prefilter_capacity=prefilter_capacity,
+                     prefilter_error_rate=prefilter_error_rate)
+    self._splay_interval = splay_interval
+    self._countdown = self._draw_countdown()
+
+  def _draw_countdown(self):
+    """Returns the number of lookups until the next splayed one.
+
+    The number is drawn uniformly at random with mean `splay_interval`, so that
+    the splayed lookups do not fall on the same positions of a periodic
+    workload.
+    """
+    return random.randrange(1, 2 * self._splay_interval)
+
+  def _lookup(self, key):
+    """Returns a `_BinarySearchTreeNode` with `key`, or `None`.
+
+    On one in every `splay_interval` lookups on average, splays the found node,
+    or the last node visited if `key` is missing.
+    """
+    if self._prefilter is not None and key not in self._prefilter:
+      self._prefilter_true_negatives += 1
+      return None
+    self._countdown -= 1
+    if self._countdown:
+      node = self._root
+      while node is not None and key != node.key:
+        if key < node.key:
+          node = node.left
+        else:
+          node = node.right
+    else:
+      self._countdown = self._draw_countdown()
+      last = None
+      node = self._root
+      while node is not None and key != node.key:
+        last = node
+        if key < node.key:
+          node = node.left
+        else:
+          node = node.right
+      if node is not None:
+        self._splay(node)
+      elif last is not None:
+        self._splay(last)
+    if node is None and self._prefilter is not None:
+      self._prefilter_false_positives += 1
+    return node
+
+  def _rebalance(self, node):
+    """Updates the sizes on the path from `node` to the root, and splays it."""
+    super()._rebalance(node)
+    if node is not None:
+      self._splay(node)
+
+  def _splay(self, node):
+    """Moves `node` to the root by rotations.
+
+    Each step moves `node` up by two levels, restructuring it together with its
+    parent and grandparent at once, rather than by two separate rotations. For
+    nodes `x`, `p` and `g`, and subtrees `A` to `D` in order, the zig-zig step
+    turns `g(p(x(A, B), C), D)` into `x(A, p(B, g(C, D)))`, and the zig-zag step
+    turns `g(A, p(x(B, C), D))` into `x(g(A, B), p(C, D))`, and similarly for
+    their mirror images. The links and sizes are updated inline, without
+    `_update`, and `x` takes over the size of `g`.
+    """
+    parent = node.parent
+    while parent is not None:
+      grandparent = parent.parent
+      if grandparent is None:  # Zig.
+        self._rotate_up(node)
+        return
+      ancestor = grandparent.parent
+      size = grandparent.size
+      if node is parent.left:
+        b = node.right
+        if parent is grandparent.left:  # Zig-zig.
+          c = parent.right
+          d = grandparent.right
+          grandparent.left = c
+          if c is not None:
+            c.parent = grandparent
+          grandparent.size = (grandparent.count + (c.size if c else 0) +
+                              (d.size if d else 0))
+          parent.left = b
+          if b is not None:
+            b.parent = parent
+          parent.right = grandparent
+          grandparent.parent = parent
+          parent.size = parent.count + (b.size if b else 0) + grandparent.size
+          node.right = parent
+          parent.parent = node
+        else:  # Zig-zag.
+          a = grandparent.left
+          c = node.left
+          grandparent.right = c
+          if c is not None:
+            c.parent = grandparent
+          grandparent.size = (grandparent.count + (a.size if a else 0) +
+                              (c.size if c else 0))
+          parent.left = b
+          if b is not None:
+            b.parent = parent
+          parent.size = size - grandparent.size - node.count
+          node.left = grandparent
+          grandparent.parent = node
+          node.right = parent
+          parent.parent = node
+      else:
+        b = node.left
+        if parent is grandparent.right:  # Zig-zig.
+          c = parent.left
+          d = grandparent.left
+          grandparent.right = c
+          if c is not None:
+            c.parent = grandparent
+          grandparent.size = (grandparent.count + (c.size if c else 0) +
+                              (d.size if d else 0))
+          parent.right = b
+          if b is not None:
+            b.parent = parent
+          parent.left = grandparent
+          grandparent.parent = parent
+          parent.size = parent.count + (b.size if b else 0) + grandparent.size
+          node.left = parent
+          parent.parent = node
+        else:  # Zig-zag.
+          a = grandparent.right
+          c = node.right
+          grandparent.left = c
+          if c is not None:
+            c.parent = grandparent
+          grandparent.size = (grandparent.count + (a.size if a else 0) +
+                              (c.size if c else 0))
+          parent.right = b
+          if b is not None:
+            b.parent = parent
+          parent.size = size - grandparent.size - node.count
+          node.right = grandparent
+          grandparent.parent = node
+          node.left = parent
+          parent.parent = node
+      node.size = size
+      node.parent = ancestor
+      if ancestor is None:
+        self._root = node
+      elif ancestor.left is grandparent:
+        ancestor.left = node
+      else:
+        ancestor.right = node
+      parent = ancestor
+
+  def _rotate_up(self, node):
+    """Rotates `node` above its parent."""
+    if node is node.parent.left:
+      self._rotate_right(node.parent)
+    else:
+      self._rotate_left(node.parent)
+
+
+def _is_sorted(array):
+  """Returns `True` if `array` is sorted in non-decreasing order."""
+  return not any(map(operator.lt, itertools.islice(array, 1, None), array))
+
+
+def _detach(node):
+  """Detaches `node` from its parent and children, and returns the children."""
+  left, right = node.left, node.right
+  node.left = node.right = node.parent = None
+  if left is not None:
+    left.parent = None
+  if right is not None:
+    right.parent = None
+  return left, right
+
+
+def _set_children(node, left, right):
+  """Sets `left` and `right` as children of `node`."""
+  node.left = left
+  node.right = right
+  if left is not None:
+    left.parent = node
+  if right is not None:
+    right.parent = node
+
+
+def _size(node):
+  """Returns the size of subtree under `node`, which can be `None`."""
+  return 0 if node is None else node.size
+
+
+def _height(node):
+  """Returns the height of subtree under `node`, which can be `None`."""
+  return 0 if node is None else node.height
@@ -0,0 +1,65 @@
+"""Benchmark of memory used by nodes of `BinarySearchTree`.
+
+Compares the bytes per key of trees built from `--num_keys` integer keys, using
+the `__slots__` node layout against the same nodes carrying a `__dict__`.
+
+Usage:
+  python -m data_structures.binary_search_tree_benchmark --num_keys=1000000
+"""
+
+import gc
+import tracemalloc
+
+from absl import app
+from absl import flags
+
+from data_structures import binary_search_tree
+
+FLAGS = flags.FLAGS
+flags.DEFINE_integer('num_keys', 10**6, 'Number of keys in the tree.')
+
+
+class _DictNode(binary_search_tree._BinarySearchTreeNode):
+  """Node with a `__dict__`, as the layout without `__slots__`."""
+
+
+class _DictNodeBinarySearchTree(binary_search_tree.BinarySearchTree):
+  _node_class = _DictNode
+
+
+class _DictAVLNode(binary_search_tree._AVLTreeNode):
+  """Node with a `__dict__`, as the layout without `__slots__`."""
+
+
+class _DictNodeAVLTree(binary_search_tree.AVLTree):
+  _node_class = _DictAVLNode
+
+
+def _bytes_per_key(tree_class, keys):
+  """Returns bytes allocated per key when building a tree of `keys`.
+
+  The keys are allocated before measuring, so only the tree is accounted for.
+  """
+  gc.collect()
+  tracemalloc.start()
+  tree = tree_class.from_sorted(keys)
+  allocated, _ = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  assert tree.size() == len(keys)
+  return allocated / len(keys)
+
+
+def main(argv):
+  del argv  # Unused.
+  keys = list(range(FLAGS.num_keys))
+  for name, tree_class in [
+      ('BinarySearchTree, __dict__ nodes', _DictNodeBinarySearchTree),
+      ('BinarySearchTree, __slots__ nodes',
+       binary_search_tree.BinarySearchTree),
+      ('AVLTree, __dict__ nodes', _DictNodeAVLTree),
+      ('AVLTree, __slots__ nodes', binary_search_tree.AVLTree)]:
+    print(f'{name:35s} {_bytes_per_key(tree_class, keys):7.1f} bytes per key')
+
+
+if __name__ == '__main__':
+  app.run(main)
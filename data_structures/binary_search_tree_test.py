@@ -1,4 +1,8 @@
+import collections
+import dataclasses
 import itertools
+import random
+from unittest import mock
 
 from absl.testing import absltest
 from absl.testing import parameterized
@@ -39,6 +43,43 @@ def test_tree():
   return tree
 
 
+def _height(node):
+  """Returns the height of subtree under `node`."""
+  if node is None:
+    return 0
+  return 1 + max(_height(node.left), _height(node.right))
+
+
+def _size(node):
+  """Returns the number of nodes in subtree under `node`."""
+  if node is None:
+    return 0
+  return 1 + _size(node.left) + _size(node.right)
+
+
+def _assert_valid(test, tree):
+  """Ensures parent pointers, order and sizes in `tree` are consistent."""
+
+  def check(node, lo, hi):
+    if node is None:
+      return 0
+    if lo is not None:
+      test.assertLessEqual(lo, node.key)
+    if hi is not None:
+      test.assertLessEqual(node.key, hi)
+    for child in [node.left, node.right]:
+      if child is not None:
+        test.assertIs(node, child.parent)
+    size = (node.count + check(node.left, lo, node.key) +
+            check(node.right, node.key, hi))
+    test.assertEqual(size, node.size)
+    return size
+
+  if tree._root is not None:
+    test.assertIsNone(tree._root.parent)
+  test.assertEqual(tree.size(), check(tree._root, None, None))
+
+
 class TestUtilTest(parameterized.TestCase):
 
   def test_test_tree_as_expected(self):
@@ -140,6 +181,747 @@ class BinarySearchTreeTest(parameterized.TestCase):
     with self.assertRaises(TypeError):
       binary_search_tree.BinarySearchTree.from_array(tuple(1, 2, 3))
 
+  @parameterized.named_parameters(
+    [(str(i), i) for i in [0, 1, 2, 3, 7, 8, 100]])
+  def test_from_sorted(self, num_elements):
+    array = list(range(num_elements))
+    tree = binary_search_tree.BinarySearchTree.from_sorted(array)
+    self.assertEqual(num_elements, tree.size())
+    self.assertListEqual(array, tree.in_order_walk())
+    self.assertLessEqual(_height(tree._root), num_elements.bit_length())
+
+  def test_from_sorted_with_duplicates(self):
+    tree = binary_search_tree.BinarySearchTree.from_sorted([1, 1, 1, 2, 2])
+    self.assertListEqual([1, 1, 1, 2, 2], tree.in_order_walk())
+    self.assertEqual(1, tree.search(1))
+
+  def test_from_sorted_raises(self):
+    with self.assertRaises(TypeError):
+      binary_search_tree.BinarySearchTree.from_sorted((1, 2, 3))
+    with self.assertRaises(ValueError):
+      binary_search_tree.BinarySearchTree.from_sorted([1, 3, 2])
+
+  def test_from_array_sorted_is_balanced(self):
+    tree = binary_search_tree.BinarySearchTree.from_array(
+      list(range(5000)), random_order=False)
+    self.assertListEqual(list(range(5000)), tree.in_order_walk())
+    self.assertLessEqual(_height(tree._root), 13)
+
+  def test_sizes_maintained(self):
+    tree = test_tree()
+    self._assert_sizes(tree)
+    for value in [12, 2, 18, 15]:
+      tree.remove(value)
+      self._assert_sizes(tree)
+    tree.add(13)
+    self._assert_sizes(tree)
+
+  def test_rank(self):
+    tree = test_tree()
+    for i, value in enumerate([2, 5, 9, 12, 15, 17, 18, 19]):
+      self.assertEqual(i, tree.rank(value))
+      self.assertEqual(i + 1, tree.rank(value + 0.5))
+    self.assertEqual(0, tree.rank(-1))
+    self.assertEqual(8, tree.rank(100))
+
+  def test_rank_with_duplicates(self):
+    tree = binary_search_tree.AVLTree.from_array([3, 1, 3, 3, 2, 3, 4])
+    self.assertEqual(2, tree.rank(3))
+    self.assertEqual(6, tree.rank(4))
+
+  def test_select(self):
+    tree = test_tree()
+    for i, value in enumerate([2, 5, 9, 12, 15, 17, 18, 19]):
+      self.assertEqual(value, tree.select(i))
+    with self.assertRaises(IndexError):
+      tree.select(8)
+    with self.assertRaises(IndexError):
+      tree.select(-1)
+
+  @parameterized.named_parameters(
+    ('all', 0, 100, 8), ('exact', 5, 17, 5), ('between', 6, 16, 3),
+    ('single', 9, 9, 1), ('empty', 10, 11, 0), ('reversed', 17, 5, 0))
+  def test_count_range(self, lo, hi, expected):
+    tree = test_tree()
+    self.assertEqual(expected, tree.count_range(lo, hi))
+
+  def test_iteration(self):
+    tree = test_tree()
+    self.assertListEqual([2, 5, 9, 12, 15, 17, 18, 19], list(tree))
+    self.assertListEqual([19, 18, 17, 15, 12, 9, 5, 2], list(reversed(tree)))
+    empty = binary_search_tree.BinarySearchTree()
+    self.assertListEqual([], list(empty))
+    self.assertListEqual([], list(reversed(empty)))
+
+  @parameterized.named_parameters(
+    ('all', 0, 100, [2, 5, 9, 12, 15, 17, 18, 19]),
+    ('exact', 5, 17, [5, 9, 12, 15, 17]),
+    ('between', 6, 16, [9, 12, 15]),
+    ('single', 9, 9, [9]),
+    ('empty', 10, 11, []),
+    ('reversed', 17, 5, []))
+  def test_iter_range(self, lo, hi, expected):
+    tree = test_tree()
+    self.assertListEqual(expected, list(tree.iter_range(lo, hi)))
+
+  def test_iteration_is_lazy(self):
+    tree = test_tree()
+    iterator = tree.iter_range(9, 18)
+    self.assertEqual(9, next(iterator))
+    self.assertEqual(12, next(iterator))
+
+  def test_degenerate_tree_does_not_recurse(self):
+    tree = binary_search_tree.BinarySearchTree()
+    for value in range(2000):
+      tree.add(value)
+    self.assertEqual(0, tree.minimum())
+    self.assertEqual(1999, tree.maximum())
+    self.assertListEqual(list(range(2000)), tree.in_order_walk())
+    self.assertListEqual(list(reversed(range(2000))), list(reversed(tree)))
+
+  @parameterized.named_parameters(
+    ('present', 12, 12, 12, 9, 15),
+    ('absent', 13, 12, 15, 12, 15),
+    ('minimum', 2, 2, 2, None, 5),
+    ('maximum', 19, 19, 19, 18, None),
+    ('below', 1, None, 2, None, 2),
+    ('above', 20, 19, None, 19, None))
+  def test_neighbors(self, item, floor, ceiling, predecessor, successor):
+    tree = test_tree()
+    for method, expected in [(tree.floor, floor), (tree.ceiling, ceiling),
+                             (tree.predecessor, predecessor),
+                             (tree.successor, successor)]:
+      if expected is None:
+        with self.assertRaises(binary_search_tree.NotInTreeError):
+          method(item)
+      else:
+        self.assertEqual(expected, method(item))
+
+  def _assert_sizes(self, tree):
+    """Ensures subtree sizes stored in nodes are correct."""
+
+    def check(node):
+      if node is None:
+        return 0
+      self.assertEqual(1 + check(node.left) + check(node.right), node.size)
+      return node.size
+
+    self.assertEqual(tree.size(), check(tree._root))
+
+
+class MultisetTest(parameterized.TestCase):
+
+  @parameterized.named_parameters(
+    ('bst', binary_search_tree.BinarySearchTree),
+    ('avl', binary_search_tree.AVLTree),
+    ('splay', binary_search_tree.SplayTree))
+  def test_duplicates_share_node(self, tree_class):
+    tree = tree_class(multiset=True)
+    for item in [3, 1, 3, 3, 2, 3, 1]:
+      tree.add(item)
+    self.assertEqual(7, tree.size())
+    self.assertEqual(3, _size(tree._root))
+    self.assertListEqual([1, 1, 2, 3, 3, 3, 3], tree.in_order_walk())
+    self.assertListEqual([3, 3, 3, 3, 2, 1, 1], list(reversed(tree)))
+    self.assertListEqual([2, 3, 3, 3, 3], list(tree.iter_range(2, 5)))
+
+  def test_remove_decrements_count(self):
+    tree = binary_search_tree.BinarySearchTree(multiset=True)
+    for item in [2, 1, 2, 2]:
+      tree.add(item)
+    self.assertEqual(2, tree.remove(2))
+    self.assertEqual(3, tree.size())
+    self.assertListEqual([1, 2, 2], tree.in_order_walk())
+    tree.remove(2)
+    tree.remove(2)
+    self.assertListEqual([1], tree.in_order_walk())
+    self.assertEqual(1, _size(tree._root))
+    with self.assertRaises(binary_search_tree.NotInTreeError):
+      tree.remove(2)
+
+  def test_order_statistics(self):
+    tree = binary_search_tree.AVLTree(multiset=True)
+    for item in [5, 1, 5, 3, 5, 3]:
+      tree.add(item)
+    self.assertEqual(0, tree.rank(1))
+    self.assertEqual(1, tree.rank(3))
+    self.assertEqual(3, tree.rank(5))
+    self.assertListEqual([1, 3, 3, 5, 5, 5], [tree.select(k) for k in range(6)])
+    self.assertEqual(5, tree.count_range(2, 5))
+
+  def test_from_sorted(self):
+    tree = binary_search_tree.AVLTree.from_sorted([1, 1, 2, 3, 3, 3],
+                                                  multiset=True)
+    self.assertEqual(6, tree.size())
+    self.assertEqual(3, _size(tree._root))
+    self.assertListEqual([1, 1, 2, 3, 3, 3], tree.in_order_walk())
+    tree.add(2)
+    self.assertEqual(2, tree.count_range(2, 2))
+
+  def test_from_array(self):
+    tree = binary_search_tree.BinarySearchTree.from_array([2, 1, 2],
+                                                          multiset=True)
+    self.assertEqual(2, _size(tree._root))
+    self.assertListEqual([1, 2, 2], tree.in_order_walk())
+
+
+@dataclasses.dataclass(order=True)
+class _Record(object):
+  id: int
+  name: str = dataclasses.field(compare=False, default='')
+
+
+class KeyFunctionTest(parameterized.TestCase):
+
+  @parameterized.named_parameters(
+    ('bst', binary_search_tree.BinarySearchTree),
+    ('avl', binary_search_tree.AVLTree),
+    ('splay', binary_search_tree.SplayTree))
+  def test_ordered_by_key(self, tree_class):
+    tree = tree_class(key=lambda record: record.id)
+    for i in [5, 2, 8, 1]:
+      tree.add(_Record(i, str(i)))
+    self.assertListEqual([1, 2, 5, 8], [record.id for record in tree])
+    self.assertEqual('5', tree.search_key(5).name)
+    self.assertEqual('5', tree.search(_Record(5)).name)
+    self.assertEqual(2, tree.rank(_Record(5)))
+    self.assertEqual('8', tree.remove_key(8).name)
+    self.assertEqual('1', tree.remove(_Record(1)).name)
+    self.assertListEqual([2, 5], [record.id for record in tree])
+    with self.assertRaises(binary_search_tree.NotInTreeError):
+      tree.search_key(8)
+    with self.assertRaises(binary_search_tree.NotInTreeError):
+      tree.remove_key(8)
+
+  def test_key_computed_once_per_item(self):
+    calls = []
+
+    def key(item):
+      calls.append(item)
+      return -item
+
+    tree = binary_search_tree.AVLTree(key=key)
+    for item in range(100):
+      tree.add(item)
+    self.assertLen(calls, 100)
+    self.assertListEqual(list(reversed(range(100))), list(tree))
+    self.assertEqual(50, tree.search_key(-50))
+    self.assertLen(calls, 100)
+
+  def test_reversed_key(self):
+    tree = binary_search_tree.BinarySearchTree.from_array([3, 1, 2],
+                                                          key=lambda x: -x)
+    self.assertListEqual([3, 2, 1], list(tree))
+    self.assertEqual(3, tree.minimum())
+    self.assertEqual(2, tree.floor(2))
+    self.assertEqual(3, tree.predecessor(2))
+    self.assertListEqual([3, 2], list(tree.iter_range(3, 2)))
+    self.assertEqual(2, tree.count_range(3, 2))
+
+  def test_from_sorted_by_key(self):
+    array = ['a', 'bb', 'cc', 'ddd']
+    tree = binary_search_tree.AVLTree.from_sorted(array, key=len, multiset=True)
+    self.assertListEqual(['a', 'bb', 'bb', 'ddd'], list(tree))
+    self.assertEqual(4, tree.size())
+    with self.assertRaises(ValueError):
+      binary_search_tree.AVLTree.from_sorted(list(reversed(array)), key=len)
+
+  def test_set_operations_keep_key(self):
+    first = binary_search_tree.AVLTree.from_array([1, 2, 3], key=lambda x: -x)
+    second = binary_search_tree.AVLTree.from_array([3, 4], key=first._key)
+    union = first.union(second)
+    self.assertListEqual([4, 3, 3, 2, 1], list(union))
+    left, right = union.split(3)
+    self.assertListEqual([4], list(left))
+    self.assertListEqual([3, 3, 2, 1], list(right))
+    with self.assertRaises(ValueError):
+      binary_search_tree.AVLTree.join(
+        binary_search_tree.AVLTree(key=len), binary_search_tree.AVLTree())
+
+
+class BatchOperationsTest(parameterized.TestCase):
+
+  @parameterized.named_parameters(
+    [(f'{name}_{size}', tree_class, size)
+     for name, tree_class in [('bst', binary_search_tree.BinarySearchTree),
+                              ('avl', binary_search_tree.AVLTree),
+                              ('splay', binary_search_tree.SplayTree)]
+     for size in [0, 1, 10, 200]])
+  def test_add_many(self, tree_class, size):
+    rng = random.Random(size)
+    initial = [rng.randrange(1000) for _ in range(size)]
+    batch = [rng.randrange(1000) for _ in range(size)]
+    tree = tree_class.from_array(list(initial))
+    tree.add_many(batch)
+    self.assertEqual(2 * size, tree.size())
+    self.assertListEqual(sorted(initial + batch), tree.in_order_walk())
+    _assert_valid(self, tree)
+
+  def test_add_many_multiset(self):
+    tree = binary_search_tree.AVLTree.from_array([1, 3, 5], multiset=True)
+    tree.add_many([5, 3, 3, 2, 5])
+    self.assertListEqual([1, 2, 3, 3, 3, 5, 5, 5], tree.in_order_walk())
+    self.assertEqual(4, _size(tree._root))
+    _assert_valid(self, tree)
+
+  @parameterized.named_parameters(
+    ('bst', binary_search_tree.BinarySearchTree),
+    ('avl', binary_search_tree.AVLTree),
+    ('splay', binary_search_tree.SplayTree))
+  def test_remove_many(self, tree_class):
+    rng = random.Random(0)
+    items = [rng.randrange(100) for _ in range(200)]
+    tree = tree_class.from_array(list(items))
+    batch = [rng.randrange(120) for _ in range(100)]
+    removed = tree.remove_many(batch, default='missing')
+    expected = sorted(items)
+    for item, result in zip(batch, removed):
+      if item in expected:
+        self.assertEqual(item, result)
+        expected.remove(item)
+      else:
+        self.assertEqual('missing', result)
+    self.assertListEqual(expected, tree.in_order_walk())
+    self.assertEqual(len(expected), tree.size())
+    _assert_valid(self, tree)
+
+  def test_remove_many_multiset(self):
+    tree = binary_search_tree.AVLTree.from_array([1, 2, 2, 2, 3],
+                                                 multiset=True)
+    self.assertListEqual([2, 2, None, 3, 2],
+                         tree.remove_many([2, 2, 4, 3, 2]))
+    self.assertListEqual([1], tree.in_order_walk())
+
+  @parameterized.named_parameters(
+    ('bst', binary_search_tree.BinarySearchTree),
+    ('avl', binary_search_tree.AVLTree),
+    ('splay', binary_search_tree.SplayTree))
+  def test_search_many(self, tree_class):
+    tree = tree_class.from_array(list(range(0, 100, 2)))
+    batch = [50, 3, 0, 98, 99, -1, 50, 2]
+    self.assertListEqual([50, None, 0, 98, None, None, 50, 2],
+                         tree.search_many(batch))
+    self.assertListEqual([-1], tree_class().search_many([1], default=-1))
+
+  def test_search_many_with_key(self):
+    tree = binary_search_tree.AVLTree.from_array(['a', 'bb', 'dddd'], key=len)
+    self.assertListEqual(['dddd', None, 'a'],
+                         tree.search_many(['xxxx', 'ccc', 'z']))
+
+
+class LookupWithoutErrorsTest(parameterized.TestCase):
+
+  @parameterized.named_parameters(
+    ('no_prefilter', None), ('prefilter', 100))
+  def test_contains_get_discard(self, prefilter_capacity):
+    tree = binary_search_tree.AVLTree(prefilter_capacity=prefilter_capacity)
+    for item in [12, 5, 2, 9, 18]:
+      tree.add(item)
+    self.assertTrue(tree.contains(9))
+    self.assertIn(9, tree)
+    self.assertFalse(tree.contains(10))
+    self.assertNotIn(10, tree)
+    self.assertEqual(9, tree.get(9))
+    self.assertIsNone(tree.get(10))
+    self.assertEqual('missing', tree.get(10, 'missing'))
+    self.assertTrue(tree.discard(9))
+    self.assertFalse(tree.discard(9))
+    self.assertFalse(tree.contains(9))
+    self.assertEqual(4, tree.size())
+    self.assertListEqual([2, 5, 12, 18], tree.in_order_walk())
+
+  def test_prefilter_has_no_false_negatives(self):
+    tree = binary_search_tree.BinarySearchTree.from_array(
+      list(range(0, 2000, 2)), prefilter_capacity=1000)
+    tree.add_many(range(2000, 3000, 2))
+    for item in range(0, 3000, 2):
+      self.assertEqual(item, tree.search(item))
+    self.assertListEqual(list(range(0, 3000, 2)),
+                         tree.search_many(range(0, 3000, 2)))
+
+  def test_prefilter_false_positive_rate(self):
+    tree = binary_search_tree.BinarySearchTree.from_array(
+      list(range(1000)), prefilter_capacity=1000, prefilter_error_rate=0.01)
+    self.assertEqual(0.0, tree.prefilter_false_positive_rate())
+    for item in range(1000, 11000):
+      self.assertFalse(tree.contains(item))
+    self.assertGreater(0.03, tree.prefilter_false_positive_rate())
+    with self.assertRaises(binary_search_tree.NotInTreeError):
+      tree.remove(-1)
+
+  def test_invalid_prefilter_arguments_raise(self):
+    with self.assertRaises(ValueError):
+      binary_search_tree.BinarySearchTree(prefilter_capacity=0)
+    with self.assertRaises(ValueError):
+      binary_search_tree.BinarySearchTree(prefilter_capacity=10,
+                                          prefilter_error_rate=1.0)
+
+  def test_prefilter_false_positive_rate_raises_without_prefilter(self):
+    with self.assertRaises(ValueError):
+      binary_search_tree.BinarySearchTree().prefilter_false_positive_rate()
+
+  def test_removed_items_are_not_found(self):
+    tree = binary_search_tree.BinarySearchTree(prefilter_capacity=10)
+    tree.add(1)
+    tree.remove(1)
+    self.assertFalse(tree.contains(1))
+    self.assertEqual(1.0, tree.prefilter_false_positive_rate())
+
+  @parameterized.named_parameters(
+    ('bst', binary_search_tree.BinarySearchTree),
+    ('avl', binary_search_tree.AVLTree),
+    ('splay', binary_search_tree.SplayTree))
+  def test_rebuild_prefilter_drops_removed_keys(self, tree_class):
+    tree = tree_class.from_array(list(range(1000)), prefilter_capacity=1000)
+    for item in range(0, 1000, 2):
+      tree.remove(item)
+    for item in range(0, 1000, 2):
+      self.assertFalse(tree.contains(item))
+    self.assertLess(0.9, tree.prefilter_false_positive_rate())
+    tree.rebuild_prefilter()
+    self.assertEqual(0.0, tree.prefilter_false_positive_rate())
+    for item in range(0, 1000, 2):
+      self.assertFalse(tree.contains(item))
+    self.assertGreater(0.05, tree.prefilter_false_positive_rate())
+    for item in range(1, 1000, 2):
+      self.assertEqual(item, tree.search(item))
+    _assert_valid(self, tree)
+
+  def test_prefilter_grows_with_built_trees(self):
+    array = list(range(10000))
+    for tree in [
+        binary_search_tree.AVLTree.from_sorted(array, prefilter_capacity=10),
+        binary_search_tree.AVLTree.from_array(array[::-1],
+                                              prefilter_capacity=10)]:
+      for item in range(10000, 20000):
+        self.assertFalse(tree.contains(item))
+      self.assertGreater(0.03, tree.prefilter_false_positive_rate())
+
+  def test_rebuild_prefilter_raises_without_prefilter(self):
+    with self.assertRaises(ValueError):
+      binary_search_tree.BinarySearchTree().rebuild_prefilter()
+
+
+class AVLTreeTest(parameterized.TestCase):
+
+  def test_from_array_adds_in_array_order(self):
+    array = [5, 2, 8, 1, 9, 3, 7, 0, 6, 4]
+    expected = binary_search_tree.AVLTree()
+    for item in array:
+      expected.add(item)
+    for _ in range(5):
+      tree = binary_search_tree.AVLTree.from_array(list(array))
+      self.assertListEqual(self._pre_order(expected._root),
+                           self._pre_order(tree._root))
+
+  @parameterized.named_parameters(
+    (f'case_{i}', list(perm)) for i, perm in
+    enumerate(itertools.permutations(range(5))))
+  def test_add_keeps_balance(self, array):
+    tree = binary_search_tree.AVLTree()
+    for item in array:
+      tree.add(item)
+      self._assert_avl_property(tree)
+    self.assertListEqual([0, 1, 2, 3, 4], tree.in_order_walk())
+
+  @parameterized.named_parameters(
+    (f'case_{i}', list(perm)) for i, perm in
+    enumerate(itertools.permutations(range(5))))
+  def test_remove_keeps_balance(self, array):
+    tree = binary_search_tree.AVLTree.from_array(list(range(5)))
+    expected = list(range(5))
+    for item in array:
+      self.assertEqual(item, tree.remove(item))
+      expected.remove(item)
+      self._assert_avl_property(tree)
+      self.assertListEqual(expected, tree.in_order_walk())
+    self.assertEqual(0, tree.size())
+
+  def test_sorted_input_gives_logarithmic_height(self):
+    tree = binary_search_tree.AVLTree.from_array(list(range(1000)),
+                                                 random_order=False)
+    self.assertLessEqual(tree._root.height, 14)
+    self.assertEqual(1000, tree.size())
+    self._assert_avl_property(tree)
+
+  def test_duplicates(self):
+    tree = binary_search_tree.AVLTree()
+    for item in [3, 1, 3, 3, 2, 3]:
+      tree.add(item)
+    self._assert_avl_property(tree)
+    self.assertListEqual([1, 2, 3, 3, 3, 3], tree.in_order_walk())
+    tree.remove(3)
+    tree.remove(3)
+    self.assertListEqual([1, 2, 3, 3], tree.in_order_walk())
+
+  def test_search_minimum_maximum(self):
+    tree = binary_search_tree.AVLTree.from_array([5, 3, 8, 1, 4])
+    self.assertEqual(4, tree.search(4))
+    self.assertEqual(1, tree.minimum())
+    self.assertEqual(8, tree.maximum())
+    with self.assertRaises(binary_search_tree.NotInTreeError):
+      tree.search(2)
+
+  def test_from_array_returns_avl_tree(self):
+    tree = binary_search_tree.AVLTree.from_array([1, 2])
+    self.assertIsInstance(tree, binary_search_tree.AVLTree)
+
+  @parameterized.named_parameters(
+    [(str(i), i) for i in [0, 1, 2, 3, 7, 8, 100]])
+  def test_from_sorted_keeps_avl_property(self, num_elements):
+    tree = binary_search_tree.AVLTree.from_sorted(list(range(num_elements)))
+    self._assert_avl_property(tree)
+    tree.add(num_elements // 2)
+    tree.remove(0)
+    self._assert_avl_property(tree)
+
+  @parameterized.named_parameters(
+    [(f'at_{item}', item) for item in [-1, 0, 3, 10, 11, 19, 20, 25]])
+  def test_split(self, item):
+    tree = binary_search_tree.AVLTree.from_array(list(range(0, 20)) + [10, 10])
+    left, right = tree.split(item)
+    self.assertEqual(0, tree.size())
+    expected = sorted(list(range(0, 20)) + [10, 10])
+    self.assertListEqual([x for x in expected if x < item], list(left))
+    self.assertListEqual([x for x in expected if x >= item], list(right))
+    self._assert_avl_property(left)
+    self._assert_avl_property(right)
+    self.assertEqual(left.size(), len(list(left)))
+
+  @parameterized.named_parameters(
+    ('empty', 0, 0), ('left_empty', 0, 10), ('right_empty', 10, 0),
+    ('same', 10, 10), ('left_larger', 100, 3), ('right_larger', 3, 100))
+  def test_join(self, left_size, right_size):
+    left = binary_search_tree.AVLTree.from_array(list(range(left_size)))
+    right = binary_search_tree.AVLTree.from_array(
+      list(range(left_size, left_size + right_size)))
+    tree = binary_search_tree.AVLTree.join(left, right)
+    self.assertEqual(0, left.size())
+    self.assertEqual(0, right.size())
+    self.assertListEqual(list(range(left_size + right_size)), list(tree))
+    self.assertEqual(left_size + right_size, tree.size())
+    self._assert_avl_property(tree)
+
+  def test_join_raises(self):
+    with self.assertRaises(ValueError):
+      binary_search_tree.AVLTree.join(
+        binary_search_tree.AVLTree.from_array([1, 5]),
+        binary_search_tree.AVLTree.from_array([3, 7]))
+    with self.assertRaises(ValueError):
+      binary_search_tree.AVLTree.join(
+        binary_search_tree.AVLTree(multiset=True), binary_search_tree.AVLTree())
+
+  def test_join_multiset_merges_equal_items(self):
+    left = binary_search_tree.AVLTree.from_array([1, 2, 2], multiset=True)
+    right = binary_search_tree.AVLTree.from_array([2, 3], multiset=True)
+    tree = binary_search_tree.AVLTree.join(left, right)
+    self.assertListEqual([1, 2, 2, 2, 3], list(tree))
+    self.assertEqual(3, _size(tree._root))
+    self.assertEqual(5, tree.size())
+
+  @parameterized.named_parameters(
+    ('disjoint', [1, 2, 3], [4, 5]),
+    ('overlapping', [1, 3, 5, 7, 9], [3, 4, 5, 6]),
+    ('duplicates', [2, 2, 3, 8], [2, 8, 8, 9]),
+    ('one_empty', [], [1, 2]),
+    ('small_and_large', [50, 150], list(range(0, 200, 3))))
+  def test_set_operations(self, first, second):
+    make = binary_search_tree.AVLTree.from_array
+    union = make(first).union(make(second))
+    self.assertListEqual(sorted(first + second), list(union))
+    self._assert_avl_property(union)
+    intersection = make(first).intersection(make(second))
+    self.assertListEqual([x for x in sorted(first) if x in second],
+                         list(intersection))
+    self._assert_avl_property(intersection)
+    difference = make(first).difference(make(second))
+    self.assertListEqual([x for x in sorted(first) if x not in second],
+                         list(difference))
+    self._assert_avl_property(difference)
+
+  @parameterized.named_parameters(
+    ('disjoint', [1, 2, 3], [4, 5]),
+    ('overlapping', [1, 1, 3, 5, 5, 5], [1, 5, 5, 6, 6]),
+    ('one_empty', [2, 2], []))
+  def test_multiset_set_operations(self, first, second):
+    make = lambda array: binary_search_tree.AVLTree.from_array(array,
+                                                               multiset=True)
+    first_counter = collections.Counter(first)
+    second_counter = collections.Counter(second)
+    union = make(first).union(make(second))
+    self.assertListEqual(sorted((first_counter + second_counter).elements()),
+                         list(union))
+    intersection = make(first).intersection(make(second))
+    self.assertListEqual(sorted((first_counter & second_counter).elements()),
+                         list(intersection))
+    difference = make(first).difference(make(second))
+    self.assertListEqual(sorted((first_counter - second_counter).elements()),
+                         list(difference))
+    self.assertEqual(len(list(difference)), difference.size())
+
+  def _pre_order(self, node):
+    """Returns the values of the subtree of `node` in pre-order."""
+    if node is None:
+      return []
+    return ([node.value] + self._pre_order(node.left) +
+            self._pre_order(node.right))
+
+  def _assert_avl_property(self, tree):
+    """Ensures heights are correct and the AVL property holds."""
+
+    def check(node):
+      if node is None:
+        return 0
+      if node.left is not None:
+        self.assertIs(node, node.left.parent)
+      if node.right is not None:
+        self.assertIs(node, node.right.parent)
+      left, right = check(node.left), check(node.right)
+      self.assertLessEqual(abs(left - right), 1)
+      self.assertEqual(1 + max(left, right), node.height)
+      left_size = 0 if node.left is None else node.left.size
+      right_size = 0 if node.right is None else node.right.size
+      self.assertEqual(node.count + left_size + right_size, node.size)
+      return node.height
+
+    if tree._root is not None:
+      self.assertIsNone(tree._root.parent)
+    check(tree._root)
+
+
+class SplayTreeTest(parameterized.TestCase):
+  """Tests for `SplayTree`."""
+
+  @parameterized.named_parameters(
+    (f'case_{i}', list(perm)) for i, perm in
+    enumerate(itertools.permutations(range(5))))
+  def test_add_search_remove(self, array):
+    tree = binary_search_tree.SplayTree(splay_interval=1)
+    for item in array:
+      tree.add(item)
+      _assert_valid(self, tree)
+    for item in array:
+      self.assertEqual(item, tree.search(item))
+      self.assertEqual(item, tree._root.value)
+      _assert_valid(self, tree)
+    expected = [0, 1, 2, 3, 4]
+    for item in reversed(array):
+      self.assertEqual(item, tree.remove(item))
+      expected.remove(item)
+      _assert_valid(self, tree)
+      self.assertListEqual(expected, tree.in_order_walk())
+
+  def test_missed_lookup_splays_last_node(self):
+    tree = binary_search_tree.SplayTree.from_sorted(list(range(0, 100, 2)),
+                                                    splay_interval=1)
+    self.assertFalse(tree.contains(51))
+    self.assertIn(tree._root.value, [50, 52])
+    _assert_valid(self, tree)
+    with self.assertRaises(binary_search_tree.NotInTreeError):
+      tree.search(-1)
+    self.assertEqual(0, tree._root.value)
+
+  def test_lookups_move_hot_items_to_top(self):
+    tree = binary_search_tree.SplayTree.from_array(list(range(1000)),
+                                                   splay_interval=1)
+    hot = [17, 503, 998]
+    for _ in range(3):
+      for item in hot:
+        tree.search(item)
+    self.assertLessEqual(max(self._depth(tree, item) for item in hot), 3)
+    _assert_valid(self, tree)
+
+  def test_sequential_access_takes_linear_time(self):
+    tree = binary_search_tree.SplayTree(splay_interval=1)
+    # Each addition splays the parent of the new node, the previous maximum, so
+    # the tree becomes a path to the left.
+    for item in range(2000):
+      tree.add(item)
+    self.assertEqual(1998, self._depth(tree, 0))
+    total_depth = 0
+    for item in range(2000):
+      total_depth += self._depth(tree, item)
+      self.assertEqual(item, tree.search(item))
+    self.assertLess(total_depth, 5 * 2000)
+    self.assertListEqual(list(range(2000)), tree.in_order_walk())
+
+  def test_lookups_splay_once_per_interval_on_average(self):
+    random.seed(0)  # Seeds the sampling of splayed lookups.
+    tree = binary_search_tree.SplayTree.from_sorted(list(range(100)),
+                                                    splay_interval=4)
+    with mock.patch.object(tree, '_splay', wraps=tree._splay) as splay:
+      for _ in range(1000):
+        self.assertEqual(0, tree.search(0))
+        self.assertEqual(99, tree.search(99))
+      self.assertBetween(splay.call_count, 400, 600)
+    _assert_valid(self, tree)
+
+  def test_sampled_lookups_move_hot_items_to_top(self):
+    random.seed(0)  # Seeds the sampling of splayed lookups.
+    tree = binary_search_tree.SplayTree()
+    rng = random.Random(0)
+    items = list(range(1000))
+    rng.shuffle(items)
+    for item in items:
+      tree.add(item)
+    hot = [17, 503, 998]
+    for _ in range(500):
+      for item in hot:
+        tree.search(item)
+      tree.search(rng.randrange(1000))
+    self.assertLessEqual(max(self._depth(tree, item) for item in hot), 4)
+    _assert_valid(self, tree)
+
+  def test_invalid_splay_interval(self):
+    with self.assertRaises(ValueError):
+      binary_search_tree.SplayTree(splay_interval=0)
+
+  def test_multiset(self):
+    tree = binary_search_tree.SplayTree(multiset=True)
+    for item in [3, 1, 3, 2, 3]:
+      tree.add(item)
+    self.assertEqual(3, _size(tree._root))
+    self.assertEqual(2, tree.remove(2))
+    self.assertTrue(tree.discard(3))
+    self.assertListEqual([1, 3, 3], tree.in_order_walk())
+    self.assertEqual(2, tree.count_range(3, 3))
+    _assert_valid(self, tree)
+
+  def test_prefilter(self):
+    tree = binary_search_tree.SplayTree(prefilter_capacity=100)
+    for item in range(0, 200, 2):
+      tree.add(item)
+    for item in range(200):
+      self.assertEqual(item % 2 == 0, item in tree)
+    _assert_valid(self, tree)
+
+  def test_random_operations(self):
+    rng = random.Random(0)
+    tree = binary_search_tree.SplayTree()
+    expected = []
+    for _ in range(2000):
+      item = rng.randrange(100)
+      operation = rng.randrange(3)
+      if operation == 0:
+        tree.add(item)
+        expected.append(item)
+      elif operation == 1:
+        self.assertEqual(item in expected, tree.discard(item))
+        if item in expected:
+          expected.remove(item)
+      else:
+        self.assertEqual(item if item in expected else None, tree.get(item))
+    self.assertListEqual(sorted(expected), tree.in_order_walk())
+    _assert_valid(self, tree)
+
+  def _depth(self, tree, item):
+    depth = 0
+    node = tree._root
+    while node.key != item:
+      node = node.left if item < node.key else node.right
+      depth += 1
+    return depth
+
 
 if __name__ == '__main__':
   absltest.main()
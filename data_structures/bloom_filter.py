@@ -0,0 +1,110 @@
+"""Implementation of a Bloom filter."""
+
+import math
+
+_MASK = (1 << 64) - 1
+
+
+class BloomFilter(object):
+  """Implementation of a Bloom filter.
+
+  A Bloom filter is a data structure which serves as a compact approximation of
+  a set of hashable elements. It supports addition, and a membership test which
+  can return false positives, but never false negatives: if an element was
+  added, the filter always reports it as possibly present.
+
+  The filter consists of an array of `num_bits` bits, initially all zero.
+  Adding an element sets `num_hashes` bits at positions derived from its hash.
+  An element is reported as possibly present only if all of its bits are set.
+
+  Elements cannot be removed, since their bits may be shared with other
+  elements. The probability of a false positive after adding `n` elements is
+  approximately `(1 - exp(-num_hashes * n / num_bits))^num_hashes`.
+  """
+
+  def __init__(self, num_bits, num_hashes):
+    """Constructs an empty filter.
+
+    Args:
+      num_bits: A positive integer. The number of bits in the filter.
+      num_hashes: A positive integer. The number of bits set per element.
+
+    Raises:
+      `ValueError` if `num_bits` or `num_hashes` is not positive.
+    """
+    if num_bits < 1 or num_hashes < 1:
+      raise ValueError('Number of bits and hashes must be positive, but are '
+                       f'{num_bits} and {num_hashes}.')
+    self._bits = bytearray((num_bits + 7) // 8)
+    self._num_bits = num_bits
+    self._num_hashes = num_hashes
+    self._count = 0
+
+  @classmethod
+  def for_capacity(cls, capacity, error_rate=0.01):
+    """Constructs a filter sized for the expected number of elements.
+
+    Args:
+      capacity: A positive integer. The expected number of elements.
+      error_rate: A float in `(0, 1)`. The desired false positive rate when
+        `capacity` elements were added.
+
+    Returns:
+      A `BloomFilter`.
+
+    Raises:
+      `ValueError` if `capacity` is not positive, or `error_rate` is not in
+        `(0, 1)`.
+    """
+    if capacity < 1:
+      raise ValueError(f'Capacity must be positive, but is {capacity}.')
+    if not 0 < error_rate < 1:
+      raise ValueError(f'Error rate must be in (0, 1), but is {error_rate}.')
+    num_bits = max(1, math.ceil(-capacity * math.log(error_rate) /
+                                math.log(2) ** 2))
+    num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+    return cls(num_bits, num_hashes)
+
+  def add(self, item):
+    """Adds `item` to the filter.
+
+    Args:
+      item: A hashable object.
+    """
+    bits = self._bits
+    h1, h2 = _hashes(item)
+    num_bits = self._num_bits
+    for _ in range(self._num_hashes):
+      position = h1 % num_bits
+      bits[position >> 3] |= 1 << (position & 7)
+      h1 += h2
+    self._count += 1
+
+  def __contains__(self, item):
+    """Returns `False` if `item` was not added, `True` if it possibly was."""
+    bits = self._bits
+    h1, h2 = _hashes(item)
+    num_bits = self._num_bits
+    for _ in range(self._num_hashes):
+      position = h1 % num_bits
+      if not bits[position >> 3] & (1 << (position & 7)):
+        return False
+      h1 += h2
+    return True
+
+  def estimated_false_positive_rate(self):
+    """Returns the expected false positive rate for the elements added."""
+    k = self._num_hashes
+    return (1 - math.exp(-k * self._count / self._num_bits)) ** k
+
+
+def _hashes(item):
+  """Returns two hashes of `item`, `h1` and `h2`.
+
+  The positions of bits of `item` are `h1 + i * h2`. Both are obtained by mixing
+  the built-in hash of `item`, which is not uniform for integers.
+  """
+  h = hash(item) & _MASK
+  h1 = (h * 0x9E3779B97F4A7C15) & _MASK
+  h2 = ((h ^ (h >> 29)) * 0xBF58476D1CE4E5B9) & _MASK
+  return h1 ^ (h1 >> 31), (h2 ^ (h2 >> 32)) | 1
@@ -0,0 +1,54 @@
+from absl.testing import absltest
+from absl.testing import parameterized
+
+from data_structures import bloom_filter
+
+
+class BloomFilterTest(parameterized.TestCase):
+  """Tests for `BloomFilter`."""
+
+  def test_empty_filter_contains_nothing(self):
+    f = bloom_filter.BloomFilter(100, 3)
+    for item in range(100):
+      self.assertNotIn(item, f)
+    self.assertEqual(0.0, f.estimated_false_positive_rate())
+
+  @parameterized.named_parameters(
+    ('ints', list(range(1000))),
+    ('strings', [f'item_{i}' for i in range(1000)]),
+    ('tuples', [(i, -i) for i in range(1000)]))
+  def test_no_false_negatives(self, items):
+    f = bloom_filter.BloomFilter.for_capacity(len(items))
+    for item in items:
+      f.add(item)
+    for item in items:
+      self.assertIn(item, f)
+
+  def test_false_positive_rate_close_to_requested(self):
+    f = bloom_filter.BloomFilter.for_capacity(10000, error_rate=0.01)
+    for item in range(10000):
+      f.add(item)
+    false_positives = sum(item in f for item in range(10000, 30000))
+    self.assertLess(false_positives / 20000, 0.02)
+    self.assertAlmostEqual(0.01, f.estimated_false_positive_rate(), delta=0.005)
+
+  def test_invalid_size_raises(self):
+    with self.assertRaises(ValueError):
+      bloom_filter.BloomFilter(0, 1)
+    with self.assertRaises(ValueError):
+      bloom_filter.BloomFilter(10, 0)
+
+  @parameterized.named_parameters(
+    ('zero_capacity', 0, 0.01),
+    ('negative_capacity', -5, 0.01),
+    ('zero_error_rate', 100, 0.0),
+    ('one_error_rate', 100, 1.0),
+    ('negative_error_rate', 100, -0.1),
+    ('large_error_rate', 100, 1.5))
+  def test_invalid_capacity_or_error_rate_raises(self, capacity, error_rate):
+    with self.assertRaises(ValueError):
+      bloom_filter.BloomFilter.for_capacity(capacity, error_rate)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,272 @@
+"""Implementation of a thread-safe wrapper of a binary search tree."""
+
+import contextlib
+import threading
+
+from data_structures import binary_search_tree
+
+
+class _LockContext(object):
+  """Context manager calling `acquire` on entry and `release` on exit.
+
+  Unlike with `contextlib.contextmanager`, a single instance is reused for all
+  `with` blocks, which avoids creating a generator for each of them.
+  """
+
+  __slots__ = ('_acquire', '_release')
+
+  def __init__(self, acquire, release):
+    self._acquire = acquire
+    self._release = release
+
+  def __enter__(self):
+    self._acquire()
+
+  def __exit__(self, *exc_info):
+    self._release()
+
+
+class ReadWriteLock(object):
+  """Lock which can be held by many readers at once, or by a single writer.
+
+  Writers are preferred: once a writer is waiting, new readers wait until it
+  has acquired and released the lock, so that a steady stream of readers does
+  not starve writers. The lock is not reentrant, and a thread holding it must
+  not acquire it again.
+  """
+
+  def __init__(self):
+    self._condition = threading.Condition(threading.Lock())
+    self._readers = 0
+    self._writer = False
+    self._waiting_writers = 0
+    self._read_context = _LockContext(self.acquire_read, self.release_read)
+    self._write_context = _LockContext(self.acquire_write, self.release_write)
+
+  def acquire_read(self):
+    """Blocks until the lock is held by no writer, and acquires it to read."""
+    with self._condition:
+      while self._writer or self._waiting_writers:
+        self._condition.wait()
+      self._readers += 1
+
+  def release_read(self):
+    """Releases the lock acquired by `acquire_read`."""
+    with self._condition:
+      self._readers -= 1
+      if not self._readers:
+        self._condition.notify_all()
+
+  def acquire_write(self):
+    """Blocks until the lock is held by nobody, and acquires it to write."""
+    with self._condition:
+      self._waiting_writers += 1
+      while self._writer or self._readers:
+        self._condition.wait()
+      self._waiting_writers -= 1
+      self._writer = True
+
+  def release_write(self):
+    """Releases the lock acquired by `acquire_write`."""
+    with self._condition:
+      self._writer = False
+      self._condition.notify_all()
+
+  def read_locked(self):
+    """Returns a context manager holding the lock to read."""
+    return self._read_context
+
+  def write_locked(self):
+    """Returns a context manager holding the lock to write."""
+    return self._write_context
+
+
+class ConcurrentBinarySearchTree(object):
+  """Thread-safe wrapper of a `binary_search_tree.BinarySearchTree`.
+
+  The wrapper has the methods of the tree which look up or change items, and
+  can be shared by multiple threads. Each method call is atomic.
+
+  Locking.
+
+  The tree is guarded by a `ReadWriteLock`. Lookups, such as `search`,
+  `contains`, `rank` or `iter_range`, hold it as readers, so that any number of
+  them proceed at once, while changes, such as `add` or `remove`, hold it as a
+  writer, excluding all other calls. A `binary_search_tree.SplayTree`
+  restructures itself on every lookup, so for it, lookups hold the lock as a
+  writer as well. The statistics of the prefilter of a tree, if it has one, may
+  miss some lookups made at once by multiple readers.
+
+  Iteration and range scans make a list of the items under the lock, and then
+  yield from it, so they neither hold the lock while the caller processes the
+  items, nor see changes made in the meantime.
+
+  Batches.
+
+  `add_many` and `remove_many` are atomic, other threads see either none or all
+  of their changes. For other sequences of calls, `batch` holds the lock as a
+  writer for the duration of a `with` block, and gives access to the wrapped
+  tree, on which any of its methods can be called.
+  """
+
+  def __init__(self, tree=None):
+    """Constructs the wrapper.
+
+    Args:
+      tree: A `binary_search_tree.BinarySearchTree` to be wrapped, or `None` to
+        wrap a new empty one. The tree must not be used other than through the
+        wrapper afterwards.
+    """
+    self._tree = binary_search_tree.BinarySearchTree() if tree is None else tree
+    self._lock = ReadWriteLock()
+    if isinstance(self._tree, binary_search_tree.SplayTree):
+      self._read_locked = self._lock.write_locked
+    else:
+      self._read_locked = self._lock.read_locked
+
+  @contextlib.contextmanager
+  def batch(self):
+    """Returns a context manager making a batch of changes atomic.
+
+    Example:
+      with concurrent_tree.batch() as tree:
+        if tree.contains(old):
+          tree.remove(old)
+          tree.add(new)
+
+    Yields:
+      The wrapped `binary_search_tree.BinarySearchTree`, which must not be used
+      after the `with` block.
+    """
+    with self._lock.write_locked():
+      yield self._tree
+
+  def add(self, item):
+    """Adds `item` to the tree."""
+    with self._lock.write_locked():
+      self._tree.add(item)
+
+  def add_many(self, items):
+    """Adds all `items` to the tree atomically."""
+    items = list(items)
+    with self._lock.write_locked():
+      self._tree.add_many(items)
+
+  def remove(self, item):
+    """Removes the item and returns it.
+
+    Raises:
+      NotInTreeError: If `item` is not in the tree.
+    """
+    with self._lock.write_locked():
+      return self._tree.remove(item)
+
+  def remove_many(self, items, default=None):
+    """Removes `items` atomically, see `remove_many` of the tree."""
+    items = list(items)
+    with self._lock.write_locked():
+      return self._tree.remove_many(items, default)
+
+  def discard(self, item):
+    """Removes the item if it is in the tree, returning whether it was."""
+    with self._lock.write_locked():
+      return self._tree.discard(item)
+
+  def search(self, item):
+    """Searches for the item and returns it.
+
+    Raises:
+      NotInTreeError: If `item` is not in the tree.
+    """
+    with self._read_locked():
+      return self._tree.search(item)
+
+  def search_many(self, items, default=None):
+    """Searches for `items`, see `search_many` of the tree."""
+    items = list(items)
+    with self._read_locked():
+      return self._tree.search_many(items, default)
+
+  def contains(self, item):
+    """Returns `True` if `item` is in the tree, `False` otherwise."""
+    with self._read_locked():
+      return self._tree.contains(item)
+
+  __contains__ = contains
+
+  def get(self, item, default=None):
+    """Returns the item in the tree equal to `item`, or `default` if missing."""
+    with self._read_locked():
+      return self._tree.get(item, default)
+
+  def minimum(self):
+    """Returns the smallest item in the tree."""
+    with self._read_locked():
+      return self._tree.minimum()
+
+  def maximum(self):
+    """Returns the largest item in the tree."""
+    with self._read_locked():
+      return self._tree.maximum()
+
+  def size(self):
+    """Returns the number of elements in the tree."""
+    return self._tree.size()
+
+  def rank(self, item):
+    """Returns the number of items in the tree smaller than `item`."""
+    with self._read_locked():
+      return self._tree.rank(item)
+
+  def select(self, k):
+    """Returns the `k`-th smallest item in the tree, counting from zero."""
+    with self._read_locked():
+      return self._tree.select(k)
+
+  def count_range(self, lo, hi):
+    """Returns the number of items `x` in the tree with `lo <= x <= hi`."""
+    with self._read_locked():
+      return self._tree.count_range(lo, hi)
+
+  def floor(self, item):
+    """Returns the largest item in the tree smaller or equal to `item`."""
+    with self._read_locked():
+      return self._tree.floor(item)
+
+  def ceiling(self, item):
+    """Returns the smallest item in the tree larger or equal to `item`."""
+    with self._read_locked():
+      return self._tree.ceiling(item)
+
+  def predecessor(self, item):
+    """Returns the largest item in the tree strictly smaller than `item`."""
+    with self._read_locked():
+      return self._tree.predecessor(item)
+
+  def successor(self, item):
+    """Returns the smallest item in the tree strictly larger than `item`."""
+    with self._read_locked():
+      return self._tree.successor(item)
+
+  def in_order_walk(self):
+    """Returns a list of items in the tree in increasing order."""
+    with self._read_locked():
+      return self._tree.in_order_walk()
+
+  def freeze(self, use_numpy=None):
+    """Returns an immutable index of the items in the tree, see `freeze`."""
+    with self._read_locked():
+      return self._tree.freeze(use_numpy)
+
+  def __iter__(self):
+    """Yields items in the tree at the time of the call in increasing order."""
+    return iter(self.in_order_walk())
+
+  def iter_range(self, lo, hi):
+    """Yields items `x` in the tree with `lo <= x <= hi` in increasing order.
+
+    The items are those in the tree at the time of the call.
+    """
+    with self._read_locked():
+      items = list(self._tree.iter_range(lo, hi))
+    return iter(items)
@@ -0,0 +1,113 @@
+"""Contention benchmark of `ConcurrentBinarySearchTree`.
+
+Runs a mixed workload of lookups and changes of random keys on a thread pool,
+for each ratio of reads to writes and each number of threads, and compares an
+`AVLTree` wrapped in `ConcurrentBinarySearchTree`, whose lookups share a
+readers-writer lock, with one guarded by a single mutex. Reads are `contains`
+calls, and writes alternate between `add` and `discard`.
+
+In CPython, the threads share the global interpreter lock, so readers do not
+walk the tree truly in parallel. The benchmark thus shows the overhead of the
+readers-writer lock against the mutex, and how each behaves as the writes grow.
+
+Usage:
+  python -m data_structures.concurrent_binary_search_tree_benchmark \
+    --size=100000 --threads=1,4,16 --read_ratios=99,90,50
+"""
+
+from concurrent import futures
+import random
+import threading
+import time
+
+from absl import app
+from absl import flags
+
+from data_structures import binary_search_tree
+from data_structures import concurrent_binary_search_tree
+
+FLAGS = flags.FLAGS
+flags.DEFINE_integer('size', 100000, 'Number of keys in the tree.')
+flags.DEFINE_list('threads', ['1', '2', '4', '8'], 'Numbers of threads.')
+flags.DEFINE_list('read_ratios', ['99', '90', '75', '50'],
+                  'Percentages of the operations which are reads.')
+flags.DEFINE_integer('num_ops', 100000, 'Number of operations, split evenly '
+                     'between the threads.')
+
+
+class _MutexTree(object):
+  """`BinarySearchTree` with a single mutex around each operation."""
+
+  def __init__(self, tree):
+    self._tree = tree
+    self._lock = threading.Lock()
+
+  def add(self, item):
+    with self._lock:
+      self._tree.add(item)
+
+  def discard(self, item):
+    with self._lock:
+      return self._tree.discard(item)
+
+  def contains(self, item):
+    with self._lock:
+      return self._tree.contains(item)
+
+
+def _timed(fn):
+  """Returns seconds taken by calling `fn`."""
+  start = time.perf_counter()
+  fn()
+  return time.perf_counter() - start
+
+
+def _workload(tree, ops):
+  """Applies `ops`, pairs of a method name and a key, to `tree`."""
+  for op, key in ops:
+    getattr(tree, op)(key)
+
+
+def _ops(num_ops, read_ratio, size):
+  """Returns a list of random operations with `read_ratio` percent of reads."""
+  ops = []
+  for i in range(num_ops):
+    key = random.randrange(2 * size)
+    if random.randrange(100) < read_ratio:
+      ops.append(('contains', key))
+    else:
+      ops.append(('add' if i % 2 else 'discard', key))
+  return ops
+
+
+def main(argv):
+  del argv  # Unused.
+  keys = list(range(0, 2 * FLAGS.size, 2))
+  wrappers = [
+    ('mutex', _MutexTree),
+    ('rwlock', concurrent_binary_search_tree.ConcurrentBinarySearchTree),
+  ]
+  print(f'{"reads":>6s} {"threads":>8s} ' +
+        ' '.join(f'{name:>8s} {"ops/s":>9s}' for name, _ in wrappers))
+  for read_ratio in map(int, FLAGS.read_ratios):
+    ops = _ops(FLAGS.num_ops, read_ratio, FLAGS.size)
+    for num_threads in map(int, FLAGS.threads):
+      chunks = [ops[i::num_threads] for i in range(num_threads)]
+      results = []
+      for _, wrapper in wrappers:
+        tree = wrapper(binary_search_tree.AVLTree.from_sorted(keys))
+        with futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
+
+          def run():
+            jobs = [executor.submit(_workload, tree, chunk)
+                    for chunk in chunks]
+            for job in jobs:
+              job.result()
+
+          seconds = _timed(run)
+        results.append(f'{seconds:7.3f}s {len(ops) / seconds:9.0f}')
+      print(f'{read_ratio:5d}% {num_threads:8d} ' + ' '.join(results))
+
+
+if __name__ == '__main__':
+  app.run(main)
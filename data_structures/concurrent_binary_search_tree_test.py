@@ -0,0 +1,201 @@
+import random
+import sys
+import threading
+
+from absl.testing import absltest
+from absl.testing import parameterized
+
+from data_structures import binary_search_tree
+from data_structures import concurrent_binary_search_tree
+
+
+def _start(target, *args):
+  """Starts and returns a daemon thread running `target(*args)`."""
+  thread = threading.Thread(target=target, args=args, daemon=True)
+  thread.start()
+  return thread
+
+
+class ReadWriteLockTest(absltest.TestCase):
+  """Tests for `ReadWriteLock`."""
+
+  def test_readers_share_the_lock(self):
+    lock = concurrent_binary_search_tree.ReadWriteLock()
+    # Both readers pass the barrier only if they hold the lock at once.
+    barrier = threading.Barrier(2, timeout=5)
+
+    def read():
+      with lock.read_locked():
+        barrier.wait()
+
+    threads = [_start(read) for _ in range(2)]
+    for thread in threads:
+      thread.join(5)
+      self.assertFalse(thread.is_alive())
+    self.assertFalse(barrier.broken)
+
+  def test_writer_excludes_readers_and_writers(self):
+    lock = concurrent_binary_search_tree.ReadWriteLock()
+    events = []
+
+    def write():
+      with lock.write_locked():
+        events.append('write')
+
+    def read():
+      with lock.read_locked():
+        events.append('read')
+
+    lock.acquire_write()
+    threads = [_start(read), _start(write)]
+    for thread in threads:
+      thread.join(0.1)
+    self.assertListEqual([], events)
+    lock.release_write()
+    for thread in threads:
+      thread.join(5)
+    self.assertCountEqual(['read', 'write'], events)
+
+  def test_waiting_writer_blocks_new_readers(self):
+    lock = concurrent_binary_search_tree.ReadWriteLock()
+    events = []
+    lock.acquire_read()
+
+    def write():
+      with lock.write_locked():
+        events.append('write')
+
+    def read():
+      with lock.read_locked():
+        events.append('read')
+
+    writer = _start(write)
+    while not lock._waiting_writers:
+      writer.join(0.001)
+    reader = _start(read)
+    reader.join(0.1)
+    self.assertListEqual([], events)
+    lock.release_read()
+    writer.join(5)
+    reader.join(5)
+    self.assertListEqual(['write', 'read'], events)
+
+
+class ConcurrentBinarySearchTreeTest(parameterized.TestCase):
+  """Tests for `ConcurrentBinarySearchTree`."""
+
+  @parameterized.named_parameters(
+    ('bst', binary_search_tree.BinarySearchTree),
+    ('avl', binary_search_tree.AVLTree),
+    ('splay', binary_search_tree.SplayTree))
+  def test_delegates_to_tree(self, tree_class):
+    tree = concurrent_binary_search_tree.ConcurrentBinarySearchTree(
+      tree_class())
+    tree.add_many([5, 3, 8, 1])
+    tree.add(4)
+    self.assertEqual(5, tree.size())
+    self.assertListEqual([1, 3, 4, 5, 8], tree.in_order_walk())
+    self.assertListEqual([1, 3, 4, 5, 8], list(tree))
+    self.assertEqual(4, tree.search(4))
+    self.assertIn(3, tree)
+    self.assertNotIn(2, tree)
+    self.assertEqual('none', tree.get(2, 'none'))
+    self.assertEqual(1, tree.minimum())
+    self.assertEqual(8, tree.maximum())
+    self.assertEqual(2, tree.rank(4))
+    self.assertEqual(5, tree.select(3))
+    self.assertEqual(3, tree.count_range(2, 5))
+    self.assertListEqual([3, 4, 5], list(tree.iter_range(2, 5)))
+    self.assertEqual(3, tree.floor(3))
+    self.assertEqual(4, tree.ceiling(4))
+    self.assertEqual(3, tree.predecessor(4))
+    self.assertEqual(5, tree.successor(4))
+    self.assertListEqual([3, None], tree.search_many([3, 7]))
+    self.assertListEqual([1, 3, 4, 5, 8], list(tree.freeze()))
+    self.assertEqual(4, tree.remove(4))
+    self.assertListEqual([None, 5], tree.remove_many([7, 5]))
+    self.assertTrue(tree.discard(8))
+    self.assertFalse(tree.discard(8))
+    self.assertListEqual([1, 3], tree.in_order_walk())
+    with self.assertRaises(binary_search_tree.NotInTreeError):
+      tree.search(4)
+
+  def test_empty_tree(self):
+    tree = concurrent_binary_search_tree.ConcurrentBinarySearchTree()
+    self.assertEqual(0, tree.size())
+    with self.assertRaises(binary_search_tree.TreeEmptyError):
+      tree.minimum()
+    with self.assertRaises(binary_search_tree.NotInTreeError):
+      tree.remove(1)
+    # The lock is released after an error.
+    tree.add(1)
+    self.assertListEqual([1], tree.in_order_walk())
+
+  def test_splay_tree_lookups_hold_write_lock(self):
+    splay = concurrent_binary_search_tree.ConcurrentBinarySearchTree(
+      binary_search_tree.SplayTree())
+    plain = concurrent_binary_search_tree.ConcurrentBinarySearchTree()
+    self.assertEqual(splay._lock.write_locked, splay._read_locked)
+    self.assertEqual(plain._lock.read_locked, plain._read_locked)
+
+  def test_iteration_does_not_hold_lock(self):
+    tree = concurrent_binary_search_tree.ConcurrentBinarySearchTree()
+    tree.add_many(range(10))
+    items = tree.iter_range(0, 9)
+    self.assertEqual(0, next(items))
+    tree.add(100)  # Would block if the iteration held the lock.
+    self.assertListEqual(list(range(1, 10)), list(items))
+
+  def test_batch_is_atomic(self):
+    self.addCleanup(sys.setswitchinterval, sys.getswitchinterval())
+    sys.setswitchinterval(1e-6)
+    tree = concurrent_binary_search_tree.ConcurrentBinarySearchTree()
+    sizes = set()
+    done = threading.Event()
+
+    def read():
+      while not done.is_set():
+        sizes.add(tree.count_range(0, 99))
+
+    reader = _start(read)
+    for _ in range(20):
+      with tree.batch() as t:
+        for item in range(100):
+          t.add(item)
+      tree.remove_many(range(100))
+    done.set()
+    reader.join()
+    self.assertTrue(sizes <= {0, 100}, sizes)
+
+  @parameterized.named_parameters(
+    ('bst', binary_search_tree.BinarySearchTree),
+    ('splay', binary_search_tree.SplayTree))
+  def test_concurrent_adds_and_removes(self, tree_class):
+    self.addCleanup(sys.setswitchinterval, sys.getswitchinterval())
+    sys.setswitchinterval(1e-6)
+    tree = concurrent_binary_search_tree.ConcurrentBinarySearchTree(
+      tree_class(multiset=True))
+
+    def work(seed):
+      rng = random.Random(seed)
+      items = [rng.randrange(100) for _ in range(300)]
+      for item in items:
+        tree.add(item)
+        tree.contains(rng.randrange(100))
+      for item in items[::2]:
+        tree.remove(item)
+
+    threads = [_start(work, seed) for seed in range(8)]
+    for thread in threads:
+      thread.join()
+    expected = []
+    for seed in range(8):
+      rng = random.Random(seed)
+      items = [rng.randrange(100) for _ in range(300)]
+      expected.extend(items[1::2])
+    self.assertListEqual(sorted(expected), tree.in_order_walk())
+    self.assertEqual(len(expected), tree.size())
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -1,13 +1,40 @@
 """Implementations of a heap.
 
-NOTE: All implementations here deal with a max-heap.
+NOTE: All implementations here deal with a max-heap. `BinaryHeap` can order
+its elements by a key, or be turned into a min-heap, see its docstring.
 """
 
+import heapq
+
 
 class HeapEmptyError(Exception):
   pass
 
 
+class _HeapqFunctions(object):
+  """Functions of `heapq` used by `BinaryHeap` with `use_heapq=True`."""
+
+  __slots__ = ('heapify', 'push', 'pop', 'replace', 'pushpop')
+
+  def __init__(self, heapify, push, pop, replace, pushpop):
+    self.heapify = heapify
+    self.push = push
+    self.pop = pop
+    self.replace = replace
+    self.pushpop = pushpop
+
+
+_HEAPQ_MIN = _HeapqFunctions(heapq.heapify, heapq.heappush, heapq.heappop,
+                             heapq.heapreplace, heapq.heappushpop)
+# The functions of `heapq` for a max-heap are public since Python 3.14.
+if hasattr(heapq, 'heappush_max'):
+  _HEAPQ_MAX = _HeapqFunctions(heapq.heapify_max, heapq.heappush_max,
+                               heapq.heappop_max, heapq.heapreplace_max,
+                               heapq.heappushpop_max)
+else:
+  _HEAPQ_MAX = None
+
+
 class BinaryHeap(object):
   """Implementation of binary heap.
 
@@ -49,6 +76,17 @@ class BinaryHeap(object):
   If there are `n` elements in the heap, both of these operations take
   `O(log(n))` time, as there are (approximately) `log(n)` levels in the tree.
 
+  The swaps are not done one by one. The element being swapped is held aside,
+  leaving a *hole* in the list, the parents or children it would be swapped
+  with are moved into the hole one level at a time, and the element is stored
+  once, in the final place of the hole. Each level thus costs a single list
+  assignment, and the loops keep the list and the compared elements in local
+  variables.
+
+  A removal followed by an addition, or the other way round, can be combined
+  into a single pass down the tree by `replace` and `pushpop`, where the new
+  element takes the place of the root instead of the last element.
+
   Heap creation.
 
   There are two possibilities for creation of the heap from a sequence of
@@ -63,18 +101,89 @@ class BinaryHeap(object):
 
   When creating a heap of `n` elements, the time complexity of the `heapify`
   method is `O(n)`, while one-by-one addition is `O(n * log(n))`.
+
+  Bulk operations.
+
+  `add_many` adds many elements to an existing heap at once. For more than a
+  few elements, it fixes the heap like `heapify`, but only the parts of it
+  containing the new elements. `pop_many` and `drain` are generators removing
+  the largest elements one by one, without the checks made by each `remove`.
+
+  Ordering.
+
+  By default, the elements are compared directly, and the largest is at the
+  root. With `key`, they are compared by `key(element)` instead, like in
+  `sorted`, and with `reverse=True`, the smallest element is at the root, so
+  that the heap is a min-heap and the "largest" in the docstrings of the
+  methods reads as the "smallest".
+
+  Neither requires wrapping the elements in objects defining the ordering. The
+  keys are computed once per element and kept in a list parallel to the list
+  representation of the heap, and the loops swapping elements up and down are
+  chosen at construction, so that each of the four combinations compares the
+  elements, or their keys, with a plain `<`, without further indirection.
+
+  The heapq backend.
+
+  With `use_heapq=True`, the list representation is maintained by the
+  functions of the `heapq` module instead, which are implemented in C. This
+  requires the elements to be compared directly, without `key`, and `heapq`
+  maintains a min-heap, so it is available with `reverse=True`, and for a
+  max-heap only since Python 3.14, which added the functions for a max-heap to
+  `heapq`. The list representation may then differ from the one of the Python
+  implementation, but it satisfies the same heap property.
   """
 
-  def __init__(self):
+  def __init__(self, key=None, reverse=False, use_heapq=False):
+    """Constructs an empty heap.
+
+    Args:
+      key: A function of one argument, returning the value by which an element
+        is compared with others, or `None` to compare the elements directly.
+      reverse: Whether the smallest element, instead of the largest one, is at
+        the root.
+      use_heapq: Whether the heap is maintained by the functions of `heapq`.
+
+    Raises:
+      `ValueError` if `use_heapq` is `True` and `key` is given, or `reverse`
+      is `False` but `heapq` has no functions for a max-heap.
+    """
+    if use_heapq:
+      if key is not None:
+        raise ValueError('The heapq backend does not support key.')
+      if not reverse and _HEAPQ_MAX is None:
+        raise ValueError('The heapq backend requires reverse=True before '
+                         'Python 3.14.')
     self._heap = []
     self._size = 0
+    self._key = key
+    self._reverse = reverse
+    if not use_heapq:
+      self._heapq = None
+    elif reverse:
+      self._heapq = _HEAPQ_MIN
+    else:
+      self._heapq = _HEAPQ_MAX
+    # Keys of the elements, at the same locations as the elements in `_heap`.
+    self._keys = None if key is None else []
+    if key is None:
+      if reverse:
+        self._swap_all_up = self._swap_all_up_min
+        self._swap_all_down = self._swap_all_down_min
+    elif reverse:
+      self._swap_all_up = self._swap_all_up_min_by_key
+      self._swap_all_down = self._swap_all_down_min_by_key
+    else:
+      self._swap_all_up = self._swap_all_up_by_key
+      self._swap_all_down = self._swap_all_down_by_key
 
   @classmethod
-  def heapify(cls, data):
+  def heapify(cls, data, **kwargs):
     """Efficiently constructs `BinaryHeap` containing given data.
 
     Args:
       data: A list of elements to be stored in the `BinaryHeap`.
+      **kwargs: Keyword arguments passed to the constructor.
 
     Returns:
       A `BinaryHeap`.
@@ -85,11 +194,16 @@ class BinaryHeap(object):
     if not isinstance(data, list):
       raise TypeError(f'Provided data must be a list, but is {type(data)}.')
 
-    heap = cls()
+    heap = cls(**kwargs)
     size = len(data)
     heap._heap = data
     heap._size = size
-    for i in reversed(range(_parent(size) + 1)):
+    if heap._heapq is not None:
+      heap._heapq.heapify(data)
+      return heap
+    if heap._keys is not None:
+      heap._keys = [heap._key(item) for item in data]
+    for i in reversed(range(heap._parent_of(size) + 1)):
       heap._swap_all_down(i)
     return heap
 
@@ -99,10 +213,45 @@ class BinaryHeap(object):
     Args:
       item: An object to be added.
     """
+    if self._heapq is not None:
+      self._heapq.push(self._heap, item)
+      self._size += 1
+      return
     self._heap.append(item)
+    if self._keys is not None:
+      self._keys.append(self._key(item))
     self._swap_all_up(self._size)
     self._size += 1
 
+  def add_many(self, items):
+    """Adds all `items` to the heap.
+
+    The elements are appended to the list representation of the heap at once,
+    and the heap property is then restored in the cheaper of two ways, see
+    `_restore_from`.
+
+    Args:
+      items: An iterable of objects to be added.
+    """
+    items = list(items)
+    if not items:
+      return
+    start = self._size
+    if self._heapq is not None:
+      if len(items) <= (start + len(items)).bit_length():
+        for item in items:
+          self._heapq.push(self._heap, item)
+      else:
+        self._heap.extend(items)
+        self._heapq.heapify(self._heap)
+      self._size += len(items)
+      return
+    self._heap.extend(items)
+    if self._keys is not None:
+      self._keys.extend(self._key(item) for item in items)
+    self._size += len(items)
+    self._restore_from(start)
+
   def peek(self):
     """Returns the largest element in the heap.
 
@@ -123,14 +272,100 @@ class BinaryHeap(object):
     if self._size == 0:
       raise HeapEmptyError()
 
-    val = self.peek()
-    self._size -= 1
-    self._heap[0] = self._heap[self._size]
-    del self._heap[self._size]
+    return self._remove_root()
+
+  def pop_many(self, k):
+    """Removes up to `k` largest elements in the heap and yields them.
+
+    The elements are yielded in decreasing order, each removed just before it
+    is yielded, so if the generator is not exhausted, the elements not yielded
+    yet stay in the heap. Unlike `remove`, this does not check the heap on
+    each call, and an empty heap simply ends the generator.
+
+    Args:
+      k: The maximum number of elements to remove.
+
+    Yields:
+      The largest elements in the heap, fewer than `k` if the heap runs out of
+      them.
+    """
+    remove_root = self._remove_root
+    while k > 0 and self._size:
+      k -= 1
+      yield remove_root()
+
+  def drain(self):
+    """Removes all elements in the heap and yields them in decreasing order.
+
+    Like `pop_many`, each element is removed just before it is yielded.
+    """
+    remove_root = self._remove_root
+    while self._size:
+      yield remove_root()
+
+  def replace(self, item):
+    """Removes the largest element in the heap, returns it, and adds `item`.
+
+    This is equivalent to `remove` followed by `add`, but more efficient, as
+    `item` takes the place of the root and is swapped down only once, instead
+    of moving the last element to the root and then swapping `item` up.
+
+    Args:
+      item: An object to be added.
+
+    Returns:
+      The largest element in the heap before the call, which may be smaller
+      than `item`.
+
+    Raises:
+      `HeapEmptyError` if the heap is empty.
+    """
+    if self._size == 0:
+      raise HeapEmptyError()
+    if self._heapq is not None:
+      return self._heapq.replace(self._heap, item)
+
+    val = self._heap[0]
+    self._heap[0] = item
+    if self._keys is not None:
+      self._keys[0] = self._key(item)
     self._swap_all_down(0)
     return val
 
-  # TODO: Add `replace` method more efficient than `remove` - `add` combination.
+  def pushpop(self, item):
+    """Adds `item` to the heap, removes the largest element and returns it.
+
+    This is equivalent to `add` followed by `remove`, but more efficient. If
+    `item` is not smaller than the root, it would be removed right away, so it
+    is returned without changing the heap at all. Otherwise, it replaces the
+    root, which is returned, and is swapped down once.
+
+    Args:
+      item: An object to be added.
+
+    Returns:
+      The largest of the elements in the heap and `item`.
+    """
+    if self._size == 0:
+      return item
+    if self._heapq is not None:
+      return self._heapq.pushpop(self._heap, item)
+    if self._keys is None:
+      item_key, root_key = item, self._heap[0]
+    else:
+      item_key, root_key = self._key(item), self._keys[0]
+    if self._reverse:
+      if not root_key < item_key:
+        return item
+    elif not item_key < root_key:
+      return item
+
+    val = self._heap[0]
+    self._heap[0] = item
+    if self._keys is not None:
+      self._keys[0] = item_key
+    self._swap_all_down(0)
+    return val
 
   def size(self):
     """Returns the number of elements in the heap."""
@@ -142,74 +377,853 @@ class BinaryHeap(object):
     # internal representation of the heap.
     return [element for element in self._heap]
 
+  def _remove_root(self):
+    """Removes the root of non-empty heap and returns it."""
+    self._size -= 1
+    heap = self._heap
+    if self._heapq is not None:
+      return self._heapq.pop(heap)
+    last = heap.pop()
+    if self._keys is not None:
+      last_key = self._keys.pop()
+    if self._size == 0:
+      return last
+    val = heap[0]
+    heap[0] = last
+    if self._keys is not None:
+      self._keys[0] = last_key
+    self._swap_all_down(0)
+    return val
+
+  def _restore_from(self, start):
+    """Corrects the heap property after appending the nodes from `start` on.
+
+    If few nodes were appended, they are swapped up one by one, as by `add`.
+    This takes `O(1)` time per node on average, but `O(log(n))` if the nodes
+    are larger than most of the heap, for example in increasing order.
+
+    Otherwise, the subtrees containing the appended nodes are fixed from the
+    bottom up, as by `heapify`. The ancestors of a range of locations form a
+    range on the level above, so only the nodes in these ranges are swapped
+    down, which takes `O(k + log(n)**2)` time for `k` appended nodes, and is
+    never more than the `O(n)` time of `heapify` of the whole heap. As each
+    level up has at least one node to swap down, this is preferred once `k` is
+    larger than the number of levels.
+    """
+    size = self._size
+    if size - start <= size.bit_length():
+      for idx in range(start, size):
+        self._swap_all_up(idx)
+      return
+    parent_of, swap_all_down = self._parent_of, self._swap_all_down
+    lo, hi = start, size - 1
+    while hi > 0:
+      lo, hi = max(parent_of(lo), 0), parent_of(hi)
+      for idx in range(hi, lo - 1, -1):
+        swap_all_down(idx)
+      # All ancestors of the nodes in the range are in the range.
+      if lo == 0:
+        break
+
+  def _swap_all_up(self, idx):
+    """Corrects the heap property in parent path of node at location `idx`.
+
+    Instead of swapping the node with each of its parents smaller than it, the
+    parents are moved down one level, into the *hole* left by the node, and the
+    node is stored once, in the place of the last of them.
+    """
+    heap = self._heap
+    item = heap[idx]
+    while idx > 0:
+      parent_idx = (idx - 1) >> 1
+      parent = heap[parent_idx]
+      if not parent < item:
+        break
+      heap[idx] = parent
+      idx = parent_idx
+    heap[idx] = item
+
+  def _swap_all_down(self, idx):
+    """Corrects the heap property of subtree under node at location `idx`.
+
+    Instead of swapping the node with its larger child while it is smaller than
+    the child, the child is moved up one level, into the hole left by the node,
+    and the node is stored once, in the place of the last moved child.
+    """
+    heap, size = self._heap, self._size
+    item = heap[idx]
+    child_idx = 2 * idx + 1
+    while child_idx < size:
+      child = heap[child_idx]
+      right_idx = child_idx + 1
+      if right_idx < size and child < heap[right_idx]:
+        child_idx = right_idx
+        child = heap[right_idx]
+      if not item < child:
+        break
+      heap[idx] = child
+      idx = child_idx
+      child_idx = 2 * idx + 1
+    heap[idx] = item
+
+  # Specializations of `_swap_all_up` and `_swap_all_down` for the orderings
+  # other than the default, chosen in the constructor.
+  def _swap_all_up_min(self, idx):
+    """`_swap_all_up` with the smallest element at the root."""
+    heap = self._heap
+    item = heap[idx]
+    while idx > 0:
+      parent_idx = (idx - 1) >> 1
+      parent = heap[parent_idx]
+      if not item < parent:
+        break
+      heap[idx] = parent
+      idx = parent_idx
+    heap[idx] = item
+
+  def _swap_all_down_min(self, idx):
+    """`_swap_all_down` with the smallest element at the root."""
+    heap, size = self._heap, self._size
+    item = heap[idx]
+    child_idx = 2 * idx + 1
+    while child_idx < size:
+      child = heap[child_idx]
+      right_idx = child_idx + 1
+      if right_idx < size and heap[right_idx] < child:
+        child_idx = right_idx
+        child = heap[right_idx]
+      if not child < item:
+        break
+      heap[idx] = child
+      idx = child_idx
+      child_idx = 2 * idx + 1
+    heap[idx] = item
+
+  def _swap_all_up_by_key(self, idx):
+    """`_swap_all_up` comparing the keys of the elements."""
+    heap, keys = self._heap, self._keys
+    item, key = heap[idx], keys[idx]
+    while idx > 0:
+      parent_idx = (idx - 1) >> 1
+      parent_key = keys[parent_idx]
+      if not parent_key < key:
+        break
+      heap[idx] = heap[parent_idx]
+      keys[idx] = parent_key
+      idx = parent_idx
+    heap[idx] = item
+    keys[idx] = key
+
+  def _swap_all_down_by_key(self, idx):
+    """`_swap_all_down` comparing the keys of the elements."""
+    heap, keys, size = self._heap, self._keys, self._size
+    item, key = heap[idx], keys[idx]
+    child_idx = 2 * idx + 1
+    while child_idx < size:
+      child_key = keys[child_idx]
+      right_idx = child_idx + 1
+      if right_idx < size and child_key < keys[right_idx]:
+        child_idx = right_idx
+        child_key = keys[right_idx]
+      if not key < child_key:
+        break
+      heap[idx] = heap[child_idx]
+      keys[idx] = child_key
+      idx = child_idx
+      child_idx = 2 * idx + 1
+    heap[idx] = item
+    keys[idx] = key
+
+  def _swap_all_up_min_by_key(self, idx):
+    """`_swap_all_up` comparing the keys, with the smallest at the root."""
+    heap, keys = self._heap, self._keys
+    item, key = heap[idx], keys[idx]
+    while idx > 0:
+      parent_idx = (idx - 1) >> 1
+      parent_key = keys[parent_idx]
+      if not key < parent_key:
+        break
+      heap[idx] = heap[parent_idx]
+      keys[idx] = parent_key
+      idx = parent_idx
+    heap[idx] = item
+    keys[idx] = key
+
+  def _swap_all_down_min_by_key(self, idx):
+    """`_swap_all_down` comparing the keys, with the smallest at the root."""
+    heap, keys, size = self._heap, self._keys, self._size
+    item, key = heap[idx], keys[idx]
+    child_idx = 2 * idx + 1
+    while child_idx < size:
+      child_key = keys[child_idx]
+      right_idx = child_idx + 1
+      if right_idx < size and keys[right_idx] < child_key:
+        child_idx = right_idx
+        child_key = keys[right_idx]
+      if not child_key < key:
+        break
+      heap[idx] = heap[child_idx]
+      keys[idx] = child_key
+      idx = child_idx
+      child_idx = 2 * idx + 1
+    heap[idx] = item
+    keys[idx] = key
+
+  def _parent_of(self, idx):
+    """Returns the location of the parent of node at location `idx`."""
+    return _parent(idx)
+
+
+class DaryHeap(BinaryHeap):
+  """Implementation of d-ary heap.
+
+  A d-ary heap is a generalization of `BinaryHeap`, in which each node of the
+  tree has up to `d` children instead of two. The children of node at location
+  `idx` of the list representation are at locations `d * idx + 1` to
+  `d * idx + d`, and its parent at location `(idx - 1) // d`.
+
+  The tree has `log_d(n)` levels, fewer than a binary tree, so addition swaps
+  an element up through fewer parents. Removal swaps an element down through
+  fewer levels as well, but compares it with up to `d` children on each level,
+  which takes `O(d * log_d(n))` time in total. A larger `d` thus favors
+  workloads dominated by additions, and since the children of a node are
+  adjacent in the list, a small `d` such as `4` is often faster for removals
+  too. With `d = 2`, the heap is the same as `BinaryHeap`.
+  """
+
+  def __init__(self, d=4):
+    """Constructs an empty heap.
+
+    Args:
+      d: An integer, at least `2`. The maximum number of children of a node.
+
+    Raises:
+      `ValueError` if `d` is smaller than `2`.
+    """
+    if d < 2:
+      raise ValueError(f'The arity must be at least 2, but is {d}.')
+    super().__init__()
+    self._d = d
+
+  def arity(self):
+    """Returns the maximum number of children of a node."""
+    return self._d
+
   def _swap_all_up(self, idx):
     """Corrects the heap property in parent path of node at location `idx`."""
+    heap, d = self._heap, self._d
+    item = heap[idx]
+    while idx > 0:
+      parent_idx = (idx - 1) // d
+      parent = heap[parent_idx]
+      if not parent < item:
+        break
+      heap[idx] = parent
+      idx = parent_idx
+    heap[idx] = item
+
+  def _swap_all_down(self, idx):
+    """Corrects the heap property of subtree under node at location `idx`."""
+    heap, d, size = self._heap, self._d, self._size
+    item = heap[idx]
     while True:
-      if idx == 0:
+      first = d * idx + 1
+      if first >= size:
         break
-      new_idx = self._swap_up(idx)
-      if new_idx == idx:
+      # Find the largest of the children.
+      largest_idx = first
+      largest = heap[first]
+      for child_idx in range(first + 1, min(first + d, size)):
+        child = heap[child_idx]
+        if largest < child:
+          largest_idx, largest = child_idx, child
+      if not item < largest:
         break
-      idx = new_idx
+      heap[idx] = largest
+      idx = largest_idx
+    heap[idx] = item
 
-  def _swap_up(self, idx):
-    """Corrects the heap property of node at location `idx` and its parent.
+  def _parent_of(self, idx):
+    """Returns the location of the parent of node at location `idx`."""
+    return (idx - 1) // self._d
 
-    If the node at location `idx` is larger than its parent, it is swapped with
-    the parent.
+
+class _HeapHandle(object):
+  """Handle of an element in an `IndexedHeap`.
+
+  `idx` is the location of the handle in the list representation of the heap,
+  or `-1` once the element has been removed.
+  """
+
+  __slots__ = ('item', 'idx')
+
+  def __init__(self, item, idx):
+    self.item = item
+    self.idx = idx
+
+
+class IndexedHeap(BinaryHeap):
+  """Implementation of binary heap with handles of its elements.
+
+  An indexed heap is a `BinaryHeap` which additionally allows for changing and
+  removing any element, not just the largest one. `add` returns a *handle* of
+  the added element, which can be passed to `update` to change the element, or
+  to `remove_handle` to remove it.
+
+  Position index.
+
+  The list representation of the heap holds the handles instead of the
+  elements themselves, and each handle stores its current location in the list,
+  which is updated whenever the handle is moved. Given a handle, its element is
+  thus found in `O(1)` time, and after it is changed, the heap property is
+  restored by swapping it up or down from there, in `O(log(n))` time. A removed
+  element is replaced by the last element in the list, which is then swapped up
+  or down in the same way.
+
+  Handles of removed elements are invalidated, and passing them to `update` or
+  `remove_handle` raises `ValueError`. The heap is otherwise used in the same
+  way as `BinaryHeap`, and `as_list` returns the elements, not the handles.
+  """
+
+  def __init__(self):
+    """Constructs an empty heap."""
+    super().__init__()
+
+  @classmethod
+  def heapify(cls, data):
+    """Efficiently constructs `IndexedHeap` containing given data.
+
+    The handles of the elements are not returned, so the elements cannot be
+    changed or removed other than by `remove`.
+
+    Args:
+      data: A list of elements to be stored in the `IndexedHeap`.
+
+    Returns:
+      An `IndexedHeap`.
+
+    Raises:
+      `TypeError` if `data` is not a list.
+    """
+    if not isinstance(data, list):
+      raise TypeError(f'Provided data must be a list, but is {type(data)}.')
+    return super().heapify(
+      [_HeapHandle(item, idx) for idx, item in enumerate(data)])
+
+  def add(self, item):
+    """Adds `item` to the heap.
+
+    Args:
+      item: An object to be added.
+
+    Returns:
+      A handle of the added element, for use with `update` and
+      `remove_handle`.
+    """
+    handle = _HeapHandle(item, self._size)
+    self._heap.append(handle)
+    self._size += 1
+    self._swap_all_up(handle.idx)
+    return handle
+
+  def peek(self):
+    """Returns the largest element in the heap.
+
+    Raises:
+      `HeapEmptyError` if the heap is empty.
+    """
+    if self._size == 0:
+      raise HeapEmptyError()
+
+    return self._heap[0].item
+
+  def add_many(self, items):
+    """Adds all `items` to the heap, see `BinaryHeap.add_many`.
+
+    Args:
+      items: An iterable of objects to be added.
 
     Returns:
-      New index of the node previously at location `idx`.
+      A list of the handles of the added elements, in the order of `items`.
+    """
+    start = self._size
+    handles = [_HeapHandle(item, idx) for idx, item in enumerate(items, start)]
+    self._heap.extend(handles)
+    self._size += len(handles)
+    if handles:
+      self._restore_from(start)
+    return handles
+
+  def replace(self, item):
+    """Removes the largest element in the heap, returns it, and adds `item`.
+
+    See `BinaryHeap.replace`. The handle of the removed element is invalidated,
+    and `item` gets no handle.
+
+    Raises:
+      `HeapEmptyError` if the heap is empty.
+    """
+    if self._size == 0:
+      raise HeapEmptyError()
+
+    root = self._heap[0]
+    root.idx = -1
+    self._heap[0] = _HeapHandle(item, 0)
+    self._swap_all_down(0)
+    return root.item
+
+  def pushpop(self, item):
+    """Adds `item` to the heap, removes the largest element and returns it.
+
+    See `BinaryHeap.pushpop`. The handle of the removed element is invalidated,
+    and `item` gets no handle.
+    """
+    if self._size == 0 or not item < self._heap[0].item:
+      return item
+
+    root = self._heap[0]
+    root.idx = -1
+    self._heap[0] = _HeapHandle(item, 0)
+    self._swap_all_down(0)
+    return root.item
+
+  def update(self, handle, item):
+    """Changes the element of `handle` to `item`.
+
+    Args:
+      handle: A handle returned by `add`, of an element still in the heap.
+      item: An object to replace the element, larger or smaller than it.
+
+    Raises:
+      `ValueError` if the element of `handle` is not in the heap.
     """
-    parent = _parent(idx)
-    if self._heap[parent] < self._heap[idx]:
-      self._swap(parent, idx)
-      return parent
+    self._check_handle(handle)
+    old_item = handle.item
+    handle.item = item
+    if old_item < item:
+      self._swap_all_up(handle.idx)
     else:
-      return idx
+      self._swap_all_down(handle.idx)
+
+  def remove_handle(self, handle):
+    """Removes the element of `handle` from the heap and returns it.
+
+    Args:
+      handle: A handle returned by `add`, of an element still in the heap.
+
+    Raises:
+      `ValueError` if the element of `handle` is not in the heap.
+    """
+    self._check_handle(handle)
+    return self._remove_at(handle.idx)
+
+  def as_list(self):
+    """Returns the list representation of the heap."""
+    return [handle.item for handle in self._heap]
+
+  def _check_handle(self, handle):
+    """Raises `ValueError` if `handle` is not in the heap."""
+    idx = handle.idx
+    if not 0 <= idx < self._size or self._heap[idx] is not handle:
+      raise ValueError('The element of the handle is not in the heap.')
+
+  def _remove_root(self):
+    """Removes the root of non-empty heap and returns it."""
+    return self._remove_at(0)
+
+  def _remove_at(self, idx):
+    """Removes the element at location `idx` and returns it."""
+    heap = self._heap
+    handle = heap[idx]
+    handle.idx = -1
+    last = heap.pop()
+    self._size -= 1
+    if last is not handle:
+      heap[idx] = last
+      last.idx = idx
+      if idx > 0 and heap[(idx - 1) // 2].item < last.item:
+        self._swap_all_up(idx)
+      else:
+        self._swap_all_down(idx)
+    return handle.item
+
+  def _swap_all_up(self, idx):
+    """Corrects the heap property in parent path of node at location `idx`.
+
+    Instead of swapping, the parents smaller than the node are moved down one
+    level, and the node is stored once, in the place of the last of them.
+    """
+    heap = self._heap
+    handle = heap[idx]
+    item = handle.item
+    while idx > 0:
+      parent_idx = (idx - 1) // 2
+      parent = heap[parent_idx]
+      if not parent.item < item:
+        break
+      heap[idx] = parent
+      parent.idx = idx
+      idx = parent_idx
+    heap[idx] = handle
+    handle.idx = idx
 
   def _swap_all_down(self, idx):
-    """Corrects the heap property of subtree under node at location `idx`."""
+    """Corrects the heap property of subtree under node at location `idx`.
+
+    Instead of swapping, the larger children larger than the node are moved up
+    one level, and the node is stored once, in the place of the last of them.
+    """
+    heap, size = self._heap, self._size
+    handle = heap[idx]
+    item = handle.item
     while True:
-      if self._is_leaf(idx):
+      child_idx = 2 * idx + 1
+      if child_idx >= size:
         break
-      new_idx = self._swap_down(idx)
-      if new_idx == idx:
+      child = heap[child_idx]
+      if child_idx + 1 < size and child.item < heap[child_idx + 1].item:
+        child_idx += 1
+        child = heap[child_idx]
+      if not item < child.item:
         break
-      idx = new_idx
+      heap[idx] = child
+      child.idx = idx
+      idx = child_idx
+    heap[idx] = handle
+    handle.idx = idx
 
-  def _swap_down(self, idx):
-    """Corrects the heap property of node at location `idx` and its children.
 
-    If the node at location `idx` is not larger than both of its children, it is
-    swapped with the larger of its children. Otherwise, nothing is changed.
+class _PairingNode(object):
+  """Node of a `PairingHeap`.
 
-    Returns:
-      New index of the node previously at location `idx`.
+  The children of a node form a linked list, starting at `child` and continuing
+  through `sibling` of the children.
+  """
+
+  __slots__ = ('item', 'child', 'sibling')
+
+  def __init__(self, item):
+    self.item = item
+    self.child = None
+    self.sibling = None
+
+
+class PairingHeap(object):
+  """Implementation of pairing heap.
+
+  A pairing heap is a heap which, unlike `BinaryHeap`, can be merged with
+  another one in `O(1)` time, by `meld`. It is a tree of nodes, each of which
+  can have any number of children, satisfying the heap property: every node
+  represents a value bigger than values represented by its children.
+
+  Heap operations.
+
+  The operations are built on *linking* two trees, which makes the root with
+  the smaller value the first child of the other root, in `O(1)` time:
+
+  * Addition links the tree of the current root with a single new node.
+  * Melding links the trees of the two heaps.
+  * Removal removes the root, and links its children, which are the roots of
+    trees, into a single tree in two passes: first, the children are linked in
+    pairs from left to right, and then the resulting trees are linked one by
+    one from right to left.
+
+  The largest element is thus always at the root, and `peek` takes `O(1)`
+  time. Removal takes `O(n)` time in the worst case, as the root may have `n`
+  children, but the pairing keeps the tree shallow enough that it takes
+  `O(log(n))` amortized time.
+  """
+
+  def __init__(self):
+    self._root = None
+    self._size = 0
+
+  def add(self, item):
+    """Adds `item` to the heap.
+
+    Args:
+      item: An object to be added.
     """
-    left, right = _left(idx), _right(idx)
-    if self._size > right and self._heap[left] < self._heap[right]:
-      if self._heap[idx] < self._heap[right]:
-        self._swap(idx, right)
-        return right
+    node = _PairingNode(item)
+    if self._root is None:
+      self._root = node
     else:
-      if self._heap[idx] < self._heap[left]:
-        self._swap(idx, left)
-        return left
-    return idx
-
-  def _swap(self, idx1, idx2):
-    """Swaps nodes at locations `idx1` and `idx2`."""
-    tmp = self._heap[idx1]
-    self._heap[idx1] = self._heap[idx2]
-    self._heap[idx2] = tmp
-
-  def _is_leaf(self, idx):
-    """Returns `True` if node at location `idx` does not have children."""
-    if _left(idx) >= self._size:
-      return True
+      self._root = _link_pairing(self._root, node)
+    self._size += 1
+
+  def peek(self):
+    """Returns the largest element in the heap.
+
+    Raises:
+      `HeapEmptyError` if the heap is empty.
+    """
+    if self._root is None:
+      raise HeapEmptyError()
+
+    return self._root.item
+
+  def remove(self):
+    """Removes the largest element in the heap and returns it.
+
+    Raises:
+      `HeapEmptyError` if the heap is empty.
+    """
+    if self._root is None:
+      raise HeapEmptyError()
+
+    root = self._root
+    self._root = _link_pairs(root.child)
+    self._size -= 1
+    return root.item
+
+  def meld(self, other):
+    """Moves all elements of `other` to this heap, leaving `other` empty.
+
+    The nodes of `other` are taken over without copying, in `O(1)` time.
+
+    Args:
+      other: A `PairingHeap` other than this heap.
+
+    Raises:
+      `TypeError` if `other` is not a `PairingHeap`.
+      `ValueError` if `other` is this heap.
+    """
+    if not isinstance(other, PairingHeap):
+      raise TypeError(f'Only a PairingHeap can be melded, not {type(other)}.')
+    if other is self:
+      raise ValueError('A heap cannot be melded with itself.')
+
+    if other._root is not None:
+      if self._root is None:
+        self._root = other._root
+      else:
+        self._root = _link_pairing(self._root, other._root)
+    self._size += other._size
+    other._root = None
+    other._size = 0
+
+  def size(self):
+    """Returns the number of elements in the heap."""
+    return self._size
+
+
+def _link_pairing(root1, root2):
+  """Links two trees of a `PairingHeap` and returns the root of the result."""
+  if root1.item < root2.item:
+    root1, root2 = root2, root1
+  root2.sibling = root1.child
+  root1.child = root2
+  return root1
+
+
+def _link_pairs(first):
+  """Links the list of trees starting at `first` into a single tree.
+
+  Returns:
+    The root of the resulting tree, or `None` if the list is empty.
+  """
+  # Link the trees in pairs, from left to right.
+  pairs = []
+  node = first
+  while node is not None:
+    second = node.sibling
+    if second is None:
+      pairs.append(node)
+      break
+    following = second.sibling
+    node.sibling = second.sibling = None
+    pairs.append(_link_pairing(node, second))
+    node = following
+  if not pairs:
+    return None
+  # Link the resulting trees, from right to left.
+  root = pairs.pop()
+  while pairs:
+    root = _link_pairing(pairs.pop(), root)
+  return root
+
+
+class _BinomialNode(object):
+  """Node of a `BinomialHeap`.
+
+  `order` is the number of children of the node, whose subtree is thus a
+  binomial tree of `2**order` nodes. The children form a linked list in
+  decreasing order of their orders, starting at `child` and continuing through
+  `sibling` of the children.
+  """
+
+  __slots__ = ('item', 'order', 'child', 'sibling')
+
+  def __init__(self, item):
+    self.item = item
+    self.order = 0
+    self.child = None
+    self.sibling = None
+
+
+class BinomialHeap(object):
+  """Implementation of binomial heap.
+
+  A binomial heap is a heap which, unlike `BinaryHeap`, can be merged with
+  another one in `O(log(n))` time, by `meld`. It is a collection of *binomial
+  trees* satisfying the heap property. A binomial tree of order `0` is a single
+  node, and a binomial tree of order `k` is made of two binomial trees of
+  order `k - 1` by *linking* them, that is making the root with the smaller
+  value the child of the other root. It thus has `2**k` nodes, and its root has
+  `k` children, the roots of binomial trees of orders `k - 1` to `0`.
+
+  Heap operations.
+
+  A heap of `n` elements has at most one tree of each order, one for each bit
+  set in the binary representation of `n`, so it has at most `log(n) + 1`
+  trees. They are stored in a list indexed by their orders, with `None` in
+  place of the missing ones.
+
+  * Melding adds the lists of two heaps like binary numbers, linking two trees
+    of the same order into a single tree of the next order, which is carried
+    over, in `O(log(n))` time.
+  * Addition melds the heap with a heap of a single node. Like incrementing a
+    binary counter, this takes `O(1)` amortized time.
+  * Removal removes the largest of the roots, and melds the heap with the
+    trees of the children of the root, in `O(log(n))` time.
+
+  The largest element is at one of the roots, and `peek` takes `O(log(n))`
+  time.
+  """
+
+  def __init__(self):
+    # Roots of the trees, indexed by their orders, `None` for missing orders.
+    # The last one is never `None`.
+    self._trees = []
+    self._size = 0
+
+  def add(self, item):
+    """Adds `item` to the heap.
+
+    Args:
+      item: An object to be added.
+    """
+    # Merges a single tree of order `0`, like incrementing a binary counter.
+    trees = self._trees
+    tree = _BinomialNode(item)
+    order = 0
+    while order < len(trees) and trees[order] is not None:
+      tree = _link_binomial(trees[order], tree)
+      trees[order] = None
+      order += 1
+    if order == len(trees):
+      trees.append(tree)
     else:
-      return False
+      trees[order] = tree
+    self._size += 1
+
+  def peek(self):
+    """Returns the largest element in the heap.
+
+    Raises:
+      `HeapEmptyError` if the heap is empty.
+    """
+    if self._size == 0:
+      raise HeapEmptyError()
+
+    return self._trees[self._largest_order()].item
+
+  def remove(self):
+    """Removes the largest element in the heap and returns it.
+
+    Raises:
+      `HeapEmptyError` if the heap is empty.
+    """
+    if self._size == 0:
+      raise HeapEmptyError()
+
+    trees = self._trees
+    order = self._largest_order()
+    root = trees[order]
+    trees[order] = None
+    while trees and trees[-1] is None:
+      trees.pop()
+    children = [None] * order
+    child = root.child
+    while child is not None:
+      children[child.order] = child
+      child.sibling, child = None, child.sibling
+    self._merge_trees(children)
+    self._size -= 1
+    return root.item
+
+  def meld(self, other):
+    """Moves all elements of `other` to this heap, leaving `other` empty.
+
+    The nodes of `other` are taken over without copying, in `O(log(n))` time.
+
+    Args:
+      other: A `BinomialHeap` other than this heap.
+
+    Raises:
+      `TypeError` if `other` is not a `BinomialHeap`.
+      `ValueError` if `other` is this heap.
+    """
+    if not isinstance(other, BinomialHeap):
+      raise TypeError(f'Only a BinomialHeap can be melded, not {type(other)}.')
+    if other is self:
+      raise ValueError('A heap cannot be melded with itself.')
+
+    self._merge_trees(other._trees)
+    self._size += other._size
+    other._trees = []
+    other._size = 0
+
+  def size(self):
+    """Returns the number of elements in the heap."""
+    return self._size
+
+  def _largest_order(self):
+    """Returns the order of the tree with the largest root."""
+    trees = self._trees
+    largest = len(trees) - 1
+    for order in range(largest):
+      tree = trees[order]
+      if tree is not None and trees[largest].item < tree.item:
+        largest = order
+    return largest
+
+  def _merge_trees(self, others):
+    """Adds the trees in list `others`, indexed by their orders, to the heap."""
+    trees = self._trees
+    if len(trees) < len(others):
+      trees.extend([None] * (len(others) - len(trees)))
+    carry = None
+    for order in range(len(trees)):
+      if order < len(others):
+        other = others[order]
+      elif carry is None:
+        return
+      else:
+        other = None
+      if other is None:
+        other, carry = carry, None
+      if carry is not None:
+        # Of the three trees, the one in the heap, if any, stays.
+        carry = _link_binomial(other, carry)
+      elif other is not None:
+        if trees[order] is None:
+          trees[order] = other
+        else:
+          carry = _link_binomial(trees[order], other)
+          trees[order] = None
+    if carry is not None:
+      trees.append(carry)
+
+
+def _link_binomial(root1, root2):
+  """Links two binomial trees of the same order into one of the next order."""
+  if root1.item < root2.item:
+    root1, root2 = root2, root1
+  root2.sibling = root1.child
+  root1.child = root2
+  root1.order += 1
+  return root1
 
 
 # Utilities for accessing parent / child nodes in list representation of a
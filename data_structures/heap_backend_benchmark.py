@@ -0,0 +1,58 @@
+"""Benchmark of the implementations of `BinaryHeap`.
+
+For each size, measures the time of constructing a heap of `size` random
+numbers by `heapify`, of adding them one by one to an empty heap, and of
+removing all of them, for:
+
+* python: the max-heap maintained in Python,
+* python-min: the min-heap maintained in Python, `reverse=True`,
+* heapq-min: the min-heap maintained by `heapq`, `use_heapq=True`,
+* heapq: the max-heap maintained by `heapq`, if it has the functions for it.
+
+Usage:
+  python -m data_structures.heap_backend_benchmark --sizes=1000000
+"""
+
+import random
+import time
+
+from absl import app
+from absl import flags
+
+from data_structures import heap
+
+FLAGS = flags.FLAGS
+flags.DEFINE_list('sizes', ['100000', '1000000'], 'Numbers of elements.')
+
+
+def _timed(fn):
+  """Returns seconds taken by calling `fn`."""
+  start = time.perf_counter()
+  fn()
+  return time.perf_counter() - start
+
+
+def main(argv):
+  del argv  # Unused.
+  variants = [
+    ('python', {}),
+    ('python-min', {'reverse': True}),
+    ('heapq-min', {'reverse': True, 'use_heapq': True}),
+  ]
+  if heap._HEAPQ_MAX is not None:
+    variants.append(('heapq', {'use_heapq': True}))
+  print(f'{"elements":>10s} {"heap":>10s} {"heapify":>8s} {"add":>8s} '
+        f'{"remove":>8s}')
+  for size in map(int, FLAGS.sizes):
+    items = [random.random() for _ in range(size)]
+    for name, kwargs in variants:
+      heapify = _timed(lambda: heap.BinaryHeap.heapify(list(items), **kwargs))
+      h = heap.BinaryHeap(**kwargs)
+      add = _timed(lambda: [h.add(item) for item in items])
+      remove = _timed(lambda: [h.remove() for _ in items])
+      print(f'{size:10d} {name:>10s} {heapify:7.3f}s {add:7.3f}s '
+            f'{remove:7.3f}s')
+
+
+if __name__ == '__main__':
+  app.run(main)
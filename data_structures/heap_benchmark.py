@@ -0,0 +1,77 @@
+"""Benchmark of `DaryHeap` for various arities against `BinaryHeap`.
+
+For each size and arity, measures the time of three workloads on random keys:
+
+* add-heavy: adding `size` keys one by one to an empty heap,
+* remove-heavy: removing all keys from a heap of `size` keys,
+* mixed: on a heap of `size` keys, `size` operations each of which is either
+  an addition or a removal, with equal probability.
+
+Usage:
+  python -m data_structures.heap_benchmark --sizes=100000 --arities=2,4,8,16
+"""
+
+import random
+import time
+
+from absl import app
+from absl import flags
+
+from data_structures import heap
+
+FLAGS = flags.FLAGS
+flags.DEFINE_list('sizes', ['10000', '100000'], 'Numbers of keys.')
+flags.DEFINE_list('arities', ['2', '3', '4', '8', '16'], 'Arities of the heap.')
+
+
+def _timed(fn):
+  """Returns seconds taken by calling `fn`."""
+  start = time.perf_counter()
+  fn()
+  return time.perf_counter() - start
+
+
+def _add_heavy(make_heap, keys):
+  h = make_heap([])
+  return _timed(lambda: [h.add(key) for key in keys])
+
+
+def _remove_heavy(make_heap, keys):
+  h = make_heap(list(keys))
+  return _timed(lambda: [h.remove() for _ in keys])
+
+
+def _mixed(make_heap, keys):
+  h = make_heap(list(keys))
+  ops = [random.random() < 0.5 for _ in keys]
+
+  def run():
+    for add, key in zip(ops, keys):
+      if add:
+        h.add(key)
+      else:
+        h.remove()
+
+  return _timed(run)
+
+
+def main(argv):
+  del argv  # Unused.
+  print(f'{"keys":>10s} {"heap":>14s} {"add-heavy":>10s} {"remove-heavy":>13s} '
+        f'{"mixed":>8s}')
+  for size in map(int, FLAGS.sizes):
+    keys = [random.random() for _ in range(size)]
+    heaps = [('BinaryHeap', heap.BinaryHeap.heapify)]
+    for d in map(int, FLAGS.arities):
+      heaps.append((f'DaryHeap(d={d})',
+                    lambda data, d=d: heap.DaryHeap.heapify(data, d=d)))
+    for name, make_heap in heaps:
+      add = _add_heavy(make_heap, keys)
+      remove = _remove_heavy(make_heap, keys)
+      mixed = _mixed(make_heap, keys)
+      print(f'{size:10d} {name:>14s} {add:9.3f}s {remove:12.3f}s '
+            f'{mixed:7.3f}s')
+
+
+if __name__ == '__main__':
+  app.run(main)
@@ -0,0 +1,100 @@
+"""Benchmark of melding heaps, `PairingHeap` and `BinomialHeap` against
+`BinaryHeap`.
+
+Simulates work sharded into per-worker heaps, which are periodically merged
+into a main heap. In each round, every worker adds `adds` random keys to its
+heap, all worker heaps are then merged into the main heap, and `removes` keys
+are removed from it. Measures the total time of the additions, of the merges
+and of the removals.
+
+`PairingHeap` and `BinomialHeap` merge by `meld`, which takes over the nodes of
+the worker heap. `BinaryHeap` has no `meld`, so its merge constructs a new main
+heap by `heapify` of the concatenated list representations of the two heaps.
+
+Usage:
+  python -m data_structures.heap_meld_benchmark --workers=8 --rounds=100 \
+    --adds=1000 --removes=4000
+"""
+
+import random
+import time
+
+from absl import app
+from absl import flags
+
+from data_structures import heap
+
+FLAGS = flags.FLAGS
+flags.DEFINE_integer('workers', 8, 'Number of worker heaps.')
+flags.DEFINE_integer('rounds', 50, 'Number of rounds.')
+flags.DEFINE_integer('adds', 1000, 'Number of keys added to each worker heap '
+                     'in a round.')
+flags.DEFINE_integer('removes', 4000, 'Number of keys removed from the main '
+                     'heap in a round.')
+
+
+def _timed(fn):
+  """Returns seconds taken by calling `fn`."""
+  start = time.perf_counter()
+  fn()
+  return time.perf_counter() - start
+
+
+def _binary_heap_meld(main, other):
+  """Returns a `BinaryHeap` of the elements of `main` and `other`."""
+  return heap.BinaryHeap.heapify(main.as_list() + other.as_list())
+
+
+def _meld(main, other):
+  main.meld(other)
+  return main
+
+
+def _run(heap_class, meld, keys):
+  """Returns seconds taken by additions, merges and removals of the rounds."""
+  main = heap_class()
+  add = merge = remove = 0.0
+  for round_keys in keys:
+    workers = [heap_class() for _ in range(FLAGS.workers)]
+
+    def add_all():
+      for worker, worker_keys in zip(workers, round_keys):
+        for key in worker_keys:
+          worker.add(key)
+
+    def merge_all():
+      nonlocal main
+      for worker in workers:
+        main = meld(main, worker)
+
+    def remove_some():
+      for _ in range(min(FLAGS.removes, main.size())):
+        main.remove()
+
+    add += _timed(add_all)
+    merge += _timed(merge_all)
+    remove += _timed(remove_some)
+  return add, merge, remove, main.size()
+
+
+def main(argv):
+  del argv  # Unused.
+  keys = [[[random.random() for _ in range(FLAGS.adds)]
+           for _ in range(FLAGS.workers)]
+          for _ in range(FLAGS.rounds)]
+  heaps = [
+    ('BinaryHeap', heap.BinaryHeap, _binary_heap_meld),
+    ('PairingHeap', heap.PairingHeap, _meld),
+    ('BinomialHeap', heap.BinomialHeap, _meld),
+  ]
+  print(f'{"heap":>12s} {"add":>8s} {"merge":>8s} {"remove":>8s} '
+        f'{"total":>8s} {"left":>8s}')
+  for name, heap_class, meld in heaps:
+    add, merge, remove, left = _run(heap_class, meld, keys)
+    total = add + merge + remove
+    print(f'{name:>12s} {add:7.3f}s {merge:7.3f}s {remove:7.3f}s '
+          f'{total:7.3f}s {left:8d}')
+
+
+if __name__ == '__main__':
+  app.run(main)
@@ -0,0 +1,90 @@
+"""Benchmark of min-ordered `BinaryHeap` against wrapping its elements.
+
+Compares ways of removing records, pairs of a priority and a name, from a heap
+in increasing order of their priorities:
+
+* wrapper: a max-heap of wrapper objects, which hold the negated priority and
+  the record, like the elements of `priority_queue.PriorityQueue`,
+* key: a min-heap, ordering the records by their priorities through `key`,
+
+and, for reference, ways of removing bare priorities in increasing order:
+
+* negated: a max-heap of negated priorities,
+* reverse: a min-heap of the priorities.
+
+For each size, measures the time of adding `size` random elements one by one to
+an empty heap, of removing all of them, and of constructing the heap of them
+by `heapify`.
+
+Usage:
+  python -m data_structures.heap_order_benchmark --sizes=10000,100000
+"""
+
+import dataclasses
+import operator
+import random
+import time
+from typing import Any
+
+from absl import app
+from absl import flags
+
+from data_structures import heap
+
+FLAGS = flags.FLAGS
+flags.DEFINE_list('sizes', ['10000', '100000'], 'Numbers of elements.')
+
+
+@dataclasses.dataclass(order=True)
+class _Wrapper(object):
+  priority: float
+  item: Any = dataclasses.field(compare=False)
+
+
+def _timed(fn):
+  """Returns seconds taken by calling `fn`."""
+  start = time.perf_counter()
+  fn()
+  return time.perf_counter() - start
+
+
+def _run(kwargs, wrap, unwrap, items):
+  """Returns seconds taken by additions, removals and `heapify` of `items`."""
+  h = heap.BinaryHeap(**kwargs)
+  add = _timed(lambda: [h.add(wrap(item)) for item in items])
+  remove = _timed(lambda: [unwrap(h.remove()) for _ in items])
+  heapify = _timed(
+    lambda: heap.BinaryHeap.heapify([wrap(item) for item in items], **kwargs))
+  return add, remove, heapify
+
+
+def _identity(x):
+  return x
+
+
+def main(argv):
+  del argv  # Unused.
+  # Names, constructor arguments, conversions of an item to an element and
+  # back, and whether the items are records, rather than bare priorities.
+  variants = [
+    ('wrapper', {}, lambda record: _Wrapper(-record[0], record),
+     operator.attrgetter('item'), True),
+    ('key', {'key': operator.itemgetter(0), 'reverse': True}, _identity,
+     _identity, True),
+    ('negated', {}, operator.neg, operator.neg, False),
+    ('reverse', {'reverse': True}, _identity, _identity, False),
+  ]
+  print(f'{"elements":>10s} {"heap":>8s} {"add":>8s} {"remove":>8s} '
+        f'{"heapify":>8s}')
+  for size in map(int, FLAGS.sizes):
+    priorities = [random.random() for _ in range(size)]
+    records = [(priority, f'item{i}') for i, priority in enumerate(priorities)]
+    for name, kwargs, wrap, unwrap, of_records in variants:
+      items = records if of_records else priorities
+      add, remove, heapify = _run(kwargs, wrap, unwrap, items)
+      print(f'{size:10d} {name:>8s} {add:7.3f}s {remove:7.3f}s '
+            f'{heapify:7.3f}s')
+
+
+if __name__ == '__main__':
+  app.run(main)
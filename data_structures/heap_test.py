@@ -2,6 +2,7 @@ from absl.testing import absltest
 from absl.testing import parameterized
 
 import dataclasses
+import random
 
 from data_structures import heap
 
@@ -98,10 +99,237 @@ class BinaryHeapTest(parameterized.TestCase):
     with self.assertRaises(heap.HeapEmptyError):
       h.peek()
 
+  @parameterized.named_parameters(
+    ('largest', 50), ('middle', 5), ('smallest', -1), ('equal_to_root', 9))
+  def test_replace(self, item):
+    h = heap.BinaryHeap.heapify(list(range(10)))
+    self.assertEqual(9, h.replace(item))
+    self._assert_list_represents_heap(h.as_list())
+    self.assertEqual(10, h.size())
+    self.assertCountEqual(list(range(9)) + [item], h.as_list())
+
+  def test_replace_empty_heap_raises(self):
+    h = heap.BinaryHeap()
+    with self.assertRaises(heap.HeapEmptyError):
+      h.replace(1)
+    self.assertEqual(0, h.size())
+
+  @parameterized.named_parameters(
+    ('largest', 50, 50), ('middle', 5, 9), ('smallest', -1, 9),
+    ('equal_to_root', 9, 9))
+  def test_pushpop(self, item, expected):
+    h = heap.BinaryHeap.heapify(list(range(10)))
+    self.assertEqual(expected, h.pushpop(item))
+    self._assert_list_represents_heap(h.as_list())
+    self.assertEqual(10, h.size())
+    expected_items = list(range(10)) + [item]
+    expected_items.remove(expected)
+    self.assertCountEqual(expected_items, h.as_list())
+
+  def test_pushpop_empty_heap(self):
+    h = heap.BinaryHeap()
+    self.assertEqual(1, h.pushpop(1))
+    self.assertEqual(0, h.size())
+
+  def test_replace_and_pushpop_match_remove_and_add(self):
+    rng = random.Random(0)
+    h = heap.BinaryHeap()
+    reference = heap.BinaryHeap()
+    for item in range(100):
+      h.add(item)
+      reference.add(item)
+    for _ in range(200):
+      item = rng.randrange(200)
+      if rng.random() < 0.5:
+        removed = reference.remove()
+        reference.add(item)
+        self.assertEqual(removed, h.replace(item))
+      else:
+        reference.add(item)
+        self.assertEqual(reference.remove(), h.pushpop(item))
+      self._assert_list_represents_heap(h.as_list())
+    self.assertCountEqual(reference.as_list(), h.as_list())
+
   def test_heapify_requires_list(self):
     with self.assertRaises(TypeError):
       heap.BinaryHeap.heapify(tuple(1, 2, 3))
 
+  @parameterized.named_parameters(
+    ('max', None, False),
+    ('min', None, True),
+    ('max_by_key', abs, False),
+    ('min_by_key', abs, True))
+  def test_ordering(self, key, reverse):
+    rng = random.Random(0)
+    # Distinct keys, so that the order of removal is unique.
+    items = [rng.choice([-1, 1]) * i for i in range(1, 201)]
+    rng.shuffle(items)
+    expected = sorted(items, key=key, reverse=not reverse)
+    h = heap.BinaryHeap(key=key, reverse=reverse)
+    for item in items:
+      h.add(item)
+    self.assertEqual(expected[0], h.peek())
+    self.assertListEqual(expected, [h.remove() for _ in items])
+    h = heap.BinaryHeap.heapify(list(items), key=key, reverse=reverse)
+    self.assertListEqual(expected, [h.remove() for _ in items])
+
+  @parameterized.named_parameters(
+    ('max', None, False),
+    ('min', None, True),
+    ('max_by_key', abs, False),
+    ('min_by_key', abs, True))
+  def test_replace_and_pushpop_ordering(self, key, reverse):
+    rng = random.Random(0)
+    top = min if reverse else max
+    key = key or (lambda x: x)
+    items = [rng.choice([-1, 1]) * i for i in range(1, 1001)]
+    rng.shuffle(items)
+    reference = items[:100]
+    h = heap.BinaryHeap.heapify(list(reference), key=key, reverse=reverse)
+    for item in items[100:]:
+      if rng.random() < 0.5:
+        removed = top(reference, key=key)
+        reference.remove(removed)
+        reference.append(item)
+        self.assertEqual(removed, h.replace(item))
+      else:
+        reference.append(item)
+        removed = top(reference, key=key)
+        reference.remove(removed)
+        self.assertEqual(removed, h.pushpop(item))
+      self.assertEqual(top(reference, key=key), h.peek())
+    self.assertCountEqual(reference, h.as_list())
+
+  def test_key_allows_incomparable_elements(self):
+    h = heap.BinaryHeap(key=lambda d: d['priority'], reverse=True)
+    for priority in [3, 1, 2]:
+      h.add({'priority': priority})
+    self.assertListEqual([1, 2, 3],
+                         [h.remove()['priority'] for _ in range(3)])
+
+  def test_key_is_computed_once_per_element(self):
+    calls = []
+
+    def key(item):
+      calls.append(item)
+      return item
+
+    h = heap.BinaryHeap.heapify(list(range(10)), key=key)
+    for item in range(10, 20):
+      h.add(item)
+    h.replace(5)
+    for _ in range(h.size()):
+      h.remove()
+    self.assertCountEqual(list(range(20)) + [5], calls)
+
+  @parameterized.named_parameters(('max', False), ('min', True))
+  def test_heapq_backend_matches_python_implementation(self, reverse):
+    if not reverse and heap._HEAPQ_MAX is None:
+      self.skipTest('heapq has no functions for a max-heap.')
+    rng = random.Random(0)
+    items = [rng.randrange(100) for _ in range(100)]
+    h = heap.BinaryHeap.heapify(list(items), reverse=reverse, use_heapq=True)
+    reference = heap.BinaryHeap.heapify(list(items), reverse=reverse)
+    for _ in range(500):
+      item = rng.randrange(100)
+      op = rng.randrange(4)
+      if op == 0:
+        h.add(item)
+        reference.add(item)
+      elif op == 1 and reference.size():
+        self.assertEqual(reference.remove(), h.remove())
+      elif op == 2 and reference.size():
+        self.assertEqual(reference.replace(item), h.replace(item))
+      else:
+        self.assertEqual(reference.pushpop(item), h.pushpop(item))
+      self.assertEqual(reference.size(), h.size())
+      if reference.size():
+        self.assertEqual(reference.peek(), h.peek())
+    self.assertCountEqual(reference.as_list(), h.as_list())
+    while reference.size():
+      self.assertEqual(reference.remove(), h.remove())
+    with self.assertRaises(heap.HeapEmptyError):
+      h.remove()
+
+  def test_heapq_backend_does_not_support_key(self):
+    with self.assertRaises(ValueError):
+      heap.BinaryHeap(key=abs, reverse=True, use_heapq=True)
+
+  def test_heapq_backend_max_heap_requires_heapq_max_functions(self):
+    if heap._HEAPQ_MAX is not None:
+      self.skipTest('heapq has functions for a max-heap.')
+    with self.assertRaises(ValueError):
+      heap.BinaryHeap(use_heapq=True)
+
+  @parameterized.parameters(0, 1, 3, 10, 100, 1000)
+  def test_add_many(self, num_items):
+    rng = random.Random(num_items)
+    for size in [0, 1, 10, 100]:
+      items = [rng.randrange(1000) for _ in range(size)]
+      new_items = [rng.randrange(1000) for _ in range(num_items)]
+      h = heap.BinaryHeap.heapify(list(items))
+      h.add_many(iter(new_items))
+      self.assertEqual(size + num_items, h.size())
+      self._assert_list_represents_heap(h.as_list())
+      self.assertCountEqual(items + new_items, h.as_list())
+
+  def test_add_many_in_increasing_order(self):
+    h = heap.BinaryHeap.heapify(list(range(100)))
+    h.add_many(range(100, 150))
+    self._assert_list_represents_heap(h.as_list())
+    self.assertListEqual(list(reversed(range(150))), list(h.drain()))
+
+  @parameterized.named_parameters(
+    ('max', {}),
+    ('min', {'reverse': True}),
+    ('max_by_key', {'key': abs}),
+    ('min_by_key', {'key': abs, 'reverse': True}),
+    ('heapq_min', {'reverse': True, 'use_heapq': True}))
+  def test_add_many_and_drain_orderings(self, kwargs):
+    rng = random.Random(0)
+    # Distinct keys, so that the order of removal is unique.
+    items = [rng.choice([-1, 1]) * i for i in range(1, 301)]
+    rng.shuffle(items)
+    h = heap.BinaryHeap(**kwargs)
+    h.add_many(items[:2])
+    h.add_many(items[2:100])
+    h.add(items[100])
+    h.add_many(items[101:])
+    expected = sorted(items, key=kwargs.get('key'),
+                      reverse=not kwargs.get('reverse'))
+    self.assertListEqual(expected[:10], list(h.pop_many(10)))
+    self.assertListEqual(expected[10:], list(h.drain()))
+    self.assertEqual(0, h.size())
+
+  def test_pop_many(self):
+    h = heap.BinaryHeap.heapify(list(range(10)))
+    self.assertListEqual([9, 8, 7], list(h.pop_many(3)))
+    self.assertEqual(7, h.size())
+    self.assertListEqual([], list(h.pop_many(0)))
+    self.assertListEqual([6, 5, 4, 3, 2, 1, 0], list(h.pop_many(100)))
+    self.assertListEqual([], list(h.pop_many(1)))
+
+  def test_pop_many_removes_only_yielded_elements(self):
+    h = heap.BinaryHeap.heapify(list(range(10)))
+    items = h.pop_many(5)
+    self.assertEqual(10, h.size())
+    self.assertEqual(9, next(items))
+    self.assertEqual(8, next(items))
+    self.assertEqual(8, h.size())
+    del items
+    self.assertEqual(7, h.peek())
+    self.assertEqual(8, h.size())
+
+  def test_drain_sees_elements_added_while_draining(self):
+    h = heap.BinaryHeap.heapify([1, 3])
+    drained = []
+    for item in h.drain():
+      drained.append(item)
+      if item == 3:
+        h.add(2)
+    self.assertListEqual([3, 2, 1], drained)
+    self.assertEqual(0, h.size())
+
   def _assert_list_represents_heap(self, lst):
     """Ensures that given list represents a heap."""
     for i in range(heap._parent(len(lst))):
@@ -109,5 +337,296 @@ class BinaryHeapTest(parameterized.TestCase):
       self.assertGreaterEqual(lst[i], lst[heap._right(i)])
 
 
+class DaryHeapTest(parameterized.TestCase):
+  """Tests for `DaryHeap`."""
+
+  @parameterized.parameters(2, 3, 4, 8)
+  def test_heapify(self, d):
+    for num_elements in [0, 1, 2, 5, 9, 10, 100]:
+      data = list(range(num_elements))
+      random.Random(num_elements).shuffle(data)
+      h = heap.DaryHeap.heapify(data, d=d)
+      self.assertIsInstance(h, heap.DaryHeap)
+      self.assertEqual(d, h.arity())
+      self._assert_list_represents_heap(h.as_list(), d)
+
+  @parameterized.parameters(2, 3, 4, 8)
+  def test_largest_item_popped(self, d):
+    rng = random.Random(d)
+    items = [rng.randrange(100) for _ in range(200)]
+    h = heap.DaryHeap(d)
+    for i, item in enumerate(items):
+      h.add(item)
+      self.assertEqual(i + 1, h.size())
+      self.assertEqual(max(items[:i + 1]), h.peek())
+    self._assert_list_represents_heap(h.as_list(), d)
+    for item in sorted(items, reverse=True):
+      self.assertEqual(item, h.remove())
+    self.assertEqual(0, h.size())
+    with self.assertRaises(heap.HeapEmptyError):
+      h.remove()
+
+  @parameterized.parameters(2, 3, 4, 8)
+  def test_replace_and_pushpop(self, d):
+    h = heap.DaryHeap.heapify(list(range(50)), d=d)
+    self.assertEqual(49, h.replace(10))
+    self.assertEqual(48, h.pushpop(20))
+    self.assertEqual(100, h.pushpop(100))
+    self._assert_list_represents_heap(h.as_list(), d)
+    self.assertEqual(50, h.size())
+
+  def test_default_arity(self):
+    self.assertEqual(4, heap.DaryHeap().arity())
+
+  @parameterized.parameters(1, 0, -2)
+  def test_invalid_arity_raises(self, d):
+    with self.assertRaises(ValueError):
+      heap.DaryHeap(d)
+
+  @parameterized.parameters(2, 3, 4, 8)
+  def test_add_many_and_drain(self, d):
+    rng = random.Random(d)
+    items = [rng.randrange(1000) for _ in range(300)]
+    h = heap.DaryHeap.heapify(items[:50], d=d)
+    h.add_many(items[50:53])
+    h.add_many(items[53:])
+    self._assert_list_represents_heap(h.as_list(), d)
+    self.assertListEqual(sorted(items, reverse=True), list(h.drain()))
+
+  def _assert_list_represents_heap(self, lst, d):
+    """Ensures that given list represents a d-ary heap."""
+    for i in range(1, len(lst)):
+      self.assertGreaterEqual(lst[(i - 1) // d], lst[i])
+
+
+class IndexedHeapTest(parameterized.TestCase):
+  """Tests for `IndexedHeap`."""
+
+  def test_update_moves_element_up(self):
+    h = heap.IndexedHeap()
+    handles = [h.add(i) for i in range(10)]
+    h.update(handles[2], 20)
+    self.assertEqual(20, h.peek())
+    self._assert_heap_is_consistent(h)
+
+  def test_update_moves_element_down(self):
+    h = heap.IndexedHeap()
+    handles = [h.add(i) for i in range(10)]
+    h.update(handles[9], -1)
+    self.assertEqual(8, h.peek())
+    self._assert_heap_is_consistent(h)
+    self.assertListEqual([8, 7, 6, 5, 4, 3, 2, 1, 0, -1],
+                         [h.remove() for _ in range(10)])
+
+  def test_remove_handle(self):
+    h = heap.IndexedHeap()
+    handles = [h.add(i) for i in range(10)]
+    for i in [3, 9, 0, 5]:
+      self.assertEqual(i, h.remove_handle(handles[i]))
+      self._assert_heap_is_consistent(h)
+    self.assertEqual(6, h.size())
+    self.assertListEqual([8, 7, 6, 4, 2, 1], [h.remove() for _ in range(6)])
+
+  def test_removed_handle_raises(self):
+    h = heap.IndexedHeap()
+    a = h.add(1)
+    b = h.add(2)
+    c = h.add(0)
+    h.remove_handle(a)
+    self.assertEqual(2, h.remove())
+    self.assertEqual(0, h.replace(5))
+    for handle in [a, b, c]:
+      with self.assertRaises(ValueError):
+        h.update(handle, 3)
+      with self.assertRaises(ValueError):
+        h.remove_handle(handle)
+    self.assertListEqual([5], h.as_list())
+
+  def test_handle_of_other_heap_raises(self):
+    h = heap.IndexedHeap()
+    h.add(1)
+    handle = heap.IndexedHeap().add(1)
+    with self.assertRaises(ValueError):
+      h.remove_handle(handle)
+
+  @parameterized.parameters(1, 3, 50)
+  def test_add_many_returns_handles(self, num_items):
+    h = heap.IndexedHeap()
+    for item in range(0, 100, 2):
+      h.add(item)
+    items = list(range(1, 2 * num_items, 2))
+    handles = h.add_many(items)
+    self.assertListEqual(items, [handle.item for handle in handles])
+    self._assert_heap_is_consistent(h)
+    h.update(handles[0], 1000)
+    self.assertEqual(1000, h.remove())
+    self.assertListEqual(sorted(h.as_list(), reverse=True), list(h.drain()))
+    for handle in handles:
+      with self.assertRaises(ValueError):
+        h.remove_handle(handle)
+
+  def test_heapify(self):
+    data = list(range(20))
+    random.Random(0).shuffle(data)
+    h = heap.IndexedHeap.heapify(data)
+    self.assertIsInstance(h, heap.IndexedHeap)
+    self._assert_heap_is_consistent(h)
+    self.assertListEqual(list(reversed(range(20))),
+                         [h.remove() for _ in range(20)])
+
+  def test_heapify_takes_no_constructor_arguments(self):
+    with self.assertRaises(TypeError):
+      heap.IndexedHeap.heapify([3, 1, 2], reverse=True)
+
+  def test_random_operations_match_sorted_list(self):
+    rng = random.Random(0)
+    h = heap.IndexedHeap()
+    handles = []
+    for _ in range(1000):
+      op = rng.randrange(5)
+      if op == 0 or not handles:
+        handles.append(h.add(rng.randrange(100)))
+      elif op == 1:
+        handle = handles.pop(rng.randrange(len(handles)))
+        self.assertEqual(handle.item, h.remove_handle(handle))
+      elif op == 2:
+        h.update(rng.choice(handles), rng.randrange(100))
+      elif op == 3:
+        expected = max(handle.item for handle in handles)
+        self.assertEqual(expected, h.remove())
+        handles = [handle for handle in handles if handle.idx >= 0]
+      else:
+        self.assertEqual(max(handle.item for handle in handles), h.peek())
+      self.assertEqual(len(handles), h.size())
+    self._assert_heap_is_consistent(h)
+
+  def _assert_heap_is_consistent(self, h):
+    """Ensures the heap property and the positions stored in handles."""
+    for idx, handle in enumerate(h._heap):
+      self.assertEqual(idx, handle.idx)
+    lst = h.as_list()
+    for i in range(1, len(lst)):
+      self.assertGreaterEqual(lst[(i - 1) // 2], lst[i])
+
+
+class MeldableHeapTest(parameterized.TestCase):
+  """Tests for `PairingHeap` and `BinomialHeap`."""
+
+  @parameterized.named_parameters(
+    ('pairing', heap.PairingHeap), ('binomial', heap.BinomialHeap))
+  def test_empty_heap(self, heap_class):
+    h = heap_class()
+    self.assertEqual(0, h.size())
+    with self.assertRaises(heap.HeapEmptyError):
+      h.peek()
+    with self.assertRaises(heap.HeapEmptyError):
+      h.remove()
+
+  @parameterized.named_parameters(
+    ('pairing', heap.PairingHeap), ('binomial', heap.BinomialHeap))
+  def test_largest_item_popped(self, heap_class):
+    rng = random.Random(0)
+    items = [rng.randrange(100) for _ in range(300)]
+    h = heap_class()
+    for i, item in enumerate(items):
+      h.add(item)
+      self.assertEqual(i + 1, h.size())
+      self.assertEqual(max(items[:i + 1]), h.peek())
+    self.assertListEqual(sorted(items, reverse=True),
+                         [h.remove() for _ in items])
+    self.assertEqual(0, h.size())
+
+  @parameterized.named_parameters(
+    ('pairing', heap.PairingHeap), ('binomial', heap.BinomialHeap))
+  def test_meld(self, heap_class):
+    rng = random.Random(0)
+    items = []
+    h = heap_class()
+    for num_items in [0, 1, 5, 0, 16, 33, 2]:
+      other = heap_class()
+      for _ in range(num_items):
+        item = rng.randrange(1000)
+        items.append(item)
+        other.add(item)
+      h.meld(other)
+      self.assertEqual(0, other.size())
+      with self.assertRaises(heap.HeapEmptyError):
+        other.peek()
+      self.assertEqual(len(items), h.size())
+      if items:
+        self.assertEqual(max(items), h.peek())
+    # The melded heap is empty, but usable.
+    other.add(-1)
+    self.assertEqual(-1, other.remove())
+    self.assertListEqual(sorted(items, reverse=True),
+                         [h.remove() for _ in items])
+
+  @parameterized.named_parameters(
+    ('pairing', heap.PairingHeap), ('binomial', heap.BinomialHeap))
+  def test_meld_into_empty_heap(self, heap_class):
+    h, other = heap_class(), heap_class()
+    for item in [3, 1, 2]:
+      other.add(item)
+    h.meld(other)
+    self.assertListEqual([3, 2, 1], [h.remove() for _ in range(3)])
+
+  @parameterized.named_parameters(
+    ('pairing', heap.PairingHeap), ('binomial', heap.BinomialHeap))
+  def test_meld_with_itself_raises(self, heap_class):
+    h = heap_class()
+    h.add(1)
+    with self.assertRaises(ValueError):
+      h.meld(h)
+    self.assertEqual(1, h.size())
+
+  def test_meld_with_other_type_raises(self):
+    with self.assertRaises(TypeError):
+      heap.PairingHeap().meld(heap.BinomialHeap())
+    with self.assertRaises(TypeError):
+      heap.BinomialHeap().meld(heap.BinaryHeap())
+
+  @parameterized.named_parameters(
+    ('pairing', heap.PairingHeap), ('binomial', heap.BinomialHeap))
+  def test_random_operations_match_binary_heap(self, heap_class):
+    rng = random.Random(0)
+    heaps = [heap_class() for _ in range(4)]
+    references = [[] for _ in range(4)]
+    for _ in range(2000):
+      i = rng.randrange(4)
+      op = rng.randrange(5)
+      if op < 2:
+        item = rng.randrange(100)
+        heaps[i].add(item)
+        references[i].append(item)
+      elif op < 4 and references[i]:
+        largest = max(references[i])
+        references[i].remove(largest)
+        self.assertEqual(largest, heaps[i].remove())
+      elif op == 4:
+        j = rng.randrange(4)
+        if i != j:
+          heaps[i].meld(heaps[j])
+          references[i].extend(references[j])
+          references[j] = []
+      for h, reference in zip(heaps, references):
+        self.assertEqual(len(reference), h.size())
+    for h, reference in zip(heaps, references):
+      self.assertListEqual(sorted(reference, reverse=True),
+                           [h.remove() for _ in reference])
+
+  def test_binomial_heap_has_tree_per_set_bit_of_size(self):
+    h = heap.BinomialHeap()
+    for item in range(100):
+      h.add(item)
+    for _ in range(37):
+      h.remove()
+    self.assertEqual(63, h.size())
+    # 63 is 0b111111, so there is a tree of each of the orders 0 to 5.
+    self.assertLen(h._trees, 6)
+    for order, tree in enumerate(h._trees):
+      self.assertIsNotNone(tree)
+      self.assertEqual(order, tree.order)
+
+
 if __name__ == '__main__':
   absltest.main()
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""Implementation of an interval tree."""
+
+import itertools
+
+from data_structures import binary_search_tree
+
+
+class _IntervalTreeNode(binary_search_tree._AVLTreeNode):
+  """Representation of a node in an `IntervalTree`.
+
+  The key of the node is the interval `(start, end)`, and `max_end` is the
+  largest end of an interval in its subtree.
+  """
+
+  __slots__ = ('max_end',)
+
+  def __init__(self, value, key, left=None, right=None, parent=None):
+    super().__init__(value, key, left, right, parent)
+    self.max_end = key[1]
+
+
+class IntervalTree(binary_search_tree.AVLTree):
+  """Implementation of an interval tree.
+
+  An interval tree is a data structure which serves as a collection of closed
+  intervals, allows for addition and removal of intervals, and finding the
+  intervals which overlap a given point or interval.
+
+  Representation.
+
+  The tree is an `AVLTree` of the intervals, ordered by their start, and then
+  by their end. Each interval is represented as a pair `(start, end)` with
+  `start <= end`, either by the items themselves, or by a `key` function passed
+  to the constructor, such as `key=lambda r: (r.start, r.end)`. Addition,
+  removal, rotations and all other operations are inherited from `AVLTree`.
+
+  Augmentation.
+
+  Each node additionally stores the largest end of an interval in its subtree.
+  It is recomputed from the children whenever the subtree changes, along with
+  the height and size, so it is maintained by the inherited operations at no
+  extra asymptotic cost.
+
+  Queries.
+
+  A subtree whose largest end is smaller than the start of a query interval
+  contains no overlapping interval, and neither does the subtree to the right of
+  a node whose interval starts after its end. `find_overlap` uses this to find
+  one overlapping interval in `O(log(n))` time, walking down a single path.
+  `overlapping` and `stabbing` find all `k` overlapping intervals, in order of
+  their start, visiting only subtrees containing one of them, which takes
+  `O(min(n, (k + 1) * log(n)))` time, compared to `O(n)` for filtering a list.
+  """
+
+  _node_class = _IntervalTreeNode
+
+  def find_overlap(self, lo, hi, default=None):
+    """Returns an interval overlapping `[lo, hi]`, or `default` if none does.
+
+    Args:
+      lo: The start of the query interval.
+      hi: The end of the query interval.
+      default: The value returned if no interval overlaps the query interval.
+
+    Returns:
+      An item in the tree whose interval `(start, end)` satisfies
+      `start <= hi` and `lo <= end`, or `default`.
+    """
+    node = self._root
+    while node is not None:
+      start, end = node.key
+      if not hi < start and not end < lo:
+        return node.value
+      # If the left subtree reaches `lo` but has no overlap, all its intervals
+      # reaching `lo` start after `hi`, and so do all intervals to the right.
+      if node.left is not None and not node.left.max_end < lo:
+        node = node.left
+      else:
+        node = node.right
+    return default
+
+  def overlapping(self, lo, hi):
+    """Yields intervals overlapping `[lo, hi]` in order of their start.
+
+    Args:
+      lo: The start of the query interval.
+      hi: The end of the query interval.
+
+    Yields:
+      Items in the tree whose interval `(start, end)` satisfies `start <= hi`
+      and `lo <= end`.
+    """
+    stack = []
+    node = self._root
+    while True:
+      # Walk down to the left, skipping subtrees which end before `lo`.
+      while node is not None and not node.max_end < lo:
+        stack.append(node)
+        node = node.left
+      if not stack:
+        return
+      node = stack.pop()
+      start, end = node.key
+      if hi < start:
+        return  # All the remaining intervals start after `hi`.
+      if not end < lo:
+        if node.count == 1:
+          yield node.value
+        else:
+          yield from itertools.repeat(node.value, node.count)
+      node = node.right
+
+  def stabbing(self, point):
+    """Yields intervals containing `point` in order of their start."""
+    return self.overlapping(point, point)
+
+  def _update(self, node):
+    """Recomputes the height, size and largest end of `node`."""
+    super()._update(node)
+    max_end = node.key[1]
+    if node.left is not None and max_end < node.left.max_end:
+      max_end = node.left.max_end
+    if node.right is not None and max_end < node.right.max_end:
+      max_end = node.right.max_end
+    node.max_end = max_end
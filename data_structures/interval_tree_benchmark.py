@@ -0,0 +1,64 @@
+"""Benchmark of `IntervalTree` against filtering a list of intervals.
+
+For each size, builds an interval tree of random intervals, and measures the
+time of stabbing and overlap queries, compared to filtering the list of all
+intervals linearly.
+
+Usage:
+  python -m data_structures.interval_tree_benchmark --sizes=100000,1000000
+"""
+
+import random
+import time
+
+from absl import app
+from absl import flags
+
+from data_structures import interval_tree
+
+FLAGS = flags.FLAGS
+flags.DEFINE_list('sizes', ['10000', '100000'], 'Numbers of intervals.')
+flags.DEFINE_integer('num_queries', 100, 'Number of queries.')
+flags.DEFINE_integer('max_length', 100, 'Maximum length of an interval.')
+flags.DEFINE_integer('query_length', 100, 'Length of overlap queries.')
+
+
+def _timed(fn):
+  """Returns seconds taken by calling `fn`."""
+  start = time.perf_counter()
+  fn()
+  return time.perf_counter() - start
+
+
+def main(argv):
+  del argv  # Unused.
+  print(f'{"intervals":>10s} {"query":>10s} {"list":>8s} {"tree":>8s} '
+        f'{"results":>8s}')
+  for size in map(int, FLAGS.sizes):
+    intervals = []
+    for _ in range(size):
+      start = random.randrange(10 * size)
+      intervals.append((start, start + random.randrange(FLAGS.max_length)))
+    tree = interval_tree.IntervalTree.from_array(intervals)
+    queries = [random.randrange(10 * size) for _ in range(FLAGS.num_queries)]
+    for name, length in [('stabbing', 0), ('overlap', FLAGS.query_length)]:
+      results = []
+
+      def linear():
+        for lo in queries:
+          hi = lo + length
+          results.append([i for i in intervals if i[0] <= hi and lo <= i[1]])
+
+      def indexed():
+        for lo in queries:
+          list(tree.overlapping(lo, lo + length))
+
+      list_time = _timed(linear)
+      tree_time = _timed(indexed)
+      average = sum(map(len, results)) / len(results)
+      print(f'{size:10d} {name:>10s} {list_time:7.3f}s {tree_time:7.3f}s '
+            f'{average:8.1f}')
+
+
+if __name__ == '__main__':
+  app.run(main)
@@ -0,0 +1,134 @@
+import dataclasses
+import random
+
+from absl.testing import absltest
+from absl.testing import parameterized
+
+from data_structures import binary_search_tree
+from data_structures import interval_tree
+
+
+def _random_intervals(rng, num_intervals, span=1000, max_length=50):
+  """Returns a list of random `(start, end)` pairs."""
+  intervals = []
+  for _ in range(num_intervals):
+    start = rng.randrange(span)
+    intervals.append((start, start + rng.randrange(max_length)))
+  return intervals
+
+
+@dataclasses.dataclass(frozen=True)
+class _Event(object):
+  name: str
+  start: int
+  end: int
+
+
+class IntervalTreeTest(parameterized.TestCase):
+  """Tests for `IntervalTree`."""
+
+  def test_empty_tree(self):
+    tree = interval_tree.IntervalTree()
+    self.assertIsNone(tree.find_overlap(0, 10))
+    self.assertListEqual([], list(tree.overlapping(0, 10)))
+    self.assertListEqual([], list(tree.stabbing(0)))
+
+  @parameterized.named_parameters(
+    ('point_inside', 5, 5, [(1, 10), (5, 5)]),
+    ('touching_end', 10, 12, [(1, 10), (10, 20)]),
+    ('touching_start', -5, 1, [(1, 10)]),
+    ('covering', 0, 100, [(1, 10), (5, 5), (10, 20), (30, 40)]),
+    ('gap', 21, 29, []),
+    ('after', 41, 50, []))
+  def test_overlapping(self, lo, hi, expected):
+    tree = interval_tree.IntervalTree.from_array(
+      [(10, 20), (1, 10), (30, 40), (5, 5)])
+    self.assertListEqual(expected, list(tree.overlapping(lo, hi)))
+    if expected:
+      self.assertIn(tree.find_overlap(lo, hi), expected)
+    else:
+      self.assertEqual('none', tree.find_overlap(lo, hi, default='none'))
+
+  @parameterized.parameters(range(5))
+  def test_matches_linear_filter(self, seed):
+    rng = random.Random(seed)
+    intervals = _random_intervals(rng, 300)
+    tree = interval_tree.IntervalTree()
+    for interval in intervals:
+      tree.add(interval)
+    for interval in intervals[:100]:
+      tree.remove(interval)
+    intervals = sorted(intervals[100:])
+    self._assert_max_end(tree)
+    for _ in range(100):
+      lo = rng.randrange(-50, 1100)
+      hi = lo + rng.randrange(30)
+      expected = [(s, e) for s, e in intervals if s <= hi and lo <= e]
+      self.assertListEqual(expected, list(tree.overlapping(lo, hi)))
+      found = tree.find_overlap(lo, hi)
+      if expected:
+        self.assertIn(found, expected)
+      else:
+        self.assertIsNone(found)
+      self.assertListEqual([(s, e) for s, e in intervals if s <= lo <= e],
+                           list(tree.stabbing(lo)))
+
+  def test_key_function(self):
+    events = [_Event('a', 0, 5), _Event('b', 3, 8), _Event('c', 9, 9)]
+    tree = interval_tree.IntervalTree.from_array(
+      events, key=lambda e: (e.start, e.end))
+    self.assertListEqual(events[:2], list(tree.stabbing(4)))
+    self.assertListEqual(events[1:], list(tree.overlapping(6, 9)))
+    tree.remove(events[1])
+    self.assertListEqual([events[0]], list(tree.stabbing(4)))
+    self._assert_max_end(tree)
+
+  def test_multiset(self):
+    tree = interval_tree.IntervalTree(multiset=True)
+    for interval in [(1, 3), (1, 3), (2, 6)]:
+      tree.add(interval)
+    self.assertListEqual([(1, 3), (1, 3), (2, 6)], list(tree.stabbing(2)))
+    tree.remove((2, 6))
+    self.assertListEqual([], list(tree.stabbing(5)))
+    self._assert_max_end(tree)
+
+  def test_split_and_join_keep_max_end(self):
+    intervals = _random_intervals(random.Random(0), 200)
+    tree = interval_tree.IntervalTree.from_array(intervals)
+    left, right = tree.split((500, 0))
+    self.assertIsInstance(left, interval_tree.IntervalTree)
+    self._assert_max_end(left)
+    self._assert_max_end(right)
+    joined = interval_tree.IntervalTree.join(left, right)
+    self._assert_max_end(joined)
+    self.assertListEqual(sorted(intervals), joined.in_order_walk())
+
+  def test_sorted_input_is_balanced(self):
+    tree = interval_tree.IntervalTree()
+    for start in range(1000):
+      tree.add((start, start + 1))
+    self.assertLessEqual(tree._root.height, 15)
+    self._assert_max_end(tree)
+    self.assertListEqual([(499, 500), (500, 501)], list(tree.stabbing(500)))
+
+  def test_remove_missing_raises(self):
+    tree = interval_tree.IntervalTree.from_array([(1, 2)])
+    with self.assertRaises(binary_search_tree.NotInTreeError):
+      tree.remove((1, 3))
+
+  def _assert_max_end(self, tree):
+    """Ensures `max_end` is the largest end in each subtree."""
+
+    def check(node):
+      if node is None:
+        return None
+      ends = [node.key[1], check(node.left), check(node.right)]
+      max_end = max(end for end in ends if end is not None)
+      self.assertEqual(max_end, node.max_end)
+      return max_end
+
+    check(tree._root)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,304 @@
+"""Implementation of a persistent binary search tree."""
+
+from data_structures import binary_search_tree
+
+
+class _PersistentNode(object):
+  """Representation of a node in a `PersistentBinarySearchTree`.
+
+  Nodes are never modified after they are created, so they can be shared by any
+  number of versions of the tree.
+  """
+
+  __slots__ = ('value', 'key', 'left', 'right', 'height', 'size')
+
+  def __init__(self, value, key, left, right):
+    self.value = value
+    self.key = key
+    self.left = left
+    self.right = right
+    self.height = 1 + max(_height(left), _height(right))
+    self.size = 1 + _size(left) + _size(right)
+
+
+class PersistentBinarySearchTree(object):
+  """Implementation of a persistent binary search tree.
+
+  A persistent binary search tree is a data structure with the same operations
+  as `binary_search_tree.BinarySearchTree`, which additionally preserves all of
+  its previous versions. Taking a snapshot of the current version takes `O(1)`
+  time, and the snapshot is not affected by any later changes to the tree.
+
+  Path copying.
+
+  Nodes of the tree are immutable. Instead of modifying the tree in place,
+  addition and removal create new copies of the nodes on the path from the root
+  to the changed node, which point to the untouched subtrees of the previous
+  version. The new version thus shares all but `O(log(n))` nodes with the
+  previous one. The tree is kept balanced as an AVL tree (see
+  `binary_search_tree.AVLTree`), rebalancing the copied path on the way up.
+
+  Concurrent readers.
+
+  The tree holds only a reference to the root node of its current version,
+  which is replaced by a single assignment after each change. Readers can thus
+  search or iterate a consistent version of the tree while a single writer
+  keeps changing it, without any locking and without copying the tree. Each
+  operation, including iteration, works with the version which was current when
+  it started, and `snapshot` can be used to keep working with one version.
+  """
+
+  def __init__(self, key=None):
+    """Constructs an empty tree.
+
+    Args:
+      key: A function of one argument returning the key by which an item is
+        ordered, or `None` to order the items themselves.
+    """
+    self._root = None
+    self._key = key
+
+  @classmethod
+  def from_array(cls, array, **kwargs):
+    """Constructs `PersistentBinarySearchTree` containing given data.
+
+    The data is sorted, and a perfectly balanced tree is built from it
+    directly, in `O(n)` time after sorting.
+
+    Args:
+      array: A list of elements to be stored in the tree.
+      **kwargs: Keyword arguments passed to the constructor.
+
+    Returns:
+      A `PersistentBinarySearchTree`.
+
+    Raises:
+      `TypeError` if `array` is not a list.
+    """
+    if not isinstance(array, list):
+      raise TypeError(f'Provided data must be a list, but is {type(array)}.')
+    tree = cls(**kwargs)
+    values = sorted(array, key=tree._key)
+    keys = values if tree._key is None else list(map(tree._key, values))
+    tree._root = _build_balanced(values, keys, 0, len(values))
+    return tree
+
+  def snapshot(self):
+    """Returns a copy of the current version of the tree in `O(1)` time.
+
+    Changes to the returned tree do not affect this tree, and vice versa.
+    """
+    tree = type(self)(key=self._key)
+    tree._root = self._root
+    return tree
+
+  def add(self, item):
+    """Adds `item` to the tree.
+
+    Args:
+      item: An object to be added.
+    """
+    key = item if self._key is None else self._key(item)
+    self._root = _insert(self._root, item, key)
+
+  def remove(self, item):
+    """Removes the item and returns it.
+
+    Args:
+      item: An item to be removed.
+
+    Returns:
+      The removed item.
+
+    Raises:
+      NotInTreeError: If `item` is not in the tree.
+    """
+    key = item if self._key is None else self._key(item)
+    self._root, removed = _delete(self._root, key)
+    return removed
+
+  def search(self, item):
+    """Searches for an the item and returns it.
+
+    Args:
+      item: An item to be found.
+
+    Returns:
+      The found item.
+
+    Raises:
+      NotInTreeError: If `item` is not in the tree.
+    """
+    key = item if self._key is None else self._key(item)
+    node = self._root
+    while node is not None and key != node.key:
+      if key < node.key:
+        node = node.left
+      else:
+        node = node.right
+    if node is None:
+      raise binary_search_tree.NotInTreeError()
+    return node.value
+
+  def minimum(self):
+    """Returns the smallest item in the tree."""
+    node = self._root
+    if node is None:
+      raise binary_search_tree.TreeEmptyError()
+    while node.left is not None:
+      node = node.left
+    return node.value
+
+  def maximum(self):
+    """Returns the largest item in the tree."""
+    node = self._root
+    if node is None:
+      raise binary_search_tree.TreeEmptyError()
+    while node.right is not None:
+      node = node.right
+    return node.value
+
+  def size(self):
+    """Returns the number of elements in the tree."""
+    return _size(self._root)
+
+  def in_order_walk(self):
+    """Returns ordered items in the tree.
+
+    Returns:
+      A list of items in the tree in increasing order.
+    """
+    return list(self)
+
+  def __iter__(self):
+    """Yields items of the current version in increasing order."""
+    stack = []
+    node = self._root
+    while stack or node is not None:
+      while node is not None:
+        stack.append(node)
+        node = node.left
+      node = stack.pop()
+      yield node.value
+      node = node.right
+
+  def iter_range(self, lo, hi):
+    """Yields items `x` with `lo <= x <= hi` of the current version in order."""
+    if self._key is not None:
+      lo, hi = self._key(lo), self._key(hi)
+    # The stack holds the nodes with keys at least `lo` on the path to the first
+    # such node, whose right subtrees are yet to be visited.
+    stack = []
+    node = self._root
+    while node is not None:
+      if node.key < lo:
+        node = node.right
+      else:
+        stack.append(node)
+        node = node.left
+    while stack:
+      node = stack.pop()
+      if hi < node.key:
+        return
+      yield node.value
+      node = node.right
+      while node is not None:
+        stack.append(node)
+        node = node.left
+
+
+def _build_balanced(values, keys, start, end):
+  """Builds balanced subtree of items in `values[start:end]`."""
+  if start >= end:
+    return None
+  middle = (start + end) // 2
+  return _PersistentNode(values[middle], keys[middle],
+                         _build_balanced(values, keys, start, middle),
+                         _build_balanced(values, keys, middle + 1, end))
+
+
+def _insert(node, item, key):
+  """Returns a new version of subtree under `node` with `item` added."""
+  if node is None:
+    return _PersistentNode(item, key, None, None)
+  if key < node.key:
+    return _balance(node.value, node.key, _insert(node.left, item, key),
+                    node.right)
+  return _balance(node.value, node.key, node.left,
+                  _insert(node.right, item, key))
+
+
+def _delete(node, key):
+  """Returns a new version of subtree under `node` with `key` removed.
+
+  Returns:
+    A tuple of the root of the new version of the subtree, and the removed item.
+
+  Raises:
+    NotInTreeError: If `key` is not in the subtree.
+  """
+  if node is None:
+    raise binary_search_tree.NotInTreeError()
+  if key == node.key:
+    if node.left is None:
+      return node.right, node.value
+    if node.right is None:
+      return node.left, node.value
+    right, successor = _delete_minimum(node.right)
+    return (_balance(successor.value, successor.key, node.left, right),
+            node.value)
+  if key < node.key:
+    left, removed = _delete(node.left, key)
+    return _balance(node.value, node.key, left, node.right), removed
+  right, removed = _delete(node.right, key)
+  return _balance(node.value, node.key, node.left, right), removed
+
+
+def _delete_minimum(node):
+  """Returns a new version of subtree under `node` without its minimum.
+
+  Returns:
+    A tuple of the root of the new version of the subtree, and the removed node.
+  """
+  if node.left is None:
+    return node.right, node
+  left, minimum = _delete_minimum(node.left)
+  return _balance(node.value, node.key, left, node.right), minimum
+
+
+def _balance(value, key, left, right):
+  """Returns a new node with given contents, rotated to keep the AVL property.
+
+  The heights of `left` and `right` can differ by at most two.
+  """
+  left_height, right_height = _height(left), _height(right)
+  if left_height > right_height + 1:
+    if _height(left.left) < _height(left.right):
+      pivot = left.right
+      return _PersistentNode(
+        pivot.value, pivot.key,
+        _PersistentNode(left.value, left.key, left.left, pivot.left),
+        _PersistentNode(value, key, pivot.right, right))
+    return _PersistentNode(left.value, left.key, left.left,
+                           _PersistentNode(value, key, left.right, right))
+  if right_height > left_height + 1:
+    if _height(right.right) < _height(right.left):
+      pivot = right.left
+      return _PersistentNode(
+        pivot.value, pivot.key,
+        _PersistentNode(value, key, left, pivot.left),
+        _PersistentNode(right.value, right.key, pivot.right, right.right))
+    return _PersistentNode(right.value, right.key,
+                           _PersistentNode(value, key, left, right.left),
+                           right.right)
+  return _PersistentNode(value, key, left, right)
+
+
+def _height(node):
+  """Returns the height of subtree under `node`, which can be `None`."""
+  return 0 if node is None else node.height
+
+
+def _size(node):
+  """Returns the size of subtree under `node`, which can be `None`."""
+  return 0 if node is None else node.size
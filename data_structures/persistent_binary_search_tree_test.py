@@ -0,0 +1,131 @@
+import itertools
+import random
+
+from absl.testing import absltest
+from absl.testing import parameterized
+
+from data_structures import binary_search_tree
+from data_structures import persistent_binary_search_tree
+
+
+class PersistentBinarySearchTreeTest(parameterized.TestCase):
+  """Tests for `PersistentBinarySearchTree`."""
+
+  def test_empty_tree(self):
+    tree = persistent_binary_search_tree.PersistentBinarySearchTree()
+    self.assertEqual(0, tree.size())
+    self.assertListEqual([], tree.in_order_walk())
+    with self.assertRaises(binary_search_tree.TreeEmptyError):
+      tree.minimum()
+    with self.assertRaises(binary_search_tree.TreeEmptyError):
+      tree.maximum()
+    with self.assertRaises(binary_search_tree.NotInTreeError):
+      tree.search(1)
+    with self.assertRaises(binary_search_tree.NotInTreeError):
+      tree.remove(1)
+
+  @parameterized.named_parameters(
+    (f'case_{i}', list(perm)) for i, perm in
+    enumerate(itertools.permutations(range(5))))
+  def test_add_and_remove_keep_balance(self, array):
+    tree = persistent_binary_search_tree.PersistentBinarySearchTree()
+    for item in array:
+      tree.add(item)
+      self._assert_avl_property(tree)
+    self.assertListEqual([0, 1, 2, 3, 4], tree.in_order_walk())
+    expected = [0, 1, 2, 3, 4]
+    for item in reversed(array):
+      self.assertEqual(item, tree.remove(item))
+      expected.remove(item)
+      self._assert_avl_property(tree)
+      self.assertListEqual(expected, tree.in_order_walk())
+
+  def test_search_minimum_maximum(self):
+    tree = persistent_binary_search_tree.PersistentBinarySearchTree.from_array(
+      [5, 3, 8, 1, 4, 4])
+    self._assert_avl_property(tree)
+    self.assertEqual(6, tree.size())
+    self.assertEqual(4, tree.search(4))
+    self.assertEqual(1, tree.minimum())
+    self.assertEqual(8, tree.maximum())
+    with self.assertRaises(binary_search_tree.NotInTreeError):
+      tree.search(2)
+
+  def test_from_array_requires_list(self):
+    with self.assertRaises(TypeError):
+      persistent_binary_search_tree.PersistentBinarySearchTree.from_array(
+        (1, 2, 3))
+
+  def test_snapshot_is_not_affected_by_changes(self):
+    tree = persistent_binary_search_tree.PersistentBinarySearchTree.from_array(
+      list(range(10)))
+    snapshot = tree.snapshot()
+    tree.add(10)
+    tree.remove(0)
+    snapshot.add(-1)
+    self.assertListEqual(list(range(1, 11)), tree.in_order_walk())
+    self.assertListEqual(list(range(-1, 10)), snapshot.in_order_walk())
+
+  def test_iteration_sees_version_at_start(self):
+    tree = persistent_binary_search_tree.PersistentBinarySearchTree.from_array(
+      list(range(10)))
+    iterator = iter(tree)
+    self.assertEqual(0, next(iterator))
+    tree.remove(5)
+    tree.add(100)
+    self.assertListEqual(list(range(1, 10)), list(iterator))
+
+  def test_update_copies_only_path(self):
+    tree = persistent_binary_search_tree.PersistentBinarySearchTree.from_array(
+      list(range(1023)))
+    old_nodes = set(map(id, self._nodes(tree._root)))
+    snapshot = tree.snapshot()
+    tree.add(2000)
+    new_nodes = set(map(id, self._nodes(tree._root)))
+    self.assertLessEqual(len(new_nodes - old_nodes), tree._root.height)
+    self.assertEqual(1023, snapshot.size())
+
+  def test_key_function(self):
+    tree = persistent_binary_search_tree.PersistentBinarySearchTree(
+      key=lambda x: -x)
+    for item in [1, 3, 2]:
+      tree.add(item)
+    self.assertListEqual([3, 2, 1], tree.in_order_walk())
+    self.assertListEqual([3, 2], list(tree.iter_range(3, 2)))
+    self.assertEqual(2, tree.remove(2))
+
+  @parameterized.named_parameters(
+    ('all', -10, 100), ('exact', 3, 30), ('between', 4, 29), ('single', 9, 9),
+    ('empty', 10, 11), ('above', 100, 200), ('reversed', 30, 3))
+  def test_iter_range(self, lo, hi):
+    items = list(range(0, 100, 3)) + [9, 9]
+    random.Random(0).shuffle(items)
+    tree = persistent_binary_search_tree.PersistentBinarySearchTree()
+    for item in items:
+      tree.add(item)
+    self.assertListEqual([x for x in sorted(items) if lo <= x <= hi],
+                         list(tree.iter_range(lo, hi)))
+
+  def _nodes(self, node):
+    if node is None:
+      return []
+    return [node] + self._nodes(node.left) + self._nodes(node.right)
+
+  def _assert_avl_property(self, tree):
+    """Ensures heights and sizes are correct and the AVL property holds."""
+
+    def check(node):
+      if node is None:
+        return 0, 0
+      left_height, left_size = check(node.left)
+      right_height, right_size = check(node.right)
+      self.assertLessEqual(abs(left_height - right_height), 1)
+      self.assertEqual(1 + max(left_height, right_height), node.height)
+      self.assertEqual(1 + left_size + right_size, node.size)
+      return node.height, node.size
+
+    check(tree._root)
+
+
+if __name__ == '__main__':
+  absltest.main()
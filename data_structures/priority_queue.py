@@ -31,10 +31,14 @@ class PriorityQueue(object):
 
   The implementation is realized using a heap, which is filled with elements of
   particular structure imposing the desired ordering.
+
+  `add` returns a handle of the added element, with which the priority of the
+  element can be changed by `change_priority`, or the element removed by
+  `cancel`, in `O(log(n))` time, using `heap.IndexedHeap`.
   """
 
   def __init__(self):
-    self._heap = heap.BinaryHeap()
+    self._heap = heap.IndexedHeap()
     self._counter = 0
 
   def add(self, item, priority):
@@ -43,12 +47,12 @@ class PriorityQueue(object):
     Args:
       item: An object to be added.
       priority: The priority of `item`.
+
+    Returns:
+      A handle of the added element, for use with `change_priority` and
+      `cancel`.
     """
-    # Addition of a unique decreasing counter ensures expected ordering of
-    # elements with equal priority.
-    element = _PQElement(priority, self._counter, item)
-    self._counter -= 1
-    self._heap.add(element)
+    return self._heap.add(self._new_element(item, priority))
 
   def peek(self):
     """Returns the element from queue with the highest priority.
@@ -80,6 +84,78 @@ class PriorityQueue(object):
       raise PriorityQueueEmptyError()
     return self._heap.remove().item
 
+  def replace(self, item, priority):
+    """Removes the element with the highest priority and then adds `item`.
+
+    This is more efficient than `remove` followed by `add`.
+
+    Args:
+      item: An object to be added.
+      priority: The priority of `item`.
+
+    Returns:
+      The element from queue with the highest priority before the call.
+
+    Raises:
+      `PriorityQueueEmptyError` if the queue is empty.
+    """
+    if self._heap.size() == 0:
+      raise PriorityQueueEmptyError()
+    return self._heap.replace(self._new_element(item, priority)).item
+
+  def pushpop(self, item, priority):
+    """Adds `item` and then removes the element with the highest priority.
+
+    This is more efficient than `add` followed by `remove`. If `item` has
+    higher priority than all elements in the queue, it is returned without
+    changing the queue.
+
+    Args:
+      item: An object to be added.
+      priority: The priority of `item`.
+
+    Returns:
+      The element with the highest priority among the elements in the queue and
+      `item`. Of elements with equal priority, the one which has been in the
+      queue for the longest time, with `item` being the newest, is returned.
+    """
+    return self._heap.pushpop(self._new_element(item, priority)).item
+
+  def change_priority(self, handle, priority):
+    """Changes the priority of the element of `handle`.
+
+    The element keeps its place among elements with equal priority, as if it
+    had been added with `priority` in the first place.
+
+    Args:
+      handle: A handle returned by `add`, of an element still in the queue.
+      priority: The new priority of the element.
+
+    Raises:
+      `ValueError` if the element of `handle` is not in the queue.
+    """
+    element = handle.item
+    self._heap.update(handle, _PQElement(priority, element.idx, element.item))
+
+  def cancel(self, handle):
+    """Removes the element of `handle` from the queue and returns it.
+
+    Args:
+      handle: A handle returned by `add`, of an element still in the queue.
+
+    Raises:
+      `ValueError` if the element of `handle` is not in the queue.
+    """
+    return self._heap.remove_handle(handle).item
+
   def size(self):
     """Returns the number of elements in the queue."""
-    return self._heap.size()
\ No newline at end of file
+    return self._heap.size()
+
+  def _new_element(self, item, priority):
+    """Returns a `_PQElement` for `item`, ordered after all previous ones."""
+    # Addition of a unique decreasing counter ensures expected ordering of
+    # elements with equal priority.
+    element = _PQElement(priority, self._counter, item)
+    self._counter -= 1
+    return element
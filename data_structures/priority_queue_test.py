@@ -114,12 +114,79 @@ class PriorityQueueTest(absltest.TestCase):
     q.add(object, 0)
     self.assertEqual(6, q.size())
 
+  def test_replace(self):
+    q = priority_queue.PriorityQueue()
+    q.add('a', 1)
+    q.add('b', 3)
+    self.assertEqual('b', q.replace('c', 2))
+    self.assertEqual(2, q.size())
+    self.assertEqual('c', q.replace('d', 5))
+    self.assertEqual('d', q.remove())
+    self.assertEqual('a', q.remove())
+
+  def test_pushpop(self):
+    q = priority_queue.PriorityQueue()
+    self.assertEqual('a', q.pushpop('a', 1))
+    self.assertEqual(0, q.size())
+    q.add('b', 2)
+    self.assertEqual('c', q.pushpop('c', 3))
+    self.assertEqual('b', q.pushpop('d', 1))
+    self.assertEqual('d', q.peek())
+    self.assertEqual(1, q.size())
+
+  def test_pushpop_equal_priority_keeps_queue_order(self):
+    q = priority_queue.PriorityQueue()
+    q.add('a', 1)
+    self.assertEqual('a', q.pushpop('b', 1))
+    self.assertEqual('b', q.replace('c', 1))
+    self.assertEqual('c', q.remove())
+
+  def test_change_priority(self):
+    q = priority_queue.PriorityQueue()
+    a = q.add('a', 1)
+    q.add('b', 2)
+    c = q.add('c', 3)
+    q.change_priority(a, 4)
+    self.assertEqual('a', q.peek())
+    q.change_priority(a, 0)
+    q.change_priority(c, 1)
+    self.assertListEqual(['b', 'c', 'a'], [q.remove() for _ in range(3)])
+
+  def test_change_priority_keeps_queue_order(self):
+    q = priority_queue.PriorityQueue()
+    a = q.add('a', 1)
+    q.add('b', 2)
+    q.change_priority(a, 2)
+    self.assertListEqual(['a', 'b'], [q.remove() for _ in range(2)])
+
+  def test_cancel(self):
+    q = priority_queue.PriorityQueue()
+    handles = [q.add(item, i) for i, item in enumerate('abcde')]
+    self.assertEqual('d', q.cancel(handles[3]))
+    self.assertEqual('a', q.cancel(handles[0]))
+    self.assertEqual(3, q.size())
+    self.assertListEqual(['e', 'c', 'b'], [q.remove() for _ in range(3)])
+
+  def test_cancelled_or_removed_handle_raises(self):
+    q = priority_queue.PriorityQueue()
+    a = q.add('a', 1)
+    b = q.add('b', 2)
+    q.cancel(a)
+    self.assertEqual('b', q.remove())
+    for handle in [a, b]:
+      with self.assertRaises(ValueError):
+        q.cancel(handle)
+      with self.assertRaises(ValueError):
+        q.change_priority(handle, 3)
+
   def test_empty_queue_raises(self):
     q = priority_queue.PriorityQueue()
     with self.assertRaises(priority_queue.PriorityQueueEmptyError):
       q.remove()
     with self.assertRaises(priority_queue.PriorityQueueEmptyError):
       q.peek()
+    with self.assertRaises(priority_queue.PriorityQueueEmptyError):
+      q.replace('a', 1)
 
 
 if __name__ == '__main__':
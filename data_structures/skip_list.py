@@ -0,0 +1,392 @@
+"""Implementation of a skip list."""
+
+import itertools
+import random
+import threading
+
+from data_structures import binary_search_tree
+
+
+class _NullLock(object):
+  """Lock which does nothing, used by skip lists which are not thread-safe."""
+
+  def acquire(self):
+    pass
+
+  def release(self):
+    pass
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    pass
+
+
+_NULL_LOCK = _NullLock()
+
+
+def _wait_for_removals(nodes):
+  """Waits until those of `nodes` being removed by other threads are unlinked.
+
+  A thread removing a node holds its lock until the node is unlinked. Threads
+  which failed to validate because of such a node wait for it, rather than
+  retrying at once and competing for the locks the removing thread needs.
+  """
+  for node in nodes:
+    if node is not None and node.marked:
+      with node.lock:
+        pass
+
+
+class _SkipListNode(object):
+  """Representation of a node in a `SkipList`.
+
+  The node is present in the lists of levels `0` to `len(next) - 1`, and
+  `next[level]` is the following node in the list of `level`, or `None`. Nodes
+  with equal keys are ordered by `seq`, the order in which they were created.
+  """
+
+  __slots__ = ('value', 'key', 'seq', 'next', 'lock', 'marked', 'fully_linked')
+
+  def __init__(self, value, key, seq, num_levels, lock):
+    self.value = value
+    self.key = key
+    self.seq = seq
+    self.next = [None] * num_levels
+    self.lock = lock
+    self.marked = False
+    self.fully_linked = False
+
+
+class SkipList(object):
+  """Implementation of a skip list.
+
+  A skip list is a data structure which serves as an ordered collection of
+  elements, with the same operations as `binary_search_tree.BinarySearchTree`:
+  addition, removal, and searching for elements, as well as iteration through
+  its elements in order.
+
+  Levels.
+
+  The elements are kept in a sorted linked list, the list of level `0`. Each
+  element is also present in the lists of levels `1` to `h - 1`, where its
+  height `h` is chosen at random when it is added, with probability of `2^-h`.
+  The list of each level thus skips about half of the elements of the level
+  below. Each node stores its forward pointers in a single list of length `h`.
+
+  Searching starts in the list of the highest level, and walks forward while
+  the next element is smaller than the one searched for, then moves a level
+  down. Addition and removal search for the element, remembering the last node
+  visited in each level, and splice the node in or out of the lists of its
+  levels. No rebalancing is needed, and all operations take `O(log(n))`
+  expected time, regardless of the order of the elements.
+
+  Concurrency.
+
+  If created with `thread_safe=True`, the skip list can be used from multiple
+  threads at once, as a *lazy skip list*. Searching and iteration take no locks
+  at all. Addition and removal first search without locks, and then lock only
+  the nodes preceding the changed node in each of its levels, validate that
+  they are still unmarked and adjacent to it, and otherwise retry. A removed
+  node is first logically removed by marking it, and then unlinked, while its
+  lock is held, so that threads blocked by it wait for the lock instead of
+  retrying repeatedly. Nodes with equal keys are ordered by the order of their
+  addition, so that each node has a unique place in the lists. Threads
+  changing distant parts of the list thus do not block each other, unlike with
+  a single lock around a rebalancing tree, where a rotation can change the
+  path to any element.
+
+  Each operation is atomic, while iteration is weakly consistent: it yields the
+  elements present during the whole iteration, and may or may not yield those
+  added or removed during it. Without `thread_safe`, the locks are no-ops and
+  the skip list must not be changed from multiple threads.
+  """
+
+  def __init__(self, key=None, thread_safe=False, max_levels=32):
+    """Constructs an empty skip list.
+
+    Args:
+      key: A function of one argument returning the key by which an item is
+        ordered, or `None` to order the items themselves.
+      thread_safe: A boolean. Whether each node has its own lock, allowing
+        the skip list to be changed from multiple threads at once.
+      max_levels: A positive integer. The maximum height of a node. The skip
+        list is efficient for up to about `2^max_levels` elements.
+    """
+    self._key = key
+    self._thread_safe = thread_safe
+    self._max_levels = max_levels
+    self._seq = itertools.count()
+    self._head = _SkipListNode(None, None, -1, max_levels, self._new_lock())
+    self._num_levels = 1
+    self._size = 0
+    self._size_lock = self._new_lock()
+
+  @classmethod
+  def from_array(cls, array, **kwargs):
+    """Constructs `SkipList` containing given data.
+
+    The data is sorted, and the lists of all levels are linked in a single pass
+    over it, without searching for each element.
+
+    Args:
+      array: A list of elements to be stored in the skip list.
+      **kwargs: Keyword arguments passed to the constructor.
+
+    Returns:
+      A `SkipList`.
+
+    Raises:
+      `TypeError` if `array` is not a list.
+    """
+    if not isinstance(array, list):
+      raise TypeError(f'Provided data must be a list, but is {type(array)}.')
+    skip_list = cls(**kwargs)
+    last = [skip_list._head] * skip_list._max_levels
+    for item in sorted(array, key=skip_list._key):
+      node = skip_list._new_node(item)
+      for level in range(len(node.next)):
+        last[level].next[level] = node
+        last[level] = node
+      node.fully_linked = True
+      skip_list._num_levels = max(skip_list._num_levels, len(node.next))
+    skip_list._size = len(array)
+    return skip_list
+
+  def add(self, item):
+    """Adds `item` to the skip list.
+
+    Args:
+      item: An object to be added.
+    """
+    node = self._new_node(item)
+    height = len(node.next)
+    with self._size_lock:
+      self._num_levels = max(self._num_levels, height)
+    while True:
+      # Equal items are added after the ones already present.
+      preds, succs = self._find(node.key, node.seq, height)
+      locked = []
+      try:
+        valid = True
+        for level in range(height):
+          pred, succ = preds[level], succs[level]
+          if not locked or pred is not locked[-1]:
+            pred.lock.acquire()
+            locked.append(pred)
+          valid = (not pred.marked and pred.next[level] is succ and
+                   (succ is None or not succ.marked))
+          if not valid:
+            break
+        if valid:
+          node.next[:] = succs[:height]
+          for level in range(height):
+            preds[level].next[level] = node
+          node.fully_linked = True
+      finally:
+        for pred in locked:
+          pred.lock.release()
+      if valid:
+        break
+      _wait_for_removals(preds[:height] + succs[:height])
+    with self._size_lock:
+      self._size += 1
+
+  def remove(self, item):
+    """Removes the item and returns it.
+
+    Args:
+      item: An item to be removed.
+
+    Returns:
+      The removed item.
+
+    Raises:
+      NotInTreeError: If `item` is not in the skip list.
+    """
+    key = item if self._key is None else self._key(item)
+    while True:
+      victim = self._first_present(self._lower_bound(key))
+      if victim is None or key != victim.key:
+        raise binary_search_tree.NotInTreeError()
+      victim.lock.acquire()
+      if not victim.marked:
+        break
+      # Removed by another thread in the meantime, look for another copy.
+      victim.lock.release()
+    try:
+      # Once marked, the victim is logically removed. Its lock is held until it
+      # is unlinked, so that no node is added after it in the meantime.
+      victim.marked = True
+      height = len(victim.next)
+      while True:
+        preds, _ = self._find(victim.key, victim.seq - 1, height)
+        locked = []
+        try:
+          valid = True
+          for level in range(height):
+            pred = preds[level]
+            if not locked or pred is not locked[-1]:
+              pred.lock.acquire()
+              locked.append(pred)
+            valid = not pred.marked and pred.next[level] is victim
+            if not valid:
+              break
+          if valid:
+            for level in reversed(range(height)):
+              preds[level].next[level] = victim.next[level]
+        finally:
+          for pred in locked:
+            pred.lock.release()
+        if valid:
+          break
+        _wait_for_removals(preds[:height])
+    finally:
+      victim.lock.release()
+    with self._size_lock:
+      self._size -= 1
+    return victim.value
+
+  def search(self, item):
+    """Searches for an the item and returns it.
+
+    Args:
+      item: An item to be found.
+
+    Returns:
+      The found item.
+
+    Raises:
+      NotInTreeError: If `item` is not in the skip list.
+    """
+    key = item if self._key is None else self._key(item)
+    node = self._first_present(self._lower_bound(key))
+    if node is None or key != node.key:
+      raise binary_search_tree.NotInTreeError()
+    return node.value
+
+  def contains(self, item):
+    """Returns `True` if `item` is in the skip list, `False` otherwise."""
+    key = item if self._key is None else self._key(item)
+    node = self._first_present(self._lower_bound(key))
+    return node is not None and key == node.key
+
+  __contains__ = contains
+
+  def minimum(self):
+    """Returns the smallest item in the skip list."""
+    node = self._first_present(self._head.next[0])
+    if node is None:
+      raise binary_search_tree.TreeEmptyError()
+    return node.value
+
+  def maximum(self):
+    """Returns the largest item in the skip list."""
+    node = self._head
+    for level in reversed(range(self._num_levels)):
+      while node.next[level] is not None:
+        node = node.next[level]
+    if node.marked:
+      # Being removed by another thread, fall back to a scan of all nodes.
+      node = self._head
+      last = self._first_present(node.next[0])
+      while last is not None:
+        node = last
+        last = self._first_present(last.next[0])
+    if node is self._head:
+      raise binary_search_tree.TreeEmptyError()
+    return node.value
+
+  def size(self):
+    """Returns the number of elements in the skip list."""
+    return self._size
+
+  def in_order_walk(self):
+    """Returns ordered items in the skip list.
+
+    Returns:
+      A list of items in the skip list in increasing order.
+    """
+    return list(self)
+
+  def __iter__(self):
+    """Yields items in the skip list in increasing order."""
+    node = self._head.next[0]
+    while node is not None:
+      if not node.marked:
+        yield node.value
+      node = node.next[0]
+
+  def iter_range(self, lo, hi):
+    """Yields items `x` with `lo <= x <= hi` in increasing order."""
+    if self._key is not None:
+      lo, hi = self._key(lo), self._key(hi)
+    node = self._lower_bound(lo)
+    while node is not None and not hi < node.key:
+      if not node.marked:
+        yield node.value
+      node = node.next[0]
+
+  def _new_lock(self):
+    return threading.Lock() if self._thread_safe else _NULL_LOCK
+
+  def _new_node(self, item):
+    """Returns a new node for `item` with random height."""
+    key = item if self._key is None else self._key(item)
+    # The number of trailing zeros of random bits, capped by the highest bit,
+    # is `h - 1` with probability `2^-h`.
+    bits = random.getrandbits(self._max_levels - 1) | (
+      1 << (self._max_levels - 1))
+    height = (bits & -bits).bit_length()
+    return _SkipListNode(item, key, next(self._seq), height, self._new_lock())
+
+  def _find(self, key, seq, num_levels):
+    """Finds the place for a node with `key` and `seq` in the lowest levels.
+
+    Args:
+      key: The key of the node.
+      seq: The sequence number of the node.
+      num_levels: The number of levels for which the neighbors are returned.
+
+    Returns:
+      A tuple of lists `preds` and `succs` of length at least `num_levels`,
+      where `preds[level]` is the last node in the list of `level` before the
+      node, which is the one with key smaller than `key`, or equal to `key` and
+      sequence number not larger than `seq`, and `succs[level]` its following
+      node, or `None`.
+    """
+    num_levels = max(num_levels, self._num_levels)
+    preds = [None] * num_levels
+    succs = [None] * num_levels
+    pred = self._head
+    for level in reversed(range(num_levels)):
+      succ = pred.next[level]
+      while succ is not None and (
+          succ.key < key or (not key < succ.key and succ.seq <= seq)):
+        pred = succ
+        succ = pred.next[level]
+      preds[level] = pred
+      succs[level] = succ
+    return preds, succs
+
+  def _lower_bound(self, key):
+    """Returns the first node with key not smaller than `key`, or `None`."""
+    pred = self._head
+    for level in reversed(range(self._num_levels)):
+      succ = pred.next[level]
+      while succ is not None and succ.key < key:
+        pred = succ
+        succ = pred.next[level]
+    return pred.next[0]
+
+  @staticmethod
+  def _first_present(node):
+    """Returns the first node from `node` on which is not removed, or `None`.
+
+    Nodes which are only being added are skipped as well.
+    """
+    while node is not None and (node.marked or not node.fully_linked):
+      node = node.next[0]
+    return node
+
@@ -0,0 +1,142 @@
+"""Benchmark of `SkipList` against `BinarySearchTree` and `AVLTree`.
+
+For each size, measures the time of adding random keys one by one, searching
+for all of them, and removing all of them, in a single thread.
+
+Then runs a mixed workload of additions, removals and searches of random keys
+on a thread pool, for each number of threads, comparing a thread-safe skip list
+with its per-node locks to an `AVLTree` guarded by a single lock. Note that in
+CPython the threads also share the global interpreter lock, so the workload is
+not sped up by more threads, but it shows the cost of the locking.
+
+Usage:
+  python -m data_structures.skip_list_benchmark --sizes=100000 --threads=1,4,16
+"""
+
+from concurrent import futures
+import functools
+import random
+import threading
+import time
+
+from absl import app
+from absl import flags
+
+from data_structures import binary_search_tree
+from data_structures import skip_list
+
+FLAGS = flags.FLAGS
+flags.DEFINE_list('sizes', ['10000', '100000'], 'Numbers of keys.')
+flags.DEFINE_list('threads', ['1', '2', '4', '8'], 'Numbers of threads.')
+flags.DEFINE_integer('num_ops', 100000, 'Number of operations of the mixed '
+                     'workload, split evenly between the threads.')
+flags.DEFINE_float('write_fraction', 0.5, 'Fraction of the operations of the '
+                   'mixed workload which are additions or removals.')
+
+_CONTAINERS = [
+  ('BinarySearchTree', binary_search_tree.BinarySearchTree),
+  ('AVLTree', binary_search_tree.AVLTree),
+  ('SkipList', skip_list.SkipList),
+  ('SkipList(thread_safe)',
+   functools.partial(skip_list.SkipList, thread_safe=True)),
+]
+
+
+def _timed(fn):
+  """Returns seconds taken by calling `fn`."""
+  start = time.perf_counter()
+  fn()
+  return time.perf_counter() - start
+
+
+class _LockedTree(object):
+  """`AVLTree` with a single lock around each operation."""
+
+  def __init__(self, array):
+    self._tree = binary_search_tree.AVLTree.from_array(array)
+    self._lock = threading.Lock()
+
+  def add(self, item):
+    with self._lock:
+      self._tree.add(item)
+
+  def remove(self, item):
+    with self._lock:
+      return self._tree.remove(item)
+
+  def contains(self, item):
+    with self._lock:
+      return self._tree.contains(item)
+
+
+def _mixed_workload(container, ops):
+  """Applies `ops`, pairs of an operation name and a key, to `container`."""
+  for op, key in ops:
+    if op == 'add':
+      container.add(key)
+    elif op == 'remove':
+      try:
+        container.remove(key)
+      except binary_search_tree.NotInTreeError:
+        pass
+    else:
+      container.contains(key)
+
+
+def _single_thread(size):
+  keys = list(range(size))
+  random.shuffle(keys)
+  for name, container_class in _CONTAINERS:
+    container = container_class()
+    add = _timed(lambda: [container.add(key) for key in keys])
+    search = _timed(lambda: [container.search(key) for key in keys])
+    remove = _timed(lambda: [container.remove(key) for key in keys])
+    print(f'{size:10d} {name:>22s} {add:7.3f}s {search:7.3f}s {remove:7.3f}s')
+
+
+def _thread_pool(size, num_threads):
+  keys = list(range(0, 2 * size, 2))
+  ops = []
+  for _ in range(FLAGS.num_ops):
+    if random.random() < FLAGS.write_fraction:
+      ops.append((random.choice(['add', 'remove']), random.randrange(2 * size)))
+    else:
+      ops.append(('contains', random.randrange(2 * size)))
+  chunks = [ops[i::num_threads] for i in range(num_threads)]
+  containers = [
+    ('AVLTree(locked)', _LockedTree),
+    ('SkipList(thread_safe)',
+     functools.partial(skip_list.SkipList.from_array, thread_safe=True)),
+  ]
+  for name, container_class in containers:
+    container = container_class(list(keys))
+    with futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
+
+      def run():
+        jobs = [executor.submit(_mixed_workload, container, chunk)
+                for chunk in chunks]
+        for job in jobs:
+          job.result()
+
+      seconds = _timed(run)
+    print(f'{size:10d} {num_threads:8d} {name:>22s} {seconds:7.3f}s '
+          f'{FLAGS.num_ops / seconds:10.0f}')
+
+
+def main(argv):
+  del argv  # Unused.
+  print('Single thread.')
+  print(f'{"keys":>10s} {"container":>22s} {"add":>8s} {"search":>8s} '
+        f'{"remove":>8s}')
+  for size in map(int, FLAGS.sizes):
+    _single_thread(size)
+  print('Thread pool.')
+  print(f'{"keys":>10s} {"threads":>8s} {"container":>22s} {"time":>8s} '
+        f'{"ops/s":>10s}')
+  for size in map(int, FLAGS.sizes):
+    for num_threads in map(int, FLAGS.threads):
+      _thread_pool(size, num_threads)
+
+
+if __name__ == '__main__':
+  app.run(main)
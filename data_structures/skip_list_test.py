@@ -0,0 +1,149 @@
+import random
+import sys
+import threading
+
+from absl.testing import absltest
+from absl.testing import parameterized
+
+from data_structures import binary_search_tree
+from data_structures import skip_list
+
+
+class SkipListTest(parameterized.TestCase):
+  """Tests for `SkipList`."""
+
+  @parameterized.named_parameters(('plain', False), ('thread_safe', True))
+  def test_empty_skip_list(self, thread_safe):
+    s = skip_list.SkipList(thread_safe=thread_safe)
+    self.assertEqual(0, s.size())
+    self.assertListEqual([], s.in_order_walk())
+    self.assertNotIn(1, s)
+    with self.assertRaises(binary_search_tree.TreeEmptyError):
+      s.minimum()
+    with self.assertRaises(binary_search_tree.TreeEmptyError):
+      s.maximum()
+    with self.assertRaises(binary_search_tree.NotInTreeError):
+      s.search(1)
+    with self.assertRaises(binary_search_tree.NotInTreeError):
+      s.remove(1)
+
+  @parameterized.named_parameters(('plain', False), ('thread_safe', True))
+  def test_add_search_remove(self, thread_safe):
+    rng = random.Random(0)
+    items = [rng.randrange(500) for _ in range(1000)]
+    s = skip_list.SkipList(thread_safe=thread_safe)
+    for item in items:
+      s.add(item)
+    self.assertEqual(len(items), s.size())
+    self.assertListEqual(sorted(items), s.in_order_walk())
+    self.assertEqual(min(items), s.minimum())
+    self.assertEqual(max(items), s.maximum())
+    for item in range(500):
+      self.assertEqual(item in items, item in s)
+    expected = sorted(items)
+    for item in items[::2]:
+      self.assertEqual(item, s.search(item))
+      self.assertEqual(item, s.remove(item))
+      expected.remove(item)
+    self.assertListEqual(expected, s.in_order_walk())
+    self.assertEqual(len(expected), s.size())
+    self._assert_levels_valid(s)
+
+  @parameterized.named_parameters(
+    ('all', -10, 100), ('exact', 3, 30), ('between', 4, 29), ('single', 9, 9),
+    ('empty', 10, 11), ('above', 100, 200), ('reversed', 30, 3))
+  def test_iter_range(self, lo, hi):
+    items = list(range(0, 100, 3)) + [9, 9]
+    s = skip_list.SkipList.from_array(items)
+    self.assertListEqual([x for x in sorted(items) if lo <= x <= hi],
+                         list(s.iter_range(lo, hi)))
+
+  def test_from_array(self):
+    items = [5, 3, 8, 1, 4, 4]
+    s = skip_list.SkipList.from_array(items)
+    self.assertEqual(6, s.size())
+    self.assertListEqual(sorted(items), s.in_order_walk())
+    s.add(2)
+    s.remove(4)
+    self.assertListEqual([1, 2, 3, 4, 5, 8], s.in_order_walk())
+    self._assert_levels_valid(s)
+    with self.assertRaises(TypeError):
+      skip_list.SkipList.from_array((1, 2))
+
+  def test_key_function(self):
+    s = skip_list.SkipList(key=len)
+    for item in ['ccc', 'a', 'bb']:
+      s.add(item)
+    self.assertListEqual(['a', 'bb', 'ccc'], s.in_order_walk())
+    self.assertEqual('bb', s.search('xx'))
+    self.assertListEqual(['a', 'bb'], list(s.iter_range('', 'yy')))
+    self.assertEqual('ccc', s.remove('zzz'))
+
+  def test_levels_are_logarithmic(self):
+    s = skip_list.SkipList.from_array(list(range(10000)))
+    self.assertLessEqual(s._num_levels, 30)
+    heights = [len(node.next) for node in self._nodes(s)]
+    self.assertAlmostEqual(2.0, sum(heights) / len(heights), delta=0.1)
+
+  def test_concurrent_adds_and_removes(self):
+    # Switch threads often, to interleave the operations.
+    self.addCleanup(sys.setswitchinterval, sys.getswitchinterval())
+    sys.setswitchinterval(1e-6)
+    s = skip_list.SkipList(thread_safe=True)
+    for item in range(0, 2000, 2):
+      s.add(item)
+
+    removed_by_thread = [[] for _ in range(8)]
+
+    def work(seed):
+      rng = random.Random(seed)
+      removed = removed_by_thread[seed]
+      for _ in range(500):
+        s.add(2 * rng.randrange(1000) + 1)
+        item = 2 * rng.randrange(1000)
+        try:
+          removed.append(s.remove(item))
+        except binary_search_tree.NotInTreeError:
+          pass
+        s.contains(item)
+
+    threads = [threading.Thread(target=work, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    removed = [item for r in removed_by_thread for item in r]
+    # Each even item was removed at most once.
+    self.assertEqual(len(removed), len(set(removed)))
+    walk = s.in_order_walk()
+    self.assertListEqual(sorted(walk), walk)
+    self.assertEqual(len(walk), s.size())
+    self.assertEqual(1000 + 8 * 500 - len(removed), s.size())
+    self.assertSetEqual(set(range(0, 2000, 2)) - set(removed),
+                        {x for x in walk if x % 2 == 0})
+    self._assert_levels_valid(s)
+
+  def _nodes(self, s):
+    node = s._head.next[0]
+    while node is not None:
+      yield node
+      node = node.next[0]
+
+  def _assert_levels_valid(self, s):
+    """Ensures each level is a sorted sublist of the level below."""
+    nodes = list(self._nodes(s))
+    for node in nodes:
+      self.assertFalse(node.marked)
+      self.assertTrue(node.fully_linked)
+    for level in range(1, s._max_levels):
+      expected = [node for node in nodes if len(node.next) > level]
+      actual = []
+      node = s._head.next[level]
+      while node is not None:
+        actual.append(node)
+        node = node.next[level]
+      self.assertListEqual(expected, actual)
+
+
+if __name__ == '__main__':
+  absltest.main()
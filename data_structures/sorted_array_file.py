@@ -0,0 +1,203 @@
+"""Compact binary files of sorted numbers, and their memory-mapped reader."""
+
+import array
+import bisect
+import itertools
+import mmap
+import operator
+import os
+import struct
+import sys
+
+from data_structures import binary_search_tree
+
+# Magic, format version, `array` typecode, byte order ('<' or '>'), padding,
+# and the number of elements. The header is 16 bytes long, so the elements
+# which follow it are aligned for any typecode.
+_HEADER = struct.Struct('<4sBccxQ')
+_MAGIC = b'DSSA'
+_VERSION = 1
+_BYTE_ORDER = '<' if sys.byteorder == 'little' else '>'
+# Numeric typecodes of `array` with the same size on all platforms. Unlike
+# these, 'l' and 'L' are 4 bytes long on some platforms and 8 on others, and
+# the header does not store the size.
+_TYPECODES = 'bBhHiIqQfd'
+
+
+def write(path, items, typecode='q'):
+  """Writes sorted numbers to a file.
+
+  The file consists of a fixed-size header, followed by the raw bytes of the
+  numbers, as stored by `array.array` in the native byte order.
+
+  Args:
+    path: The path of the file to be written.
+    items: An iterable of numbers sorted in non-decreasing order.
+    typecode: The `array` typecode of the numbers, such as `'q'` for signed
+      64-bit integers or `'d'` for doubles.
+
+  Raises:
+    `ValueError` if `typecode` is not a numeric typecode of the same size on
+      all platforms, that is `'l'` and `'L'` are not supported, or if the
+      numbers are not sorted. No file is written then.
+    `TypeError` or `OverflowError` if the numbers do not fit `typecode`.
+  """
+  if typecode not in _TYPECODES:
+    raise ValueError(f'Typecode must be one of {_TYPECODES!r}, but is '
+                     f'{typecode!r}.')
+  data = array.array(typecode, items)
+  if any(map(operator.lt, itertools.islice(data, 1, None), data)):
+    raise ValueError('Provided data must be sorted.')
+  with open(path, 'wb') as f:
+    f.write(_HEADER.pack(_MAGIC, _VERSION, typecode.encode(),
+                         _BYTE_ORDER.encode(), len(data)))
+    data.tofile(f)
+
+
+def read(path):
+  """Reads numbers written by `write` into a list.
+
+  Args:
+    path: The path of the file to be read.
+
+  Returns:
+    A list of the numbers in the file.
+
+  Raises:
+    `ValueError` if the file was not written by `write`.
+  """
+  with open(path, 'rb') as f:
+    typecode, byte_order, count = _read_header(f)
+    data = array.array(typecode)
+    data.fromfile(f, count)
+  if byte_order != _BYTE_ORDER:
+    data.byteswap()
+  return data.tolist()
+
+
+class MappedSortedArray(object):
+  """Read-only view of a file written by `write`, mapped into memory.
+
+  The numbers are not read into Python objects when the file is opened.
+  Instead, the file is mapped into memory with `mmap`, and lookups binary search
+  directly in the mapped bytes, so opening takes `O(1)` time regardless of the
+  size of the file, and only the pages visited by lookups are read from disk.
+
+  The file must have been written on a machine with the same byte order. The
+  array must be closed, or used as a context manager, to release the mapping.
+  """
+
+  def __init__(self, path):
+    """Opens and maps the file.
+
+    Args:
+      path: The path of the file written by `write`.
+
+    Raises:
+      `ValueError` if the file was not written by `write`, or was written with
+        a different byte order.
+    """
+    with open(path, 'rb') as f:
+      typecode, byte_order, count = _read_header(f)
+      if byte_order != _BYTE_ORDER:
+        raise ValueError('File was written with a different byte order, use '
+                         '`read` instead.')
+      self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    itemsize = array.array(typecode).itemsize
+    end = _HEADER.size + count * itemsize
+    buffer = memoryview(self._mmap)[_HEADER.size:end]
+    self._data = buffer.cast(typecode)
+
+  def search(self, item):
+    """Searches for the item and returns it.
+
+    Raises:
+      NotInTreeError: If `item` is not in the array.
+    """
+    position = bisect.bisect_left(self._data, item)
+    if position == len(self._data) or self._data[position] != item:
+      raise binary_search_tree.NotInTreeError()
+    return self._data[position]
+
+  def contains(self, item):
+    """Returns `True` if `item` is in the array, `False` otherwise."""
+    position = bisect.bisect_left(self._data, item)
+    return position < len(self._data) and self._data[position] == item
+
+  __contains__ = contains
+
+  def rank(self, item):
+    """Returns the number of items in the array smaller than `item`."""
+    return bisect.bisect_left(self._data, item)
+
+  def count_range(self, lo, hi):
+    """Returns the number of items `x` in the array with `lo <= x <= hi`."""
+    if hi < lo:
+      return 0
+    return (bisect.bisect_right(self._data, hi) -
+            bisect.bisect_left(self._data, lo))
+
+  def iter_range(self, lo, hi):
+    """Yields items `x` with `lo <= x <= hi` in increasing order."""
+    start = bisect.bisect_left(self._data, lo)
+    end = bisect.bisect_right(self._data, hi)
+    for k in range(start, end):
+      yield self._data[k]
+
+  def size(self):
+    """Returns the number of elements in the array."""
+    return len(self._data)
+
+  def __len__(self):
+    return len(self._data)
+
+  def __getitem__(self, k):
+    return self._data[k]
+
+  def __iter__(self):
+    """Yields items in the array in increasing order."""
+    return iter(self._data)
+
+  def close(self):
+    """Releases the mapping. The array cannot be used afterwards."""
+    self._data.release()
+    self._mmap.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+
+def _read_header(f):
+  """Reads the header of an open file, see `_parse_header`.
+
+  Raises:
+    `ValueError` if the header is not valid, or the file is shorter than the
+    header says, for example because it was truncated.
+  """
+  typecode, byte_order, count = _parse_header(f.read(_HEADER.size))
+  itemsize = array.array(typecode).itemsize
+  if os.fstat(f.fileno()).st_size < _HEADER.size + count * itemsize:
+    raise ValueError(f'File is too short for its {count} elements.')
+  return typecode, byte_order, count
+
+
+def _parse_header(header):
+  """Returns the typecode, byte order and element count from a header.
+
+  Raises:
+    `ValueError` if the header is not a valid header written by `write`.
+  """
+  if len(header) != _HEADER.size:
+    raise ValueError('File is too short.')
+  magic, version, typecode, byte_order, count = _HEADER.unpack(header)
+  if magic != _MAGIC:
+    raise ValueError('File is not a sorted array file.')
+  if version != _VERSION:
+    raise ValueError(f'Unsupported file version {version}.')
+  typecode, byte_order = typecode.decode(), byte_order.decode()
+  if typecode not in _TYPECODES or byte_order not in '<>':
+    raise ValueError('File header is corrupted.')
+  return typecode, byte_order, count
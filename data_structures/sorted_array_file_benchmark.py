@@ -0,0 +1,59 @@
+"""Benchmark of cold starts from a file written by `BinarySearchTree.save`.
+
+For each size, writes a tree of random keys to a file, and measures the time
+until the first lookup can be answered: rebuilding the tree by adding its items
+one by one in random order by `from_array` (given unsorted items), loading it by
+`load`, and mapping the file by `MappedSortedArray`. Then measures searching
+for every key in each of them.
+
+Usage:
+  python -m data_structures.sorted_array_file_benchmark --sizes=100000,1000000
+"""
+
+import os
+import random
+import tempfile
+import time
+
+from absl import app
+from absl import flags
+
+from data_structures import binary_search_tree
+from data_structures import sorted_array_file
+
+FLAGS = flags.FLAGS
+flags.DEFINE_list('sizes', ['100000', '1000000'], 'Numbers of keys.')
+
+
+def _timed(fn):
+  """Returns the result of calling `fn` and seconds taken by it."""
+  start = time.perf_counter()
+  result = fn()
+  return result, time.perf_counter() - start
+
+
+def main(argv):
+  del argv  # Unused.
+  print(f'{"keys":>10s} {"start":>18s} {"open":>8s} {"search":>8s}')
+  with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, 'tree.bin')
+    for size in map(int, FLAGS.sizes):
+      keys = random.sample(range(2 * size), size)
+      binary_search_tree.AVLTree.from_array(keys).save(path)
+      starts = [
+        ('from_array', lambda: binary_search_tree.AVLTree.from_array(
+          sorted_array_file.read(path)[::-1])),
+        ('load', lambda: binary_search_tree.AVLTree.load(path)),
+        ('MappedSortedArray',
+         lambda: sorted_array_file.MappedSortedArray(path)),
+      ]
+      for name, start in starts:
+        container, open_time = _timed(start)
+        _, search_time = _timed(lambda: [container.search(k) for k in keys])
+        print(f'{size:10d} {name:>18s} {open_time:7.3f}s {search_time:7.2f}s')
+        if isinstance(container, sorted_array_file.MappedSortedArray):
+          container.close()
+
+
+if __name__ == '__main__':
+  app.run(main)
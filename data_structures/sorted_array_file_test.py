@@ -0,0 +1,139 @@
+import os
+import tempfile
+
+from absl.testing import absltest
+from absl.testing import parameterized
+
+from data_structures import binary_search_tree
+from data_structures import sorted_array_file
+
+
+class _TempFileTestCase(parameterized.TestCase):
+  """Test case providing a path to a file in a temporary directory."""
+
+  def setUp(self):
+    super().setUp()
+    directory = tempfile.TemporaryDirectory()
+    self.addCleanup(directory.cleanup)
+    self._directory = directory.name
+
+  def _path(self):
+    return os.path.join(self._directory, 'data.bin')
+
+
+class SortedArrayFileTest(_TempFileTestCase):
+  """Tests for `write`, `read` and `MappedSortedArray`."""
+
+  @parameterized.named_parameters(
+    ('empty', [], 'q'),
+    ('ints', [-5, 0, 0, 3, 2 ** 40], 'q'),
+    ('unsigned', [0, 1, 255], 'B'),
+    ('doubles', [-1.5, 0.25, 3.0], 'd'))
+  def test_write_and_read(self, items, typecode):
+    path = self._path()
+    sorted_array_file.write(path, items, typecode)
+    self.assertListEqual(items, sorted_array_file.read(path))
+    with sorted_array_file.MappedSortedArray(path) as mapped:
+      self.assertListEqual(items, list(mapped))
+      self.assertEqual(len(items), mapped.size())
+
+  def test_mapped_lookups(self):
+    items = list(range(0, 100, 3)) + [9, 9]
+    items.sort()
+    path = self._path()
+    sorted_array_file.write(path, items)
+    with sorted_array_file.MappedSortedArray(path) as mapped:
+      for item in range(-1, 101):
+        self.assertEqual(item in items, item in mapped)
+        self.assertEqual(sum(x < item for x in items), mapped.rank(item))
+      self.assertEqual(9, mapped.search(9))
+      with self.assertRaises(binary_search_tree.NotInTreeError):
+        mapped.search(10)
+      with self.assertRaises(binary_search_tree.NotInTreeError):
+        mapped.search(1000)
+      for lo, hi in [(-10, 100), (3, 30), (4, 29), (9, 9), (10, 11), (30, 3)]:
+        expected = [x for x in items if lo <= x <= hi]
+        self.assertEqual(len(expected), mapped.count_range(lo, hi))
+        self.assertListEqual(expected, list(mapped.iter_range(lo, hi)))
+
+  def test_invalid_files_raise(self):
+    path = self._path()
+    with open(path, 'wb') as f:
+      f.write(b'not a sorted array file')
+    with self.assertRaises(ValueError):
+      sorted_array_file.read(path)
+    with self.assertRaises(ValueError):
+      sorted_array_file.MappedSortedArray(path)
+    with open(path, 'wb') as f:
+      f.write(b'DS')
+    with self.assertRaises(ValueError):
+      sorted_array_file.read(path)
+
+  @parameterized.named_parameters(('ints', 'q'), ('doubles', 'd'))
+  def test_truncated_file_raises(self, typecode):
+    path = self._path()
+    sorted_array_file.write(path, list(range(10)), typecode)
+    with open(path, 'r+b') as f:
+      f.truncate(os.path.getsize(path) - 5 * 8)
+    with self.assertRaises(ValueError):
+      sorted_array_file.read(path)
+    with self.assertRaises(ValueError):
+      sorted_array_file.MappedSortedArray(path)
+
+  def test_invalid_typecode_raises(self):
+    with self.assertRaises(ValueError):
+      sorted_array_file.write(self._path(), ['a'], 'u')
+    # The size of 'l' differs between platforms.
+    with self.assertRaises(ValueError):
+      sorted_array_file.write(self._path(), [1], 'l')
+
+  def test_items_not_fitting_typecode_raise(self):
+    with self.assertRaises(OverflowError):
+      sorted_array_file.write(self._path(), [1000], 'b')
+
+  @parameterized.parameters('q', 'd')
+  def test_unsorted_items_raise(self, typecode):
+    path = self._path()
+    with self.assertRaises(ValueError):
+      sorted_array_file.write(path, [1, 3, 2], typecode)
+    self.assertFalse(os.path.exists(path))
+
+
+class SaveAndLoadTest(_TempFileTestCase):
+  """Tests for `BinarySearchTree.save` and `BinarySearchTree.load`."""
+
+  @parameterized.named_parameters(
+    ('bst', binary_search_tree.BinarySearchTree, {}),
+    ('avl', binary_search_tree.AVLTree, {}),
+    ('multiset', binary_search_tree.BinarySearchTree, {'multiset': True}))
+  def test_save_and_load(self, tree_class, kwargs):
+    items = [5, 3, 8, 1, 4, 4, 9, 0]
+    tree = tree_class.from_array(items, **kwargs)
+    path = self._path()
+    tree.save(path)
+    loaded = tree_class.load(path, **kwargs)
+    self.assertIsInstance(loaded, tree_class)
+    self.assertListEqual(sorted(items), loaded.in_order_walk())
+    self.assertEqual(len(items), loaded.size())
+    loaded.add(2)
+    self.assertEqual(2, loaded.search(2))
+    with sorted_array_file.MappedSortedArray(path) as mapped:
+      self.assertListEqual(sorted(items), list(mapped))
+
+  def test_save_doubles(self):
+    tree = binary_search_tree.BinarySearchTree.from_array([0.5, -2.0, 1.25])
+    path = self._path()
+    tree.save(path, typecode='d')
+    self.assertListEqual([-2.0, 0.5, 1.25],
+                         binary_search_tree.AVLTree.load(path).in_order_walk())
+
+  def test_save_with_key_function_raises(self):
+    tree = binary_search_tree.BinarySearchTree(key=lambda x: -x)
+    tree.add(1)
+    path = self._path()
+    with self.assertRaises(ValueError):
+      tree.save(path)
+
+
+if __name__ == '__main__':
+  absltest.main()
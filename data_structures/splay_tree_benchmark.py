@@ -0,0 +1,93 @@
+"""Benchmark of `SplayTree` against `BinarySearchTree` and `AVLTree`.
+
+For each size, builds the trees by adding random keys one by one, and measures
+the time of searching for keys drawn uniformly at random, and drawn from a Zipf
+distribution, in which the `i`-th most popular key is drawn with probability
+proportional to `1 / i^s`. The popular keys are chosen at random, so they sit
+at arbitrary depths of the trees. Also reports the average depth of the keys
+searched for, that is the number of comparisons walking down the tree, after
+the lookups of the workload.
+
+`SplayTree` splays on a sample of the lookups, and is also measured splaying on
+every lookup, as `SplayTree/all`, to show the cost of the splaying.
+
+Usage:
+  python -m data_structures.splay_tree_benchmark --sizes=100000 --zipf_s=1.2
+"""
+
+import functools
+import itertools
+import random
+import time
+
+from absl import app
+from absl import flags
+
+from data_structures import binary_search_tree
+
+FLAGS = flags.FLAGS
+flags.DEFINE_list('sizes', ['10000', '100000'], 'Numbers of keys.')
+flags.DEFINE_integer('num_lookups', 1000000, 'Number of lookups.')
+flags.DEFINE_float('zipf_s', 1.0, 'Exponent of the Zipf distribution.')
+
+_TREES = [
+  ('BinarySearchTree', binary_search_tree.BinarySearchTree),
+  ('AVLTree', binary_search_tree.AVLTree),
+  ('SplayTree', binary_search_tree.SplayTree),
+  ('SplayTree/all',
+   functools.partial(binary_search_tree.SplayTree, splay_interval=1)),
+]
+
+
+def _timed(fn):
+  """Returns seconds taken by calling `fn`."""
+  start = time.perf_counter()
+  fn()
+  return time.perf_counter() - start
+
+
+def _zipf_lookups(keys, num_lookups, s):
+  """Returns `num_lookups` keys drawn from a Zipf distribution over `keys`."""
+  popularity = random.sample(keys, len(keys))
+  cum_weights = list(itertools.accumulate(
+    1 / rank ** s for rank in range(1, len(keys) + 1)))
+  return random.choices(popularity, cum_weights=cum_weights, k=num_lookups)
+
+
+def _average_depth(tree, lookups):
+  """Returns the average depth of `lookups`, searching for each of them."""
+  total = 0
+  for key in lookups:
+    node = tree._root
+    while node.key != key:
+      node = node.left if key < node.key else node.right
+      total += 1
+    tree.search(key)
+  return total / len(lookups)
+
+
+def main(argv):
+  del argv  # Unused.
+  print(f'{"keys":>10s} {"tree":>18s} {"uniform":>8s} {"depth":>6s} '
+        f'{"zipf":>8s} {"depth":>6s}')
+  for size in map(int, FLAGS.sizes):
+    keys = list(range(size))
+    random.shuffle(keys)
+    workloads = [
+      random.choices(keys, k=FLAGS.num_lookups),
+      _zipf_lookups(keys, FLAGS.num_lookups, FLAGS.zipf_s),
+    ]
+    for name, tree_class in _TREES:
+      results = []
+      for lookups in workloads:
+        tree = tree_class()
+        for key in keys:
+          tree.add(key)
+        seconds = _timed(lambda: [tree.search(key) for key in lookups])
+        depth = _average_depth(tree, lookups[:FLAGS.num_lookups // 10])
+        results.append(f'{seconds:7.2f}s {depth:6.2f}')
+      print(f'{size:10d} {name:>18s} ' + ' '.join(results))
+
+
+if __name__ == '__main__':
+  app.run(main)
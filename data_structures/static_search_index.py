@@ -0,0 +1,239 @@
+"""Implementation of an immutable sorted search index."""
+
+import bisect
+import functools
+import numbers
+
+from data_structures import binary_search_tree
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+  """Returns the NumPy module, or `None` if it is not available.
+
+  NumPy is imported on first use rather than with this module, as importing it
+  takes longer than importing all of the data structures.
+  """
+  try:
+    import numpy
+  except ImportError:
+    return None
+  return numpy
+
+
+def _exact_in_numpy(np, keys):
+  """Returns whether a NumPy array of the sorted `keys` holds them exactly.
+
+  This is the case if all keys are integers fitting 64 bits, or all are
+  floats. Otherwise, a mix of integers and floats is converted to floats,
+  which do not hold integers larger than `2**53` exactly, and other numbers or
+  larger integers to Python objects, which NumPy does not search any faster.
+  """
+  if all(isinstance(k, numbers.Integral) for k in keys):
+    return not keys or (-2 ** 63 <= keys[0] and keys[-1] < 2 ** 63)
+  return all(isinstance(k, (float, np.floating)) for k in keys)
+
+
+class StaticSearchIndex(object):
+  """Implementation of an immutable sorted search index.
+
+  A static search index is a data structure which serves as an ordered
+  collection of elements which does not change after it is created. It allows
+  searching for elements, computing their ranks and counting elements in a
+  range, like `binary_search_tree.BinarySearchTree`, from which it is usually
+  created by `BinarySearchTree.freeze`.
+
+  Layout.
+
+  Instead of nodes linked by pointers, the keys are stored in a contiguous
+  sorted array, and single lookups are binary searches in it using `bisect`.
+  The items are stored in a parallel array, which is the array of keys itself if
+  the items are their own keys.
+
+  If NumPy is available and the keys are integers or floats, the keys are also
+  stored in NumPy arrays, and `search_batch` looks up a whole array of keys at
+  once. For this, the keys are stored in the *Eytzinger layout*: the order in
+  which a breadth-first walk visits a perfectly balanced binary search tree of
+  the keys, so that the children of the key at position `i` are at positions
+  `2 * i` and `2 * i + 1`. A binary search then walks down the array from its
+  start, all lookups of the batch moving one level down at a time, and the top
+  levels of the tree, visited by every lookup, share a few cache lines.
+  """
+
+  def __init__(self, keys, values=None, key=None, use_numpy=None):
+    """Constructs the index.
+
+    Args:
+      keys: A list of keys sorted in non-decreasing order.
+      values: A list of items of the same length as `keys`, or `None` if the
+        items are the keys themselves.
+      key: The function which computed the keys from the items, used by lookups
+        of items. `None` if the items are the keys themselves.
+      use_numpy: A boolean, whether to also store the keys in NumPy arrays. If
+        `None`, NumPy is used when it is available and a NumPy array holds
+        each of the keys exactly, see `_exact_in_numpy`.
+
+    Raises:
+      `ImportError` if `use_numpy` is `True` but NumPy is not available.
+    """
+    np = _numpy() if use_numpy is None or use_numpy else None
+    if use_numpy is None:
+      use_numpy = np is not None and _exact_in_numpy(np, keys)
+    if use_numpy and np is None:
+      raise ImportError('NumPy is not available.')
+    self._np = np
+    self._keys = keys
+    self._values = keys if values is None else values
+    self._key = key
+    self._size = len(keys)
+    self._numpy = use_numpy
+    if use_numpy:
+      self._key_array = np.asarray(keys)
+      self._build_eytzinger()
+
+  def search(self, item):
+    """Searches for the item and returns it.
+
+    Raises:
+      NotInTreeError: If `item` is not in the index.
+    """
+    key = item if self._key is None else self._key(item)
+    return self.search_key(key)
+
+  def search_key(self, key):
+    """Searches for an item with the given key and returns it.
+
+    Raises:
+      NotInTreeError: If no item with `key` is in the index.
+    """
+    position = self._find(key)
+    if position < 0:
+      raise binary_search_tree.NotInTreeError()
+    return self.select(position)
+
+  def contains(self, item):
+    """Returns `True` if `item` is in the index, `False` otherwise."""
+    key = item if self._key is None else self._key(item)
+    return self._find(key) >= 0
+
+  __contains__ = contains
+
+  def rank(self, item):
+    """Returns the number of items in the index smaller than `item`."""
+    key = item if self._key is None else self._key(item)
+    return self._bisect_left(key)
+
+  def select(self, k):
+    """Returns the `k`-th smallest item in the index, counting from zero.
+
+    Raises:
+      `IndexError` if `k` is out of range.
+    """
+    if not 0 <= k < self._size:
+      raise IndexError(
+        f'Index {k} out of range for index of size {self._size}.')
+    return self._values[k]
+
+  def count_range(self, lo, hi):
+    """Returns the number of items `x` in the index with `lo <= x <= hi`."""
+    if self._key is not None:
+      lo, hi = self._key(lo), self._key(hi)
+    if hi < lo:
+      return 0
+    return self._bisect_right(hi) - self._bisect_left(lo)
+
+  def iter_range(self, lo, hi):
+    """Yields items `x` with `lo <= x <= hi` in increasing order."""
+    if self._key is not None:
+      lo, hi = self._key(lo), self._key(hi)
+    for k in range(self._bisect_left(lo), self._bisect_right(hi)):
+      yield self.select(k)
+
+  def search_batch(self, keys):
+    """Searches for many keys at once.
+
+    With NumPy, the lookups are vectorized, walking down the Eytzinger layout
+    one level at a time for all keys together.
+
+    Args:
+      keys: An array or a list of keys.
+
+    Returns:
+      For each of `keys`, the position of the first item with the key in the
+      sorted order, to be passed to `select`, or `-1` if there is no such item.
+      A NumPy array if the index uses NumPy, a list otherwise.
+    """
+    if not self._numpy:
+      return [self._find(key) for key in keys]
+
+    np = self._np
+    queries = np.asarray(keys)
+    n = self._size
+    # Walk down the tree, to the right of keys smaller than the query. Lookups
+    # which fell off the bottom level stay where they are.
+    idx = np.ones(queries.shape, dtype=np.int64)
+    for _ in range(n.bit_length()):
+      inside = idx <= n
+      go_right = self._eytzinger[np.where(inside, idx, 0)] < queries
+      idx = np.where(inside, 2 * idx + go_right, idx)
+    # The last step to the left was from the first key not smaller than the
+    # query. Strip the trailing steps to the right and that one step.
+    lowest_zero_bit = ~idx & (idx + 1)
+    idx = idx // (2 * lowest_zero_bit)
+    positions = self._eytzinger_position[idx]
+    found = positions < n
+    found[found] = self._key_array[positions[found]] == queries[found]
+    return np.where(found, positions, -1)
+
+  def size(self):
+    """Returns the number of elements in the index."""
+    return self._size
+
+  def __iter__(self):
+    """Yields items in the index in increasing order."""
+    for k in range(self._size):
+      yield self.select(k)
+
+  def _find(self, key):
+    """Returns the position of the first item with `key`, or `-1`."""
+    position = self._bisect_left(key)
+    if position < self._size and self._keys[position] == key:
+      return position
+    return -1
+
+  def _bisect_left(self, key):
+    return bisect.bisect_left(self._keys, key)
+
+  def _bisect_right(self, key):
+    return bisect.bisect_right(self._keys, key)
+
+  def _build_eytzinger(self):
+    """Builds the Eytzinger layout of the keys.
+
+    Position `0` of the layout is unused, and positions `1` to `n` hold the keys
+    in the order of a breadth-first walk of a balanced binary search tree.
+    `_eytzinger_position` maps the positions in the layout to the positions in
+    the sorted order, and position `0` to `n`, standing for no key.
+    """
+    np = self._np
+    n = self._size
+    position = np.empty(n + 1, dtype=np.int64)
+    position[0] = n
+    # In-order walk of the implicit tree assigns the sorted positions.
+    stack = []
+    node = 1
+    k = 0
+    while stack or node <= n:
+      while node <= n:
+        stack.append(node)
+        node *= 2
+      node = stack.pop()
+      position[node] = k
+      k += 1
+      node = 2 * node + 1
+    self._eytzinger_position = position
+    eytzinger = np.empty(n + 1, dtype=self._key_array.dtype)
+    eytzinger[1:] = self._key_array[position[1:]]
+    if n:
+      eytzinger[0] = self._key_array[0]  # Unused, never compared.
+    self._eytzinger = eytzinger
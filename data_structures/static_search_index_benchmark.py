@@ -0,0 +1,67 @@
+"""Benchmark of `StaticSearchIndex` against `BinarySearchTree` and `AVLTree`.
+
+For each size, builds the trees from random keys, freezes them, and measures
+the throughput of searching for random keys, half of which are missing, in the
+trees, in the frozen index one key at a time, and in the frozen index with
+`search_batch`, with and without NumPy.
+
+Usage:
+  python -m data_structures.static_search_index_benchmark --sizes=100000,1000000
+"""
+
+import random
+import time
+
+from absl import app
+from absl import flags
+
+from data_structures import binary_search_tree
+from data_structures import static_search_index
+
+FLAGS = flags.FLAGS
+flags.DEFINE_list('sizes', ['100000', '1000000'], 'Numbers of keys.')
+flags.DEFINE_integer('num_lookups', 1000000, 'Number of lookups.')
+
+
+def _timed(fn):
+  """Returns seconds taken by calling `fn`."""
+  start = time.perf_counter()
+  fn()
+  return time.perf_counter() - start
+
+
+def _lookups(tree, queries):
+  """Returns `(name, seconds)` pairs for looking up `queries` in `tree`."""
+  results = [('tree', _timed(lambda: [tree.contains(q) for q in queries]))]
+  np = static_search_index._numpy()
+  for use_numpy in [False, True]:
+    if use_numpy and np is None:
+      continue
+    index = tree.freeze(use_numpy=use_numpy)
+    batch = np.array(queries) if use_numpy else queries
+    suffix = ' (numpy)' if use_numpy else ''
+    results.append(('frozen' + suffix,
+                    _timed(lambda: [index.contains(q) for q in queries])))
+    results.append(('search_batch' + suffix,
+                    _timed(lambda: index.search_batch(batch))))
+  return results
+
+
+def main(argv):
+  del argv  # Unused.
+  print(f'{"keys":>10s} {"tree":>18s} {"lookup":>22s} {"time":>8s} '
+        f'{"lookups/s":>12s}')
+  for size in map(int, FLAGS.sizes):
+    keys = random.sample(range(2 * size), size)
+    queries = [random.randrange(2 * size) for _ in range(FLAGS.num_lookups)]
+    for name, tree_class in [('BinarySearchTree',
+                              binary_search_tree.BinarySearchTree),
+                             ('AVLTree', binary_search_tree.AVLTree)]:
+      tree = tree_class.from_array(keys)
+      for lookup, seconds in _lookups(tree, queries):
+        print(f'{size:10d} {name:>18s} {lookup:>22s} {seconds:7.2f}s '
+              f'{len(queries) / seconds:12.0f}')
+
+
+if __name__ == '__main__':
+  app.run(main)
@@ -0,0 +1,149 @@
+import random
+
+from absl.testing import absltest
+from absl.testing import parameterized
+
+from data_structures import binary_search_tree
+from data_structures import static_search_index
+
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+
+def _use_numpy_parameters():
+  """Returns named parameters for both storages, if NumPy is available."""
+  parameters = [('lists', False)]
+  if np is not None:
+    parameters.append(('numpy', True))
+  return parameters
+
+
+class StaticSearchIndexTest(parameterized.TestCase):
+  """Tests for `StaticSearchIndex`."""
+
+  @parameterized.named_parameters(_use_numpy_parameters())
+  def test_empty_index(self, use_numpy):
+    index = binary_search_tree.BinarySearchTree().freeze(use_numpy=use_numpy)
+    self.assertEqual(0, index.size())
+    self.assertListEqual([], list(index))
+    self.assertNotIn(1, index)
+    self.assertEqual(0, index.rank(1))
+    self.assertEqual(0, index.count_range(0, 10))
+    self.assertListEqual([-1, -1], list(index.search_batch([0, 1])))
+    with self.assertRaises(binary_search_tree.NotInTreeError):
+      index.search(1)
+    with self.assertRaises(IndexError):
+      index.select(0)
+
+  @parameterized.named_parameters(_use_numpy_parameters())
+  def test_matches_tree(self, use_numpy):
+    items = random.Random(0).sample(range(0, 3000, 3), 1000)
+    tree = binary_search_tree.AVLTree.from_array(items)
+    index = tree.freeze(use_numpy=use_numpy)
+    self.assertEqual(tree.size(), index.size())
+    self.assertListEqual(tree.in_order_walk(), list(index))
+    for item in range(-1, 3001):
+      self.assertEqual(tree.contains(item), index.contains(item))
+      self.assertEqual(tree.rank(item), index.rank(item))
+    for item in items:
+      self.assertEqual(item, index.search(item))
+    for k in range(tree.size()):
+      self.assertEqual(tree.select(k), index.select(k))
+
+  @parameterized.named_parameters(_use_numpy_parameters())
+  def test_range_queries(self, use_numpy):
+    items = list(range(0, 100, 3)) + [9, 9]
+    index = binary_search_tree.BinarySearchTree.from_array(items).freeze(
+      use_numpy=use_numpy)
+    for lo, hi in [(-10, 100), (3, 30), (4, 29), (9, 9), (10, 11), (30, 3)]:
+      expected = [x for x in sorted(items) if lo <= x <= hi]
+      self.assertEqual(len(expected), index.count_range(lo, hi))
+      self.assertListEqual(expected, list(index.iter_range(lo, hi)))
+
+  @parameterized.named_parameters(_use_numpy_parameters())
+  def test_search_batch(self, use_numpy):
+    for size in range(20):
+      items = [2 * i for i in range(size)] + [4, 4]
+      index = binary_search_tree.BinarySearchTree.from_array(items).freeze(
+        use_numpy=use_numpy)
+      queries = list(range(-1, 2 * size + 2))
+      expected = []
+      for query in queries:
+        expected.append(index.rank(query) if query in index else -1)
+      self.assertListEqual(expected, list(index.search_batch(queries)))
+
+  @parameterized.named_parameters(_use_numpy_parameters())
+  def test_multiset(self, use_numpy):
+    tree = binary_search_tree.BinarySearchTree(multiset=True)
+    for item in [3, 1, 3, 2, 3]:
+      tree.add(item)
+    index = tree.freeze(use_numpy=use_numpy)
+    self.assertListEqual([1, 2, 3, 3, 3], list(index))
+    self.assertEqual(2, index.rank(3))
+    self.assertEqual(3, index.count_range(3, 3))
+    self.assertListEqual([2, -1], list(index.search_batch([3, 4])))
+
+  def test_key_function(self):
+    tree = binary_search_tree.BinarySearchTree(key=lambda x: x[0])
+    for item in [(3, 'c'), (1, 'a'), (2, 'b')]:
+      tree.add(item)
+    index = tree.freeze()
+    self.assertEqual((2, 'b'), index.search((2, None)))
+    self.assertEqual((3, 'c'), index.search_key(3))
+    self.assertEqual(1, index.rank((2, None)))
+    self.assertListEqual([(1, 'a'), (2, 'b')],
+                         list(index.iter_range((1, None), (2, None))))
+    self.assertEqual(index.select(index.search_batch([3])[0]), (3, 'c'))
+
+  def test_not_affected_by_changes_to_tree(self):
+    tree = binary_search_tree.BinarySearchTree.from_array([1, 2, 3])
+    index = tree.freeze()
+    tree.add(4)
+    tree.remove(1)
+    self.assertListEqual([1, 2, 3], list(index))
+
+  def test_non_numeric_keys_do_not_use_numpy(self):
+    index = binary_search_tree.BinarySearchTree.from_array(
+      ['b', 'a', 'c']).freeze()
+    self.assertFalse(index._numpy)
+    self.assertEqual('b', index.search('b'))
+    self.assertListEqual([1, -1], index.search_batch(['b', 'd']))
+
+  @absltest.skipIf(np is None, 'NumPy is not available.')
+  def test_numpy_keeps_items(self):
+    index = static_search_index.StaticSearchIndex([1, 2.5, 3], use_numpy=True)
+    self.assertTrue(index._numpy)
+    self.assertIsInstance(index.search(1), int)
+    self.assertListEqual([1, 2.5, 3], list(index))
+    self.assertListEqual([0, 1, -1],
+                         index.search_batch(np.array([1, 2.5, 2])).tolist())
+
+  @absltest.skipIf(np is None, 'NumPy is not available.')
+  def test_numpy_used_only_for_exact_keys(self):
+    def uses_numpy(keys):
+      return static_search_index.StaticSearchIndex(keys)._numpy
+
+    self.assertTrue(uses_numpy([]))
+    self.assertTrue(uses_numpy([-2 ** 63, 0, 2 ** 63 - 1]))
+    self.assertTrue(uses_numpy([0.5, 2.0 ** 60]))
+    self.assertFalse(uses_numpy([0, 2 ** 63]))
+    self.assertFalse(uses_numpy([0.5, 1]))
+
+  @absltest.skipIf(np is None, 'NumPy is not available.')
+  def test_mixed_ints_and_floats_searched_exactly(self):
+    index = binary_search_tree.BinarySearchTree.from_array(
+      [0.5, 2 ** 53 + 1]).freeze()
+    self.assertFalse(index.contains(2 ** 53))
+    queries = [2 ** 53, 2 ** 53 + 1]
+    self.assertListEqual([-1, 1], list(index.search_batch(queries)))
+
+  @absltest.skipIf(np is not None, 'NumPy is available.')
+  def test_numpy_required_but_not_available(self):
+    with self.assertRaises(ImportError):
+      static_search_index.StaticSearchIndex([1, 2, 3], use_numpy=True)
+
+
+if __name__ == '__main__':
+  absltest.main()